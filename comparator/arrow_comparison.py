@@ -0,0 +1,113 @@
+'''
+Copyright 2024 Infosys Ltd.
+
+Use of this source code is governed by MIT license that can be found in the LICENSE file or at
+
+https://opensource.org/licenses/MIT.
+'''
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from comparator.hash_comparison import records_from_counts, groups_from_counts
+from utils.ServerLogs import logger
+
+# Names of the helper columns added to the Arrow tables
+ROW_COLUMN = '__row'
+COUNT_COLUMN = 'count_all'
+
+
+def key_tables(src_df, tgt_df):
+    """Function to convert source and target to Arrow tables whose columns can be used as join keys
+
+    Arrow joins never match null keys, so every column with nulls is replaced by its values with the
+    nulls filled and a null flag, which keeps records with missing values joinable.
+
+    Args:
+        src_df: Source dataframe
+        tgt_df: Target dataframe with the same column order as the source
+
+    Returns:
+        Source table, target table, key column names
+
+    """
+    names = [f'c{i}' for i in range(src_df.shape[1])]
+    src_table = pa.Table.from_pandas(src_df.set_axis(names, axis=1), preserve_index=False)
+    tgt_table = pa.Table.from_pandas(tgt_df.set_axis(names, axis=1), preserve_index=False)
+
+    src_columns = {}
+    tgt_columns = {}
+    for name in names:
+        src_column = src_table[name]
+        tgt_column = tgt_table[name]
+        if src_column.type != tgt_column.type:
+            src_column = src_column.cast(pa.string())
+            tgt_column = tgt_column.cast(pa.string())
+
+        if src_column.null_count == 0 and tgt_column.null_count == 0:
+            src_columns[name], tgt_columns[name] = src_column, tgt_column
+            continue
+
+        values = pc.drop_null(pa.chunked_array(src_column.chunks + tgt_column.chunks, type=src_column.type))
+        for columns, column in ((src_columns, src_column), (tgt_columns, tgt_column)):
+            if len(values):
+                columns[name] = pc.fill_null(column, values[0])
+            columns[name + '_null'] = pc.is_null(column)
+
+    return pa.table(src_columns), pa.table(tgt_columns), list(src_columns)
+
+
+def other_side_counts(table, other, keys):
+    """Function to get the number of occurrences of every record of a table in the other table"""
+    counts = other.group_by(keys).aggregate([([], COUNT_COLUMN)])
+    rows = table.append_column(ROW_COLUMN, pa.array(np.arange(len(table), dtype=np.int64)))
+    joined = rows.join(counts, keys=keys, join_type='inner')
+
+    occurrences = np.zeros(len(table), dtype=np.int64)
+    occurrences[joined[ROW_COLUMN].to_numpy()] = joined[COUNT_COLUMN].to_numpy()
+    return occurrences
+
+
+def group_counts(table, keys):
+    """Function to group identical records with their number of occurrences and first position"""
+    rows = table.append_column(ROW_COLUMN, pa.array(np.arange(len(table), dtype=np.int64)))
+    return rows.group_by(keys).aggregate([([], COUNT_COLUMN), (ROW_COLUMN, 'min')])
+
+
+def arrow_record_comparison(src_df, tgt_df, matched_limit=None, multiset=False):
+    """Function to compare records with Arrow hash joins on all columns
+
+    The counts and rows are the same as the ones of the hash engine, as multisets of identical rows
+    when requested. Only the records which are needed for the reports are materialized.
+
+    Args:
+        src_df: Source dataframe
+        tgt_df: Target dataframe with the same column names as the source
+        matched_limit: Maximum number of matched rows, or groups for a multiset comparison, None for all
+        multiset: Compare the records as multisets of identical rows
+
+    Returns:
+        Matched rows, source only rows, target only rows, number of matched rows,
+        number of source only rows, number of target only rows
+
+    """
+    src_table, tgt_table, keys = key_tables(src_df, tgt_df)
+
+    if not multiset:
+        logger.info(f"Arrow comparison - {len(src_table)} source and {len(tgt_table)} target records")
+        return records_from_counts(src_df, tgt_df, other_side_counts(src_table, tgt_table, keys),
+                                   other_side_counts(tgt_table, src_table, keys), matched_limit)
+
+    groups = group_counts(src_table, keys).join(group_counts(tgt_table, keys), keys=keys, join_type='full outer',
+                                                left_suffix='_source', right_suffix='_target')
+    src_first = pc.fill_null(groups[ROW_COLUMN + '_min_source'], -1).to_numpy()
+    tgt_first = pc.fill_null(groups[ROW_COLUMN + '_min_target'], -1).to_numpy()
+
+    # Groups follow the order of first appearance, source records first
+    order = np.argsort(np.where(src_first >= 0, src_first, len(src_table) + tgt_first), kind='stable')
+    logger.info(f"Arrow multiset comparison - {len(order)} distinct records")
+    return groups_from_counts(src_df, tgt_df, src_first[order], tgt_first[order],
+                              pc.fill_null(groups[COUNT_COLUMN + '_source'], 0).to_numpy()[order],
+                              pc.fill_null(groups[COUNT_COLUMN + '_target'], 0).to_numpy()[order],
+                              matched_limit)
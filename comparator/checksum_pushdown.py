@@ -0,0 +1,204 @@
+'''
+Copyright 2024 Infosys Ltd.
+
+Use of this source code is governed by MIT license that can be found in the LICENSE file or at
+
+https://opensource.org/licenses/MIT.
+'''
+
+from decimal import Decimal
+
+import pandas as pd
+
+from comparator.column_comparison import get_key_columns
+from configs import config
+from reports.response import RecordResponse, ColumnResponse
+from utils.ServerLogs import logger
+from utils.concurrent_fetch import fetch_concurrently
+
+# SQL of every database type which computes digests, a row is hashed with MD5 everywhere so that the
+# digests of a source and a target of different types can be compared
+DIALECTS = {
+    'Mysql': {
+        'text': "COALESCE(CAST({} AS CHAR), '')",
+        'concat': "CONCAT({})",
+        'separator': ", '|', ",
+        'hash': "CAST(CONV(SUBSTRING(MD5({text}), {hex_start}, 8), 16, 10) AS UNSIGNED)",
+        'mod': "MOD({}, {})",
+    },
+    'Postgresql': {
+        'text': "COALESCE(CAST({} AS TEXT), '')",
+        'concat': "{}",
+        'separator': " || '|' || ",
+        'hash': "('x' || SUBSTR(MD5({text}), {hex_start}, 8))::BIT(32)::BIGINT",
+        'mod': "MOD({}, {})",
+    },
+    'Oracle': {
+        'text': "COALESCE(TO_CHAR({}), '')",
+        'concat': "{}",
+        'separator': " || '|' || ",
+        'hash': "TO_NUMBER(SUBSTR(RAWTOHEX(STANDARD_HASH({text}, 'MD5')), {hex_start}, 8), 'XXXXXXXX')",
+        'mod': "MOD({}, {})",
+    },
+    'MsSql': {
+        'text': "COALESCE(CONVERT(VARCHAR(MAX), {}), '')",
+        'concat': "CONCAT({})",
+        'separator': ", '|', ",
+        'hash': "CAST(SUBSTRING(HASHBYTES('MD5', {text}), {byte_start}, 4) AS BIGINT)",
+        'mod': "({}) % {}",
+    },
+}
+
+# Oracle does not take more values in an IN list
+IN_LIST_SIZE = 1000
+
+
+def row_text(dialect, columns):
+    """Function to get the SQL which renders the mapped columns of a row as one string"""
+    texts = [dialect['text'].format(column) for column in columns]
+    if len(texts) == 1:
+        return texts[0]
+    return dialect['concat'].format(dialect['separator'].join(texts))
+
+
+def row_hash(dialect, columns, part):
+    """Function to get the SQL of one 32 bit part of the MD5 hash of a row, as an integer"""
+    return dialect['hash'].format(text=row_text(dialect, columns), hex_start=8 * part + 1, byte_start=4 * part + 1)
+
+
+def bucket_expression(dialect, columns, no_of_buckets):
+    """Function to get the SQL of the bucket of a row, from the first part of its hash"""
+    return dialect['mod'].format(row_hash(dialect, columns, 0), no_of_buckets)
+
+
+def digest_query(database_type, query, columns, no_of_buckets):
+    """Function to get the query which computes the number of rows and the digests of every bucket of a query
+
+    Digests are the sums of the second and the third part of the row hashes, so they do not depend on the
+    order of the rows, and identical rows in both databases give identical digests. Identical rows are
+    grouped first, to count the pairs of identical source and target rows as the record comparison does.
+    """
+    dialect = DIALECTS[database_type]
+    return (f"SELECT bucket_id, SUM(copies) AS row_count, SUM(copies * copies) AS matched_pairs, "
+            f"SUM(digest_1 * copies) AS digest_1, SUM(digest_2 * copies) AS digest_2 "
+            f"FROM (SELECT bucket_id, digest_1, digest_2, COUNT(*) AS copies "
+            f"FROM (SELECT {bucket_expression(dialect, columns, no_of_buckets)} AS bucket_id, "
+            f"{row_hash(dialect, columns, 1)} AS digest_1, {row_hash(dialect, columns, 2)} AS digest_2 "
+            f"FROM ({query}) checksummed) row_hashes GROUP BY bucket_id, digest_1, digest_2) distinct_rows "
+            f"GROUP BY bucket_id")
+
+
+def bucket_query(database_type, query, columns, no_of_buckets, buckets):
+    """Function to get the query which reads the rows of some buckets of a query"""
+    bucket = bucket_expression(DIALECTS[database_type], columns, no_of_buckets)
+    in_lists = [f"{bucket} IN ({', '.join(str(bucket_id) for bucket_id in buckets[i:i + IN_LIST_SIZE])})"
+                for i in range(0, len(buckets), IN_LIST_SIZE)]
+    return f"SELECT * FROM ({query}) checksummed WHERE {' OR '.join(in_lists)}"
+
+
+def as_int(value):
+    """Function to read an integer of a digest, as returned by any driver"""
+    if value is None or value != value:
+        return 0
+    return int(Decimal(str(value)))
+
+
+def read_digests(query, connection):
+    """Function to run a digest query, see digest_query"""
+    digests = pd.read_sql(query, connection, coerce_float=False)
+    digests.columns = [column.lower() for column in digests.columns]
+    for column in digests.columns:
+        digests[column] = digests[column].map(as_int).astype(object)
+    return digests.set_index('bucket_id')
+
+
+def differing_buckets(source_digests, target_digests):
+    """Function to compare the digests of the buckets of both sides
+
+    Returns:
+        Buckets whose rows differ, sorted, number of rows in the buckets which match, number of pairs of
+        identical source and target rows in them
+
+    """
+    buckets = source_digests.index.union(target_digests.index)
+    source_digests = source_digests.reindex(buckets, fill_value=0)
+    target_digests = target_digests.reindex(buckets, fill_value=0)[source_digests.columns]
+    differs = (source_digests != target_digests).any(axis=1)
+    matched = source_digests.loc[~differs]
+    return (sorted(int(bucket_id) for bucket_id in buckets[differs]), int(matched['row_count'].sum()),
+            int(matched['matched_pairs'].sum()))
+
+
+def pushdown_checksums(source, target, no_of_buckets=None):
+    """Function to compare a source and a target query by the digests of their buckets, computed in their databases
+
+    Args:
+        source: Database type, query, connection and mapped columns of the source
+        target: Database type, query, connection and mapped columns of the target
+        no_of_buckets: Number of buckets, CHECKSUM_BUCKETS by default
+
+    Returns:
+        Source and target queries of the rows which still have to be compared, None when every bucket
+        matches, number of rows of each side in the matching buckets, number of pairs of identical source
+        and target rows in them, number of differing buckets.
+        Queries are returned as they are when digests can not be computed or differ in most buckets.
+
+    """
+    if source[0] not in DIALECTS or target[0] not in DIALECTS:
+        logger.info(f"Checksum pushdown is not supported for {source[0]} to {target[0]}, every row is compared")
+        return source[1], target[1], 0, 0, None
+
+    no_of_buckets = int(no_of_buckets or config.CHECKSUM_BUCKETS)
+    try:
+        source_digests, target_digests, _ = fetch_concurrently(
+            lambda: read_digests(digest_query(source[0], source[1], source[3], no_of_buckets), source[2]),
+            lambda: read_digests(digest_query(target[0], target[1], target[3], no_of_buckets), target[2]))
+    except Exception as e:
+        logger.error(f"Digests could not be computed, every row is compared - {e}")
+        return source[1], target[1], 0, 0, None
+
+    buckets, matched_rows, matched_pairs = differing_buckets(source_digests, target_digests)
+    logger.info(f"Checksum pushdown - {len(buckets)} of {no_of_buckets} buckets differ, {matched_rows} rows match")
+    if not buckets:
+        return None, None, matched_rows, matched_pairs, 0
+
+    if 2 * len(buckets) > no_of_buckets:
+        # Filtering most of the rows on their bucket costs more than it saves
+        return source[1], target[1], 0, 0, len(buckets)
+    return (bucket_query(source[0], source[1], source[3], no_of_buckets, buckets),
+            bucket_query(target[0], target[1], target[3], no_of_buckets, buckets), matched_rows, matched_pairs,
+            len(buckets))
+
+
+def empty_response(record_or_column, attribute_names, primary_key=None):
+    """Function to get the comparison response of no rows, for tables whose buckets all match, see add_matched_rows"""
+    if record_or_column == 'record':
+        response = RecordResponse()
+        response.get_instantiated_instance(0, 0, 1, 0, 0, [], [], 0, [], attribute_names, None, None, None, None)
+    else:
+        key_columns = get_key_columns(primary_key)
+        response = ColumnResponse()
+        response.get_instantiated_instance(0, {column: 0 for column in attribute_names if column not in key_columns},
+                                           None, None, 0, 0)
+    return response.get_json_representaion()
+
+
+def add_matched_rows(response, record_or_column, matched_rows, matched_pairs, mismatched_buckets, multiset=False):
+    """Function to count the rows of the matching buckets, which were not read, in a comparison response
+
+    Matched records are counted as the record comparison counts them: every identical source and target
+    row pair, or every identical row once in a multiset comparison.
+    """
+    if not isinstance(response, dict):
+        return response
+
+    if record_or_column == 'record':
+        for count in ['source_records', 'target_records']:
+            response[count] = (response.get(count) or 0) + matched_rows
+        response['Matched_records'] = (response.get('Matched_records') or 0) + (
+            matched_rows if multiset else matched_pairs)
+    else:
+        for count in ['no_of_records_source', 'no_of_records_target']:
+            response[count] = (response.get(count) or 0) + matched_rows
+    response.update({'checksum_matched_records': matched_rows, 'checksum_mismatched_buckets': mismatched_buckets})
+    return response
@@ -0,0 +1,270 @@
+'''
+Copyright 2024 Infosys Ltd.
+
+Use of this source code is governed by MIT license that can be found in the LICENSE file or at
+
+https://opensource.org/licenses/MIT.
+'''
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+
+from utils.exceptions import DuplicatePrimaryKeys, InvalidColumnRule
+
+# Columns of the long format column comparison reports
+CELL_COLUMNS = ["Primary Key", "Column", "Source", "Target", "Status"]
+
+# Number of duplicate keys listed in the error message
+DUPLICATE_KEYS_SHOWN = 10
+
+# Per column comparison rules accepted in the column mapping of a request
+COLUMN_RULES = ['absoluteTolerance', 'relativeTolerance', 'timestampUnit', 'ignoreCase', 'ignoreWhitespace']
+
+
+def get_key_columns(primary_key):
+    """Function to get the primary key columns from a column name, a comma separated string or a list"""
+    if isinstance(primary_key, str):
+        return [column.strip() for column in primary_key.split(',')]
+    return list(primary_key)
+
+
+def key_labels(key_frame):
+    """Function to get the primary key of every record as a value, or as a tuple for a composite key"""
+    if key_frame.shape[1] == 1:
+        return key_frame.iloc[:, 0].to_numpy(dtype=object)
+    return object_array(key_frame.itertuples(index=False, name=None), len(key_frame))
+
+
+def object_array(values, length):
+    """Function to build a one dimensional object array, tuples are kept as elements"""
+    array = np.empty(length, dtype=object)
+    array[:] = list(values)
+    return array
+
+
+def check_unique_keys(key_frame, codes):
+    """Function to fail when a key code is used by more than one record, listing the duplicate keys"""
+    duplicated = np.bincount(codes)[codes] > 1
+    if duplicated.any():
+        keys = pd.unique(key_labels(key_frame.iloc[np.flatnonzero(duplicated)]))
+        raise DuplicatePrimaryKeys(', '.join(str(key) for key in keys[:DUPLICATE_KEYS_SHOWN]))
+
+
+def primary_key_codes(src, tgt, key_columns):
+    """Function to map the primary key of every source and target record to a dense int64 code
+
+    Each key column is factorized over both sides and the codes are combined column by column, so
+    equal keys get equal codes without building tuples of strings. Duplicate keys fail here, before
+    the rest of the records is compared.
+
+    Args:
+        src: Source dataframe
+        tgt: Target dataframe with the source column names
+        key_columns: Primary key columns
+
+    Returns:
+        Key codes of the source records, key codes of the target records
+
+    """
+    src_keys = src[key_columns].astype(str).replace(['<NA>'], '')
+    tgt_keys = tgt[key_columns].astype(str).replace(['<NA>'], '')
+
+    codes = np.zeros(len(src_keys) + len(tgt_keys), dtype=np.int64)
+    for column in key_columns:
+        column_codes, uniques = pd.factorize(
+            np.concatenate([src_keys[column].to_numpy(dtype=object), tgt_keys[column].to_numpy(dtype=object)]))
+        codes = pd.factorize(codes * len(uniques) + column_codes)[0]
+
+    src_codes, tgt_codes = codes[:len(src_keys)], codes[len(src_keys):]
+    check_unique_keys(src_keys, src_codes)
+    check_unique_keys(tgt_keys, tgt_codes)
+    return src_codes, tgt_codes
+
+
+def get_column_rules(column_mapping):
+    """Function to get the comparison rules of the source columns from the column mapping of a request"""
+    column_rules = {}
+    for mapping in column_mapping:
+        rules = {rule: mapping[rule] for rule in COLUMN_RULES if rule in mapping}
+        if "sourceColumn" in mapping and rules:
+            column_rules[mapping["sourceColumn"]] = rules
+    return column_rules
+
+
+def check_column_rules(column_rules):
+    """Function to validate the comparison rules before the comparison starts"""
+    for col, rules in column_rules.items():
+        try:
+            for rule in ('absoluteTolerance', 'relativeTolerance'):
+                if rule in rules and float(rules[rule]) < 0:
+                    raise ValueError(rule)
+            if 'timestampUnit' in rules:
+                to_offset(rules['timestampUnit'])
+        except (TypeError, ValueError):
+            raise InvalidColumnRule(col)
+
+
+def is_enabled(value):
+    """Function to read a boolean rule, which may come as a string from the column mapping"""
+    return str(value).lower() in ('true', '1', 'yes')
+
+
+def normalized_strings(values, rules):
+    """Function to apply the case and whitespace rules to string values"""
+    values = values.astype(str)
+    if is_enabled(rules.get('ignoreWhitespace')):
+        values = values.str.strip().str.replace(r'\s+', ' ', regex=True)
+    if is_enabled(rules.get('ignoreCase')):
+        values = values.str.casefold()
+    return values
+
+
+def equal_values(src_values, tgt_values):
+    """Function to compare aligned values element by element, values missing on both sides are equal"""
+    equal = (src_values == tgt_values).to_numpy(dtype=bool, na_value=False)
+    return equal | (src_values.isna() & tgt_values.isna()).to_numpy()
+
+
+def equal_by_rules(src_values, tgt_values, rules=None):
+    """Function to compare aligned values with the rules of their column
+
+    Values which convert to timestamps are compared after truncation to timestampUnit, values which
+    convert to numbers are compared within absoluteTolerance + relativeTolerance * |target|, the other
+    values are compared exactly after the case and whitespace rules.
+
+    Args:
+        src_values: Source values
+        tgt_values: Target values, aligned with the source values
+        rules: Comparison rules of the column
+
+    Returns:
+        Boolean array, true where the values are equal
+
+    """
+    src_values = pd.Series(src_values)
+    tgt_values = pd.Series(tgt_values)
+    if not rules:
+        return equal_values(src_values, tgt_values)
+
+    if is_enabled(rules.get('ignoreCase')) or is_enabled(rules.get('ignoreWhitespace')):
+        src_values = normalized_strings(src_values, rules).mask(src_values.isna())
+        tgt_values = normalized_strings(tgt_values, rules).mask(tgt_values.isna())
+    equal = equal_values(src_values, tgt_values)
+
+    if 'timestampUnit' in rules:
+        src_timestamps = pd.to_datetime(src_values, errors='coerce', utc=True, format='mixed')
+        tgt_timestamps = pd.to_datetime(tgt_values, errors='coerce', utc=True, format='mixed')
+        converted = (src_timestamps.notna() & tgt_timestamps.notna()).to_numpy()
+        unit = rules['timestampUnit']
+        equal[converted] = (src_timestamps.dt.floor(unit) == tgt_timestamps.dt.floor(unit)).to_numpy()[converted]
+
+    if 'absoluteTolerance' in rules or 'relativeTolerance' in rules:
+        src_numbers = pd.to_numeric(src_values, errors='coerce').astype('float64').to_numpy()
+        tgt_numbers = pd.to_numeric(tgt_values, errors='coerce').astype('float64').to_numpy()
+        converted = ~np.isnan(src_numbers) & ~np.isnan(tgt_numbers)
+        equal[converted] = np.isclose(src_numbers[converted], tgt_numbers[converted],
+                                      rtol=float(rules.get('relativeTolerance', 0)),
+                                      atol=float(rules.get('absoluteTolerance', 0)))
+
+    return equal
+
+
+def code_positions(codes, no_of_codes):
+    """Function to get the record position of every key code, -1 for the codes which are absent"""
+    positions = np.full(no_of_codes, -1, dtype=np.int64)
+    positions[codes] = np.arange(len(codes))
+    return positions
+
+
+def column_values(values, positions):
+    """Function to take column values at the aligned positions, the values at missing positions are dropped later"""
+    if len(values) == 0:
+        return np.full(len(positions), None, dtype=object)
+    return values.take(np.maximum(positions, 0))
+
+
+def align_on_key(src, tgt, source_pkey, key_codes=None):
+    """Function to align source and target rows on the int64 codes of the primary key
+
+    Args:
+        src: Source dataframe
+        tgt: Target dataframe with the source column names
+        source_pkey: Primary key column or columns
+        key_codes: Key codes of both sides from primary_key_codes, computed when not given
+
+    Returns:
+        Keys in source order followed by the target only keys, source positions, target positions
+        (-1 where the key is missing on that side), compared columns
+
+    """
+    key_columns = get_key_columns(source_pkey)
+    src_codes, tgt_codes = key_codes if key_codes is not None else primary_key_codes(src, tgt, key_columns)
+
+    no_of_codes = int(max(src_codes.max(initial=-1), tgt_codes.max(initial=-1))) + 1
+    src_positions = code_positions(src_codes, no_of_codes)
+    tgt_positions = code_positions(tgt_codes, no_of_codes)
+    target_only = np.flatnonzero(src_positions[tgt_codes] < 0)
+
+    cols = src.columns.drop(key_columns)
+    keys = np.concatenate([key_labels(src[key_columns]), key_labels(tgt[key_columns].iloc[target_only])])
+    return (keys,
+            np.concatenate([np.arange(len(src)), np.full(len(target_only), -1)]),
+            np.concatenate([tgt_positions[src_codes], target_only]),
+            cols)
+
+
+def cells(parts, status):
+    """Function to materialize the cells collected column by column as one long format dataframe"""
+    data_frame = pd.DataFrame({name: np.concatenate([part[i] for part in parts]) if parts else []
+                               for i, name in enumerate(CELL_COLUMNS[:4])})
+    data_frame[CELL_COLUMNS[4]] = status
+    return data_frame
+
+
+def compare_columns(src, tgt, source_pkey, key_codes=None, column_rules=None, matched_limit=None):
+    """Function to align source and target on the primary key and compare every column
+
+    Columns are compared on their own arrays, strings or native numbers and timestamps, with the rules
+    of the column when it has some. A key missing on one side mismatches in every column and values
+    missing on both sides match.
+
+    Args:
+        src: Source dataframe
+        tgt: Target dataframe with the source column names
+        source_pkey: Primary key column or columns
+        key_codes: Key codes of both sides from primary_key_codes, computed when not given
+        column_rules: Comparison rules per column, from get_column_rules
+        matched_limit: Maximum number of matched cells to materialize, None for all
+
+    Returns:
+        Mismatched cells, matched cells, mismatch count per column, total mismatch count
+
+    """
+    keys, src_positions, tgt_positions, cols = align_on_key(src, tgt, source_pkey, key_codes)
+    column_rules = column_rules or {}
+    missing = (src_positions < 0) | (tgt_positions < 0)
+
+    mismatch_parts = []
+    match_parts = []
+    column_wise_mismatch_dict = {}
+    for col in cols:
+        src_values = column_values(src[col].array, src_positions)
+        tgt_values = column_values(tgt[col].array, tgt_positions)
+
+        mismatch = missing | ~equal_by_rules(src_values, tgt_values, column_rules.get(col))
+        column_wise_mismatch_dict[col] = int(mismatch.sum())
+
+        # Missing values are reported as empty cells
+        src_values = np.asarray(src_values, dtype=object)
+        tgt_values = np.asarray(tgt_values, dtype=object)
+        src_values[pd.isna(src_values) | (src_positions < 0)] = ""
+        tgt_values[pd.isna(tgt_values) | (tgt_positions < 0)] = ""
+        matched_rows = np.flatnonzero(~mismatch)
+        if matched_limit is not None:
+            matched_rows = matched_rows[:max(matched_limit - sum(len(part[0]) for part in match_parts), 0)]
+        for parts, rows in ((mismatch_parts, np.flatnonzero(mismatch)), (match_parts, matched_rows)):
+            parts.append((keys[rows], np.full(len(rows), col, dtype=object), src_values[rows], tgt_values[rows]))
+
+    return (cells(mismatch_parts, "Mismatched"), cells(match_parts, "Matched"),
+            column_wise_mismatch_dict, sum(column_wise_mismatch_dict.values()))
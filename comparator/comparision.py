@@ -9,19 +9,31 @@ https://opensource.org/licenses/MIT.
 import traceback
 
 import pandas as pd
-from pandas.errors import InvalidIndexError
 
+from comparator.arrow_comparison import arrow_record_comparison
+from comparator.column_comparison import compare_columns, check_column_rules, get_key_columns, primary_key_codes
+from comparator.hash_comparison import compare_records, get_compared_inputs
+from comparator.parallel_comparison import parallel_record_comparison, parallel_column_comparison
+from comparator.partitioned_comparison import partitioned_record_comparison
+from comparator.sorted_merge_comparison import sorted_merge_column_comparison
+from comparator.typed_comparison import reconcile_dtypes
 from comparision_checks.columnchecks import check_columns_length, check_columns_names
-from reports.comparison_reports import generate_record_comparison_report, generate_report
+from configs import config
+from reports.comparison_reports import generate_record_comparison_report, generate_report, get_matched_rows_limit, \
+    get_sample_rows
 from reports.response import RecordResponse, ColumnResponse
 from utils.ServerLogs import logger
-from utils.exceptions import ColumnsLengthMismatch, ColumnsNamesMismatch
+from utils.exceptions import ColumnsLengthMismatch, ColumnsNamesMismatch, InvalidComparisonEngine, \
+    DuplicatePrimaryKeys, InvalidColumnRule
+from utils.fixed_width_reader import MappedTextFile
 
 
 ###############Record comparision
-def handling_datatypes(src_df, tgt_df):
-    """Function to handle source and target data types"""
-    logger.info(f"datatypes are -{src_df.astype(object)}, {tgt_df.astype(object)}")
+def handling_datatypes(src_df, tgt_df, typed=False):
+    """Function to handle source and target data types, reconciled per column instead of cast to strings when typed"""
+    logger.info(f"datatypes are -{src_df.dtypes.astype(str).to_dict()}, {tgt_df.dtypes.astype(str).to_dict()}")
+    if typed:
+        return reconcile_dtypes(src_df, tgt_df)
     src_df1 = src_df.astype(str)
     tgt_df1 = tgt_df.astype(str)
     return src_df1, tgt_df1
@@ -37,15 +49,45 @@ def MeaningfulNames(name):
         return "Target"
 
 
-def dataframes_record_based_comparison(src_df, tgt_df, reportType):
-    """Function to compare dataframes based on record"""
+def merge_record_comparison(src_df1, tgt_df1):
+    """Function to compare records with an outer merge on all columns"""
+
+    # Making comparison dataframe
+    Comparison_df = src_df1.merge(tgt_df1, indicator=True, how='outer')
+
+    # Meaningful naming
+    Comparison_df['_merge'] = Comparison_df['_merge'].apply(
+        MeaningfulNames)
+    Comparison_df.rename(columns={'_merge': 'Record_type'}, inplace=True)
+
+    # Making required dataframes
+    Comparison_df = Comparison_df.sort_values(by='Record_type')
+    rows_Similar = Comparison_df[Comparison_df['Record_type'] == 'Matched']
+
+    rows_SminusT = Comparison_df[Comparison_df['Record_type'] == 'Source']
+
+    rows_TminusS = Comparison_df[Comparison_df['Record_type'] == 'Target']
+
+    return rows_Similar, rows_SminusT, rows_TminusS
+
+
+def dataframes_record_based_comparison(src_df, tgt_df, reportType, engine=None, multiset=False, typed=False):
+    """Function to compare dataframes based on record, as multisets of identical rows when requested"""
+
+    engine = engine or config.RECORD_COMPARISON_ENGINE
+    if engine == 'partitioned':
+        return partitioned_record_comparison(src_df, tgt_df, reportType, multiset)
 
     logger.info(f'{"*" * 50} "Record comparison started",{"*" * 50}')
-    target_cols = list(tgt_df.columns)
-    tgt_df.columns = src_df.columns  # Renaming target columns to maintain consistency
     record_response = RecordResponse()
     message = ''
     try:
+        if engine not in config.RECORD_COMPARISON_ENGINES:
+            raise InvalidComparisonEngine
+
+        src_df, tgt_df = get_compared_inputs(src_df, tgt_df, engine, multiset)
+        target_cols = list(tgt_df.columns)
+        tgt_df.columns = src_df.columns  # Renaming target columns to maintain consistency
 
         if not check_columns_length(src_df, tgt_df):
             raise ColumnsLengthMismatch
@@ -53,42 +95,44 @@ def dataframes_record_based_comparison(src_df, tgt_df, reportType):
         if not check_columns_names(src_df, tgt_df):
             raise ColumnsNamesMismatch
 
-        src_df, tgt_df = handling_datatypes(src_df, tgt_df)
-        src_df1 = src_df.replace(['<NA>'], ' ')
-        tgt_df1 = tgt_df.replace(['<NA>'], ' ')
+        # Mapped files are hashed straight from the map, see MappedTextFile.line_hashes
+        mapped = isinstance(src_df, MappedTextFile)
+        if not mapped:
+            src_df, tgt_df = handling_datatypes(src_df, tgt_df, typed)
+        if typed or mapped:
+            src_df1, tgt_df1 = src_df, tgt_df
+        else:
+            src_df1 = src_df.replace(['<NA>'], ' ')
+            tgt_df1 = tgt_df.replace(['<NA>'], ' ')
 
         # Number of rows in src and target
         nrow_src = src_df.shape[0]
         nrow_tgt = tgt_df.shape[0]
 
-        # Making comparison dataframe
-        Comparison_df = src_df1.merge(tgt_df1, indicator=True, how='outer')
-
-        # Meaningful naming
-        Comparison_df['_merge'] = Comparison_df['_merge'].apply(
-            MeaningfulNames)
-        Comparison_df.rename(columns={'_merge': 'Record_type'}, inplace=True)
-
-        # Making required dataframes
-        Comparison_df = Comparison_df.sort_values(by='Record_type')
-        rows_Similar = Comparison_df[Comparison_df['Record_type'] == 'Matched']
-
-        rows_SminusT = Comparison_df[Comparison_df['Record_type'] == 'Source']
-
-        rows_TminusS = Comparison_df[Comparison_df['Record_type'] == 'Target']
+        if engine == 'parallel':
+            rows_Similar, rows_SminusT, rows_TminusS, NoOfRows_Similar, NoOfsource_only, NoOftarget_only = \
+                parallel_record_comparison(src_df1, tgt_df1, get_matched_rows_limit(reportType), multiset)
+        elif engine == 'arrow':
+            rows_Similar, rows_SminusT, rows_TminusS, NoOfRows_Similar, NoOfsource_only, NoOftarget_only = \
+                arrow_record_comparison(src_df1, tgt_df1, get_matched_rows_limit(reportType), multiset)
+        elif engine == 'hash' or multiset:
+            rows_Similar, rows_SminusT, rows_TminusS, NoOfRows_Similar, NoOfsource_only, NoOftarget_only = \
+                compare_records(src_df1, tgt_df1, get_matched_rows_limit(reportType), config.RECORD_HASH_BITS,
+                                multiset)
+        else:
+            rows_Similar, rows_SminusT, rows_TminusS = merge_record_comparison(src_df1, tgt_df1)
+            NoOfRows_Similar = rows_Similar.shape[0]
+            NoOfsource_only = rows_SminusT.shape[0]
+            NoOftarget_only = rows_TminusS.shape[0]
 
         df_header = pd.DataFrame([rows_TminusS.columns.tolist()], columns=rows_SminusT.columns.tolist())
 
         diff_df = pd.concat([rows_SminusT, df_header, rows_TminusS])
 
-        target_cols.append('Record_type')
-        rows_TminusS.columns = target_cols
+        rows_TminusS.columns = target_cols + rows_TminusS.columns.tolist()[len(target_cols):]
 
-        # Number of rows
-        NoOfRows_Similar = rows_Similar.shape[0]
-        NoOfsource_only = rows_SminusT.shape[0]
-        NoOftarget_only = rows_TminusS.shape[0]
-        Mismatched_records = diff_df.shape[0]
+        # Number of rows, the mismatched report has a header row between source and target records
+        Mismatched_records = NoOfsource_only + NoOftarget_only + 1
 
         # Attribute names
         attribute_names = list(src_df.columns)
@@ -121,10 +165,10 @@ def dataframes_record_based_comparison(src_df, tgt_df, reportType):
                                                   Mismatched_records,
                                                   NoOfsource_only,
                                                   NoOftarget_only,
-                                                  rows_SminusT_r.values.tolist(),
-                                                  rows_TminusS_r.values.tolist(),
+                                                  get_sample_rows(rows_SminusT_r),
+                                                  get_sample_rows(rows_TminusS_r),
                                                   NoOfRows_Similar,
-                                                  rows_Similar_r.values.tolist(),
+                                                  get_sample_rows(rows_Similar_r),
                                                   attribute_names,
                                                   matched_file,
                                                   mismatched_file,
@@ -139,6 +183,9 @@ def dataframes_record_based_comparison(src_df, tgt_df, reportType):
     except TypeError:
         message = 'Invalid Report Type'
 
+    except InvalidComparisonEngine:
+        message = 'Invalid Comparison Engine'
+
     except ColumnsLengthMismatch:
         message = "Length of Source and target columns is different"
 
@@ -154,91 +201,52 @@ def dataframes_record_based_comparison(src_df, tgt_df, reportType):
 
 ##############Column comparision
 
-def dataframes_column_based_comparison(src, tgt, source_primary_key, reportType):
+def dataframes_column_based_comparison(src, tgt, source_primary_key, reportType, engine=None, typed=False,
+                                       column_rules=None):
     """Function to compare dataframes based on columns"""
 
+    engine = engine or config.COLUMN_COMPARISON_ENGINE
+    if engine == 'sorted':
+        return sorted_merge_column_comparison(src, tgt, source_primary_key, reportType, column_rules)
+
     logger.info(f"this came for column based comparison: {src.head()}")
     logger.info(tgt.head())
     response = ColumnResponse()
-    mismatch_data = {}
-    match_data = {}
-    mismatch_data_1000 = {}
-    column_wise_mismatch_dict = {}
-    total_count = 0
     tgt.columns = src.columns  # Renaming target columns to maintain consistency
 
     try:
+        if engine not in config.COLUMN_COMPARISON_ENGINES:
+            raise InvalidComparisonEngine
+
+        check_column_rules(column_rules or {})
+
         if not check_columns_length(src, tgt):
             raise ColumnsLengthMismatch
 
         if not check_columns_names(src, tgt):
             raise ColumnsNamesMismatch
 
-        src, tgt = handling_datatypes(src, tgt)
+        # Duplicate keys fail before the records are rendered and compared
+        key_codes = primary_key_codes(src, tgt, get_key_columns(source_primary_key))
+
+        src, tgt = handling_datatypes(src, tgt, typed)
         no_of_records_source = src.shape[0]
         no_of_records_target = tgt.shape[0]
-        src = src.replace(['<NA>'], '')
-        tgt = tgt.replace(['<NA>'], '')
-
-        # Setting primary key as index
-        source_pkey = source_primary_key
-
-        src.set_index(source_pkey, inplace=True)
-        tgt.set_index(source_pkey, inplace=True)
-
-        cols = src.columns
-
-        # Appending proper nomenclature
-        src.columns = [col + "_Source" for col in src.columns]
-        tgt.columns = [col + "_Target" for col in tgt.columns]
-
-        # Concatenation
-        df = pd.concat([src, tgt], axis=1, sort=False)
-
-        # Comparison
-        for col in cols:
-            df[col + "_Status"] = df[col + "_Source"] == df[col + "_Target"]
-
-        # Renaming
-        for col in cols:
-            df[col + "_Status"] = df[col +
-                                     "_Status"].apply(lambda x: "Matched" if x else "Mismatched")
-
-        # Reordering
-        order = []
-        for col in cols:
-            order += [col + "_Source", col + "_Target", col + "_Status"]
-        df = df[order]
+        if not typed:
+            src = src.replace(['<NA>'], '')
+            tgt = tgt.replace(['<NA>'], '')
 
-        # Reporting dictionary
-        for col in cols:
-            coldf = df[[col + "_Source", col + "_Target", col + "_Status"]]
-            df2 = df[[col + "_Source", col + "_Target", col + "_Status"]]
-            coldf = coldf[coldf[col + "_Status"] == "Mismatched"]
-
-            df2 = df2[df2[col + "_Status"] == "Matched"]
-            coldf["Primary Key"] = coldf.index
-            coldf = coldf[["Primary Key", col +
-                           "_Source", col + "_Target", col + "_Status"]]
-
-            df2["Primary Key"] = df2.index
-            df2 = df2[["Primary Key", col +
-                       "_Source", col + "_Target", col + "_Status"]]
-
-            coldf.fillna("", inplace=True)
-            mismatch_data[col] = coldf  # TODO
-
-            match_data[col] = df2
-
-            column_wise_mismatch_dict[col] = list(
-                coldf[col + "_Status"]).count("Mismatched")
-
-            total_count += column_wise_mismatch_dict[col]
+        if engine == 'parallel':
+            mismatch_data, match_data, column_wise_mismatch_dict, total_count = parallel_column_comparison(
+                src, tgt, source_primary_key, column_rules, get_matched_rows_limit(reportType))
+        else:
+            mismatch_data, match_data, column_wise_mismatch_dict, total_count = compare_columns(
+                src, tgt, source_primary_key, key_codes, column_rules, get_matched_rows_limit(reportType))
 
         logger.info("Comparison completed. Report generation started.")
 
         matched_csv, mismatched_excel = generate_report(
-            mismatch_data, match_data, reportType, df)
+            mismatch_data, match_data, reportType)
 
         response.get_instantiated_instance(total_count,
                                            column_wise_mismatch_dict,
@@ -261,8 +269,14 @@ def dataframes_column_based_comparison(src, tgt, source_primary_key, reportType)
 
     except ColumnsNamesMismatch:
         message = "Names of Source and target columns are different"
-    except InvalidIndexError:
-        message = 'primary Key has duplicate values'
+    except DuplicatePrimaryKeys as E:
+        message = f'primary Key has duplicate values - {E}'
+
+    except InvalidComparisonEngine:
+        message = 'Invalid Comparison Engine'
+
+    except InvalidColumnRule as E:
+        message = f'Invalid comparison rule for column {E}'
 
     except Exception as e:
         logger.error("Exception has occurred in Column comparison function ***" + str(e))
@@ -6,17 +6,22 @@ Use of this source code is governed by MIT license that can be found in the LICE
 https://opensource.org/licenses/MIT.
 '''
 
-import json
 import time
 
 import pandas as pd
-import pymongo
 
 from comparator.comparision import dataframes_record_based_comparison, \
     dataframes_column_based_comparison
+from comparator.checksum_pushdown import pushdown_checksums, empty_response, add_matched_rows
+from comparator.column_comparison import get_column_rules
+from comparator.f2dbcomparison_module import get_partitioning
+from comparator.partitioned_comparison import get_read_chunksize
+from comparision_checks.columnchecks import get_column_mapping
 from utils.ServerLogs import logger
+from utils.concurrent_fetch import fetch_concurrently, add_extraction_times
 from utils.connect_to_db import connect
-from utils.dataframes_utility import get_dataframe_from_table
+from utils.connection_pool import release_connection
+from utils.dataframes_utility import get_table_data
 from utils.db_connect import get_database_type, mysql_db_Obj, sql_server_db_obj, oracle_obj, \
     postgres_db_obj, drill_obj, \
     s4_hana_obj, mongo_client_obj
@@ -82,28 +87,33 @@ def prepare_datafrmaes_from_tables(request_data):
     else:
         raise Exception('Connection to database Failed , please retry after sometime')
 
-    if target_databaseType == 'Mysql':
-        target_connection = mysql_db_Obj(
-            target_database, target_connectionAlias)
-    elif target_databaseType == 'MsSql':
-        target_connection = sql_server_db_obj(
-            target_database, target_connectionAlias)
-    elif target_databaseType == 'Oracle':
-        target_connection = oracle_obj(target_connectionAlias)
-
-    elif target_databaseType == 'Postgresql':
-        target_connection = postgres_db_obj(
-            target_database, target_connectionAlias)
-
-    elif target_databaseType == 'MongoDB':
-        target_connection = mongo_client_obj(
-            target_database, target_connectionAlias)
-    elif target_databaseType == "Drill":
-        target_connection = drill_obj(target_connectionAlias)
-    elif target_databaseType == "Hana":
-        target_connection = s4_hana_obj(target_connectionAlias)
-    else:
-        raise Exception('Connection to database Failed , please retry after sometime')
+    # The source connection goes back to its pool when the target one can not be opened
+    try:
+        if target_databaseType == 'Mysql':
+            target_connection = mysql_db_Obj(
+                target_database, target_connectionAlias)
+        elif target_databaseType == 'MsSql':
+            target_connection = sql_server_db_obj(
+                target_database, target_connectionAlias)
+        elif target_databaseType == 'Oracle':
+            target_connection = oracle_obj(target_connectionAlias)
+
+        elif target_databaseType == 'Postgresql':
+            target_connection = postgres_db_obj(
+                target_database, target_connectionAlias)
+
+        elif target_databaseType == 'MongoDB':
+            target_connection = mongo_client_obj(
+                target_database, target_connectionAlias)
+        elif target_databaseType == "Drill":
+            target_connection = drill_obj(target_connectionAlias)
+        elif target_databaseType == "Hana":
+            target_connection = s4_hana_obj(target_connectionAlias)
+        else:
+            raise Exception('Connection to database Failed , please retry after sometime')
+    except Exception:
+        release_connection(source_connection)
+        raise
 
     return source_query, source_connection, target_query, target_connection
 
@@ -120,13 +130,14 @@ def db_to_db_comparison(request_data):
     if record_or_column == 'column' and source_primary_key == '':
         raise Exception('please submit primaryKey for column based comparison')
     reportType = request_data.get('reportType')
+    comparison_engine = request_data.get('comparisonEngine')
+    multiset = request_data.get('multisetComparison', False)
+    typed = request_data.get('typedComparison', False)
 
-    colMapping_temp = str(request_data.get('columnMapping'))
-    if not colMapping_temp:
+    colMapping = get_column_mapping(request_data.get('columnMapping'))
+    if not colMapping:
         raise Exception('Invalid Column Mappings')
 
-    colMapping_temp = colMapping_temp.replace("\'", "\"")
-    colMapping = json.loads(colMapping_temp)
     sourceMap = []
     targetMap = []
     for d in colMapping:
@@ -135,61 +146,79 @@ def db_to_db_comparison(request_data):
         if "targetColumn" in d:
             targetMap.append(d["targetColumn"])
 
+    source_partitioning = get_partitioning(request_data, 'source')
+    target_partitioning = get_partitioning(request_data, 'target')
     source_query, source_connection, target_query, target_connection = prepare_datafrmaes_from_tables(
         request_data)
 
-    if isinstance(source_connection, pymongo.database.Database):
-        logger.info("Trying to utils to Mongoinside db 2 db")
-        cursor = source_connection[request_data.get('sourceTableName')].find()
-        df = pd.DataFrame(list(cursor))
-
-        df1 = df.drop(columns=['_id'])
-        source_df = df1
-        source_df = source_df[sourceMap]
-
-    else:
-
-        source_df = get_dataframe_from_table(
-            source_query, source_connection, sourceMap)
-
-    if isinstance(target_connection, pymongo.database.Database):
-        logger.info("Trying to utils to Mongoinside db 2 db")
-        cursor = target_connection[request_data.get('targetTableName')].find()
-        df = pd.DataFrame(list(cursor))
-
-        df1 = df.drop(columns=['_id'])
-        target_df = df1
-        target_df = target_df[targetMap]
-
-    else:
-        target_df = get_dataframe_from_table(
-            target_query, target_connection, targetMap)
-
+    # Connections are checked out of their pools until the comparison has read all the rows
     try:
-        if source_df is None or target_df is None:
-            raise DataFrameReadError
-
-        if source_df.empty or target_df.empty:
-            raise Exception('Empty Source/Target - please check inputs')
-
-        target_df = target_df.replace("\r", "")
-
-        if record_or_column == "record":
-            message, response = dataframes_record_based_comparison(
-                source_df, target_df, reportType)
+        chunksize = get_read_chunksize(record_or_column, comparison_engine)
+
+        pushdown = bool(request_data.get('checksumPushdown'))
+        if pushdown:
+            # Only the rows of the buckets whose digests differ are read, see pushdown_checksums
+            source_query, target_query, matched_rows, matched_pairs, mismatched_buckets = pushdown_checksums(
+                (get_database_type(request_data.get('sourceDatabaseAlias')), source_query, source_connection,
+                 sourceMap),
+                (get_database_type(request_data.get('targetDatabaseAlias')), target_query, target_connection,
+                 targetMap),
+                request_data.get('checksumBuckets'))
+            pushdown = mismatched_buckets is not None
+        all_matched = pushdown and source_query is None
+
+        if all_matched:
+            # Every bucket matches, no row is read
+            source_df, target_df, extraction_times = None, None, {}
         else:
-            message, response = dataframes_column_based_comparison(
-                source_df, target_df, source_primary_key, reportType)
-
-        end_time = time.time()
-        time_elapsed = round((end_time - start_time), 2)
-        logger.info(f"Time Elapsed    -{time_elapsed}")
-
-    except DataFrameReadError:
-        end_time = time.time()
-        time_elapsed = round((end_time - start_time), 2)
-        logger.info("Query execution error is happening here.")
-        message = "Query Could Not be executed."
-        response = []
+            # Both sides usually come from different servers, they are read at the same time
+            source_df, target_df, extraction_times = fetch_concurrently(
+                lambda: get_table_data(source_query, source_connection, request_data.get('sourceTableName'),
+                                       sourceMap, chunksize, source_partitioning),
+                lambda: get_table_data(target_query, target_connection, request_data.get('targetTableName'),
+                                       targetMap, chunksize, target_partitioning))
+
+        try:
+            if all_matched:
+                message, response = 'success', empty_response(record_or_column, sourceMap, source_primary_key)
+            else:
+                if source_df is None or target_df is None:
+                    raise DataFrameReadError
+
+                # The rows of differing buckets may all be on one side
+                if not pushdown and any(isinstance(data_frame, pd.DataFrame) and data_frame.empty
+                                        for data_frame in (source_df, target_df)):
+                    raise Exception('Empty Source/Target - please check inputs')
+
+                if isinstance(target_df, pd.DataFrame):
+                    target_df = target_df.replace("\r", "")
+                else:
+                    target_df = (chunk.replace("\r", "") for chunk in target_df)
+
+                if record_or_column == "record":
+                    message, response = dataframes_record_based_comparison(
+                        source_df, target_df, reportType, comparison_engine, multiset, typed)
+                else:
+                    message, response = dataframes_column_based_comparison(
+                        source_df, target_df, source_primary_key, reportType, comparison_engine, typed,
+                        get_column_rules(colMapping))
+            if pushdown:
+                response = add_matched_rows(response, record_or_column, matched_rows, matched_pairs, mismatched_buckets,
+                                            multiset)
+            response = add_extraction_times(response, extraction_times)
+
+            end_time = time.time()
+            time_elapsed = round((end_time - start_time), 2)
+            logger.info(f"Time Elapsed    -{time_elapsed}")
+
+        except DataFrameReadError:
+            end_time = time.time()
+            time_elapsed = round((end_time - start_time), 2)
+            logger.info("Query execution error is happening here.")
+            message = "Query Could Not be executed."
+            response = []
+    finally:
+        release_connection(source_connection)
+        release_connection(target_connection)
 
     return message, response, time_elapsed
@@ -6,25 +6,29 @@ Use of this source code is governed by MIT license that can be found in the LICE
 https://opensource.org/licenses/MIT.
 '''
 
-import json
 import time
 
 import pandas as pd
-import pymongo
 
 from comparator.comparision import dataframes_record_based_comparison, \
     dataframes_column_based_comparison
+from comparator.column_comparison import get_column_rules
+from comparator.partitioned_comparison import get_read_chunksize
+from comparision_checks.columnchecks import get_column_mapping
 from comparision_checks.conversion_check import is_csv_conversion_required, get_dataframes
 from comparision_checks.convert_module import convert
 from utils.ServerLogs import logger
+from utils.concurrent_fetch import fetch_concurrently, add_extraction_times
 from utils.connect_to_db import connect
-from utils.dataframes_utility import get_dataframe_from_file, get_dataframe_from_table
+from utils.connection_pool import release_connection
+from utils.dataframes_utility import get_dataframe_from_file, get_table_data
 from utils.db_connect import get_database_type, mysql_db_Obj, sql_server_db_obj, oracle_obj, \
     postgres_db_obj, mongo_client_obj, drill_obj, s4_hana_obj
 from utils.exceptions import DataFrameReadError
+from utils.partitioned_extraction import PARTITIONED_EXTRACTION_DBS
 
 
-def check_for_conversion(request_data, src_columns):
+def check_for_conversion(request_data, src_columns, chunksize=None):
     """Function to check for source file conversion"""
 
     source_file = request_data.get('sourceFilePath')
@@ -33,16 +37,22 @@ def check_for_conversion(request_data, src_columns):
     source_tag = request_data.get('sourceTag')
 
     if (request_data.get('sourceDatabaseAlias') in ["", None]):
-        if is_csv_conversion_required(source_type):
+        if is_csv_conversion_required(source_type, request_data.get('convertToCsv', False)):
             source_file, status = convert(
                 None, source_file, source_type, source_delim, source_tag)
+            source_type, source_delim = 'csv', ','
 
-        source_df = get_dataframes(source_file, source_type, src_columns, source_delim)
+        source_df = get_dataframes(source_file, source_type, src_columns, source_delim, chunksize,
+                                   request_data.get('sourceParquetFilter'), source_tag,
+                                   request_data.get('sourceLayout'))
 
     else:
         source_query, source_connection = prepare_dataframes_from_tables_source(request_data)
-        source_df = get_dataframe_from_file(
-            source_query, source_connection, source_delim, source_file, src_columns)
+        try:
+            source_df = get_dataframe_from_file(
+                source_query, source_connection, source_delim, source_file, src_columns)
+        finally:
+            release_connection(source_connection)
     return source_df
 
 
@@ -129,6 +139,36 @@ def prepare_dataframes_from_tables_new(databaseType, database, connectionAlias):
     return connection
 
 
+def get_partitioning(request_data, side):
+    """Function to get the partitioned extraction asked for the source or the target of a request
+
+    Returns:
+        Partition column, bounds, number of partitions and connection function of the side, None when the
+        side is read with one query
+
+    """
+    partition_column = request_data.get(f'{side}PartitionColumn')
+    if not partition_column:
+        return None
+
+    if request_data.get('record_or_column') == 'column' and get_read_chunksize('column',
+                                                                              request_data.get('comparisonEngine')):
+        # Ranges are read one after another, the rows would not be in the order of the primary key
+        raise Exception('Partition columns can not be used with the sorted comparison engine')
+
+    connectionAlias = request_data.get(f'{side}DatabaseAlias')
+    database = request_data.get(f'{side}Databse') or request_data.get(f'{side}Database')
+    databaseType = get_database_type(connectionAlias)
+    if databaseType not in PARTITIONED_EXTRACTION_DBS:
+        logger.info(f"Partitioned extraction is not supported for {databaseType}, the {side} is read with one query")
+        return None
+
+    return {'partition_column': partition_column,
+            'bounds': request_data.get(f'{side}PartitionBounds'),
+            'no_of_partitions': request_data.get('extractionPartitions'),
+            'connect': lambda: prepare_dataframes_from_tables_new(databaseType, database, connectionAlias)}
+
+
 def file_to_db_comparison_new(request_data):
     """Function for file to db comparision"""
 
@@ -142,9 +182,10 @@ def file_to_db_comparison_new(request_data):
         raise Exception('please submit primaryKey for column based comparison')
 
     reportType = request_data.get('reportType')
-    colMapping_temp = str(request_data.get('columnMapping'))
-    colMapping_temp = colMapping_temp.replace("\'", "\"")
-    colMapping = json.loads(colMapping_temp)
+    comparison_engine = request_data.get('comparisonEngine')
+    multiset = request_data.get('multisetComparison', False)
+    typed = request_data.get('typedComparison', False)
+    colMapping = get_column_mapping(request_data.get('columnMapping'))
     sourceMap = []
     targetMap = []
 
@@ -158,59 +199,59 @@ def file_to_db_comparison_new(request_data):
 
     source_type = request_data.get('sourceFileType')
 
-    source_df = check_for_conversion(request_data, sourceMap)
-
+    chunksize = get_read_chunksize(record_or_column, comparison_engine)
+    target_partitioning = get_partitioning(request_data, 'target')
     target_query, target_connection = prepare_datafrmaes_from_tables(
         request_data)
 
-    if isinstance(target_connection, pymongo.database.Database):
-        logger.info("Trying to utils to Mongoinside db 2 db")
-        cursor = target_connection[request_data.get('targetTableName')].find()
-        df = pd.DataFrame(list(cursor))
-
-        df1 = df.drop(columns=['_id'])
-        target_df = df1
-        target_df = target_df[targetMap]
-
-    else:
-        target_df = get_dataframe_from_table(
-            target_query, target_connection, targetMap)
-
-    source_df = pd.DataFrame(source_df)
-    target_df = pd.DataFrame(target_df)
-
-    logger.info("Source df from File to DB:")
-    logger.info(source_df)
-    logger.info("Target df from File to DB:")
-    logger.info(target_df)
-
+    # The target connection is checked out of its pool until the comparison has read all the rows
     try:
-        if target_df is None or source_df is None:
-            raise DataFrameReadError
-        if source_df.empty or target_df.empty:
-            raise Exception('Empty Source/Target - please check inputs')
-
-        if record_or_column == "record":
-            message, response = dataframes_record_based_comparison(
-                source_df, target_df, reportType)
-        else:
-            message, response = dataframes_column_based_comparison(
-                source_df, target_df, source_primary_key, reportType)
-
-        end_time = time.time()
-        time_elapsed = round((end_time - start_time), 2)
-        logger.info(f"Time Elapsed    -{time_elapsed}")
-
-    except DataFrameReadError:
-        message = "Query Could Not be executed."
-        response = []
-        end_time = time.time()
-        time_elapsed = round((end_time - start_time), 2)
-
-    except Exception as E:
-        message = f'Internal Error Occured - {E}'
-        logger.error(f"This exception occurred in F2DB:-{E}")
-        end_time = time.time()
-        time_elapsed = round((end_time - start_time), 2)
+        # The file and the table are read at the same time
+        source_df, target_df, extraction_times = fetch_concurrently(
+            lambda: check_for_conversion(request_data, sourceMap, chunksize),
+            lambda: get_table_data(target_query, target_connection, request_data.get('targetTableName'), targetMap,
+                                   chunksize, target_partitioning))
+
+        if not chunksize:
+            source_df = pd.DataFrame(source_df)
+            target_df = pd.DataFrame(target_df)
+
+            logger.info("Source df from File to DB:")
+            logger.info(source_df)
+            logger.info("Target df from File to DB:")
+            logger.info(target_df)
+
+        try:
+            if target_df is None or source_df is None:
+                raise DataFrameReadError
+            if any(isinstance(data_frame, pd.DataFrame) and data_frame.empty for data_frame in (source_df, target_df)):
+                raise Exception('Empty Source/Target - please check inputs')
+
+            if record_or_column == "record":
+                message, response = dataframes_record_based_comparison(
+                    source_df, target_df, reportType, comparison_engine, multiset, typed)
+            else:
+                message, response = dataframes_column_based_comparison(
+                    source_df, target_df, source_primary_key, reportType, comparison_engine, typed,
+                    get_column_rules(colMapping))
+            response = add_extraction_times(response, extraction_times)
+
+            end_time = time.time()
+            time_elapsed = round((end_time - start_time), 2)
+            logger.info(f"Time Elapsed    -{time_elapsed}")
+
+        except DataFrameReadError:
+            message = "Query Could Not be executed."
+            response = []
+            end_time = time.time()
+            time_elapsed = round((end_time - start_time), 2)
+
+        except Exception as E:
+            message = f'Internal Error Occured - {E}'
+            logger.error(f"This exception occurred in F2DB:-{E}")
+            end_time = time.time()
+            time_elapsed = round((end_time - start_time), 2)
+    finally:
+        release_connection(target_connection)
 
     return message, response, time_elapsed
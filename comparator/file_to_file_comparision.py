@@ -6,24 +6,24 @@ Use of this source code is governed by MIT license that can be found in the LICE
 https://opensource.org/licenses/MIT.
 '''
 
-import json
 import time
 
 from comparator.comparision import dataframes_record_based_comparison, \
     dataframes_column_based_comparison
+from comparator.column_comparison import get_column_rules
+from comparator.hash_comparison import uses_row_hashes
+from comparator.partitioned_comparison import get_read_chunksize
+from comparision_checks.columnchecks import get_column_mapping
 from comparision_checks.conversion_check import is_csv_conversion_required, get_dataframes
 from comparision_checks.convert_module import convert
 from utils.ServerLogs import logger
 from utils.exceptions import DataFrameReadError
 
 
-def check_for_file_conversion(request_data):
-    """Function to get source and target dataframes from file"""
+def check_for_file_conversion(request_data, chunksize=None, mapped=False):
+    """Function to get source and target dataframes from file, DAT files are left memory mapped when mapped is set"""
 
-    colMapping_temp = str(request_data.get('columnMapping'))
-    colMapping_temp = colMapping_temp.replace("\'", "\"")
-
-    colMapping = json.loads(colMapping_temp)
+    colMapping = get_column_mapping(request_data.get('columnMapping'))
     sourceMap = []
     targetMap = []
     for d in colMapping:
@@ -36,34 +36,40 @@ def check_for_file_conversion(request_data):
     source_type = request_data.get('sourceFileType')
     source_delim = request_data.get('sourceDelimiter')
     source_tag = request_data.get('sourceTag')
+    source_layout = request_data.get('sourceLayout')
     src_columns = sourceMap
 
     target_file = request_data.get('targetFilePath')
     target_type = request_data.get('targetFileType')
     target_delim = request_data.get('targetDelimiter')
     target_tag = request_data.get('targetTag')
+    target_layout = request_data.get('targetLayout')
 
     tgt_columns = targetMap
     if (request_data.get('sourceDatabaseAlias') in ["", None]):
 
-        if is_csv_conversion_required(source_type):
+        if is_csv_conversion_required(source_type, request_data.get('convertToCsv', False)):
             logger.info("======================conversion Happening===============")
             source_file, status = convert(
                 None, source_file, source_type, source_delim, source_tag)
+            source_type, source_delim = 'csv', ','
 
         source_df = get_dataframes(
-            source_file, source_type, src_columns, source_delim)
+            source_file, source_type, src_columns, source_delim, chunksize,
+            request_data.get('sourceParquetFilter'), source_tag, source_layout, mapped)
     else:
         raise Exception('DataBase Url provided for file')
 
     if (request_data.get('targetDatabaseAlias') in ["", None]):
-        if is_csv_conversion_required(target_type):
+        if is_csv_conversion_required(target_type, request_data.get('convertToCsv', False)):
             logger.info("======================conversion Happening===============")
             target_file, status = convert(
                 None, target_file, target_type, target_delim, target_tag)
+            target_type, target_delim = 'csv', ','
 
         target_df = get_dataframes(
-            target_file, target_type, tgt_columns, target_delim)
+            target_file, target_type, tgt_columns, target_delim, chunksize,
+            request_data.get('targetParquetFilter'), target_tag, target_layout, mapped)
     else:
         raise Exception('DataBase Url provided for file')
 
@@ -78,13 +84,18 @@ def file_to_file_comparison(request_data):
 
     record_or_column = request_data.get('record_or_column')
     reportType = request_data.get('reportType')
+    comparison_engine = request_data.get('comparisonEngine')
+    multiset = request_data.get('multisetComparison', False)
+    typed = request_data.get('typedComparison', False)
 
     source_primary_key = request_data.get('primaryKey')
 
     if record_or_column == 'column' and (source_primary_key == ''):
         raise Exception('please submit primaryKey for column based comparison')
 
-    source_df, target_df = check_for_file_conversion(request_data)
+    source_df, target_df = check_for_file_conversion(
+        request_data, get_read_chunksize(record_or_column, comparison_engine),
+        record_or_column == 'record' and uses_row_hashes(comparison_engine, multiset))
 
     response = []
     message = None
@@ -95,11 +106,12 @@ def file_to_file_comparison(request_data):
 
         if record_or_column == "record":
             message, response = dataframes_record_based_comparison(
-                source_df, target_df, reportType)
+                source_df, target_df, reportType, comparison_engine, multiset, typed)
         else:
 
             message, response = dataframes_column_based_comparison(
-                source_df, target_df, source_primary_key, reportType)
+                source_df, target_df, source_primary_key, reportType, comparison_engine, typed,
+                get_column_rules(get_column_mapping(request_data.get('columnMapping'))))
 
         end_time = time.time()
         time_elapsed = round((end_time - start_time), 2)
@@ -0,0 +1,238 @@
+'''
+Copyright 2024 Infosys Ltd.
+
+Use of this source code is governed by MIT license that can be found in the LICENSE file or at
+
+https://opensource.org/licenses/MIT.
+'''
+
+import numpy as np
+import pandas as pd
+
+from configs import config
+from utils.ServerLogs import logger
+from utils.fixed_width_reader import MappedTextFile
+
+# One 16 character key per 64 bits of row hash
+HASH_KEYS = ('0123456789123456', 'IDVeX-record-key')
+
+# Occurrence columns added to the records of a multiset comparison
+MULTISET_COUNT_COLUMNS = ['Source_Count', 'Target_Count']
+
+
+def uses_row_hashes(engine, multiset=False):
+    """Function to check if a record comparison is done by compare_records"""
+    engine = engine or config.RECORD_COMPARISON_ENGINE
+    return engine not in ('partitioned', 'parallel', 'arrow') and (engine == 'hash' or bool(multiset))
+
+
+def get_compared_inputs(src_df, tgt_df, engine, multiset=False):
+    """Function to keep mapped files for a comparison by row hash of both mapped sides, other comparisons get
+    dataframes"""
+    if isinstance(src_df, MappedTextFile) and isinstance(tgt_df, MappedTextFile) and uses_row_hashes(engine, multiset):
+        return src_df, tgt_df
+    if isinstance(src_df, MappedTextFile):
+        src_df = src_df.to_dataframe()
+    if isinstance(tgt_df, MappedTextFile):
+        tgt_df = tgt_df.to_dataframe()
+    return src_df, tgt_df
+
+
+def row_hashes(data_frame, hash_key=HASH_KEYS[0]):
+    """Function to get a vectorized 64 bit hash for every record of a dataframe, or of the lines of a mapped file"""
+    if isinstance(data_frame, MappedTextFile):
+        return data_frame.line_hashes(hash_key)
+    return pd.util.hash_pandas_object(data_frame, index=False, hash_key=hash_key).to_numpy()
+
+
+def row_group_ids(src_df, tgt_df, hash_bits=64):
+    """Function to map identical source and target records to the same dense group id
+
+    Args:
+        src_df: Source dataframe
+        tgt_df: Target dataframe with the same column order as the source
+        hash_bits: Width of the row hash, 64 or 128
+
+    Returns:
+        Group ids of the source records, group ids of the target records, number of groups
+
+    """
+    hash_bits = int(hash_bits)
+    if hash_bits not in (64, 128):
+        raise ValueError(f'Unsupported row hash width - {hash_bits}')
+
+    no_of_source_rows = len(src_df)
+    group_ids = None
+    for hash_key in HASH_KEYS[:hash_bits // 64]:
+        hashes = np.concatenate([row_hashes(src_df, hash_key), row_hashes(tgt_df, hash_key)])
+        codes, uniques = pd.factorize(hashes)
+        if group_ids is None:
+            group_ids = codes
+        else:
+            # Combining the codes of both halves keeps the ids dense and int64
+            group_ids = pd.factorize(group_ids * len(uniques) + codes)[0]
+
+    no_of_groups = int(group_ids.max()) + 1 if len(group_ids) else 0
+    return group_ids[:no_of_source_rows], group_ids[no_of_source_rows:], no_of_groups
+
+
+def hash_record_comparison(src_df, tgt_df, matched_limit=None, hash_bits=64):
+    """Function to compare records by row hash instead of a full outer merge
+
+    The counts and rows are the same as the ones of the outer merge on all columns, a record present
+    `a` times in source and `b` times in target is reported `a * b` times as matched. Only the
+    records which are needed for the reports are materialized.
+
+    Args:
+        src_df: Source dataframe
+        tgt_df: Target dataframe with the same column names as the source
+        matched_limit: Maximum number of matched rows to materialize, None for all
+        hash_bits: Width of the row hash, 64 or 128
+
+    Returns:
+        Matched rows, source only rows, target only rows, number of matched rows,
+        number of source only rows, number of target only rows
+
+    """
+    src_ids, tgt_ids, no_of_groups = row_group_ids(src_df, tgt_df, hash_bits)
+
+    src_counts = np.bincount(src_ids, minlength=no_of_groups)
+    tgt_counts = np.bincount(tgt_ids, minlength=no_of_groups)
+    logger.info(f"Hash comparison - {no_of_groups} distinct records")
+
+    # Occurrences of every record on the other side
+    return records_from_counts(src_df, tgt_df, tgt_counts[src_ids], src_counts[tgt_ids], matched_limit)
+
+
+def records_from_counts(src_df, tgt_df, src_in_tgt, tgt_in_src, matched_limit=None):
+    """Function to materialize the compared records from the occurrences of every record on the other side
+
+    Args:
+        src_df: Source dataframe
+        tgt_df: Target dataframe
+        src_in_tgt: Occurrences of every source record in target
+        tgt_in_src: Occurrences of every target record in source
+        matched_limit: Maximum number of matched rows to materialize, None for all
+
+    Returns:
+        Matched rows, source only rows, target only rows, number of matched rows,
+        number of source only rows, number of target only rows
+
+    """
+    matched_count = int(src_in_tgt.sum())
+    matched_positions = np.flatnonzero(src_in_tgt)
+    repeats = src_in_tgt[matched_positions]
+    if matched_limit is not None:
+        cut = np.searchsorted(np.cumsum(repeats), matched_limit, side='left') + 1
+        matched_positions = matched_positions[:cut]
+        repeats = repeats[:cut]
+
+    rows_Similar = take_records(src_df, np.repeat(matched_positions, repeats), 'Matched')
+    if matched_limit is not None:
+        rows_Similar = rows_Similar.head(matched_limit)
+
+    rows_SminusT = take_records(src_df, np.flatnonzero(src_in_tgt == 0), 'Source')
+    rows_TminusS = take_records(tgt_df, np.flatnonzero(tgt_in_src == 0), 'Target')
+
+    return rows_Similar, rows_SminusT, rows_TminusS, matched_count, len(rows_SminusT), len(rows_TminusS)
+
+
+def multiset_record_comparison(src_df, tgt_df, matched_limit=None, hash_bits=64):
+    """Function to compare records as multisets of identical rows
+
+    Identical records are grouped once with their number of occurrences on each side. A record present
+    `a` times in source and `b` times in target counts `min(a, b)` times as matched and `a - b` times as
+    additional in source when `a > b`. Every group is reported once with its source and target counts.
+
+    Args:
+        src_df: Source dataframe
+        tgt_df: Target dataframe with the same column names as the source
+        matched_limit: Maximum number of matched groups to materialize, None for all
+        hash_bits: Width of the row hash, 64 or 128
+
+    Returns:
+        Matched groups, source only groups, target only groups, number of matched rows,
+        number of source only rows, number of target only rows
+
+    """
+    src_ids, tgt_ids, no_of_groups = row_group_ids(src_df, tgt_df, hash_bits)
+
+    src_counts = np.bincount(src_ids, minlength=no_of_groups)
+    tgt_counts = np.bincount(tgt_ids, minlength=no_of_groups)
+    src_first = first_positions(src_ids, no_of_groups)
+    tgt_first = first_positions(tgt_ids, no_of_groups)
+    logger.info(f"Multiset comparison - {no_of_groups} distinct records")
+
+    return groups_from_counts(src_df, tgt_df, src_first, tgt_first, src_counts, tgt_counts, matched_limit)
+
+
+def groups_from_counts(src_df, tgt_df, src_first, tgt_first, src_counts, tgt_counts, matched_limit=None):
+    """Function to materialize the compared groups of identical records from their occurrence counts
+
+    Args:
+        src_df: Source dataframe
+        tgt_df: Target dataframe
+        src_first: First source position of every group, -1 when absent
+        tgt_first: First target position of every group, -1 when absent
+        src_counts: Occurrences of every group in source
+        tgt_counts: Occurrences of every group in target
+        matched_limit: Maximum number of matched groups to materialize, None for all
+
+    Returns:
+        Matched groups, source only groups, target only groups, number of matched rows,
+        number of source only rows, number of target only rows
+
+    """
+    matched_counts = np.minimum(src_counts, tgt_counts)
+    extra_counts = src_counts - tgt_counts
+
+    # Group ids follow the order of first appearance, source records first
+    matched_groups = np.flatnonzero(matched_counts)
+    if matched_limit is not None:
+        matched_groups = matched_groups[:matched_limit]
+    source_groups = np.flatnonzero(extra_counts > 0)
+    target_groups = np.flatnonzero(extra_counts < 0)
+
+    rows_Similar = take_groups(src_df, src_first, matched_groups, src_counts, tgt_counts, 'Matched')
+    rows_SminusT = take_groups(src_df, src_first, source_groups, src_counts, tgt_counts, 'Source')
+    rows_TminusS = take_groups(tgt_df, tgt_first, target_groups, src_counts, tgt_counts, 'Target')
+
+    return (rows_Similar, rows_SminusT, rows_TminusS, int(matched_counts.sum()),
+            int(extra_counts[source_groups].sum()), int(-extra_counts[target_groups].sum()))
+
+
+def compare_records(src_df, tgt_df, matched_limit=None, hash_bits=64, multiset=False):
+    """Function to compare records by row hash, as multisets when requested"""
+    if multiset:
+        return multiset_record_comparison(src_df, tgt_df, matched_limit, hash_bits)
+    return hash_record_comparison(src_df, tgt_df, matched_limit, hash_bits)
+
+
+def first_positions(group_ids, no_of_groups):
+    """Function to get the first position of every group, -1 for the groups which are absent"""
+    positions = np.full(no_of_groups, -1, dtype=np.int64)
+    positions[group_ids[::-1]] = np.arange(len(group_ids) - 1, -1, -1)
+    return positions
+
+
+def take_groups(data_frame, first, groups, src_counts, tgt_counts, record_type):
+    """Function to materialize one record per group with its occurrence counts and record type"""
+    records = take_rows(data_frame, first[groups])
+    records[MULTISET_COUNT_COLUMNS[0]] = src_counts[groups]
+    records[MULTISET_COUNT_COLUMNS[1]] = tgt_counts[groups]
+    records['Record_type'] = record_type
+    return records
+
+
+def take_records(data_frame, positions, record_type):
+    """Function to materialize the records at the given positions with their record type"""
+    records = take_rows(data_frame, positions)
+    records['Record_type'] = record_type
+    return records
+
+
+def take_rows(data_frame, positions):
+    """Function to get the rows at the given positions as a dataframe, only those lines of a mapped file are sliced"""
+    if isinstance(data_frame, MappedTextFile):
+        return data_frame.take(positions)
+    return data_frame.iloc[positions].reset_index(drop=True)
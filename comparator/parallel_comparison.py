@@ -0,0 +1,175 @@
+'''
+Copyright 2024 Infosys Ltd.
+
+Use of this source code is governed by MIT license that can be found in the LICENSE file or at
+
+https://opensource.org/licenses/MIT.
+'''
+
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+
+from comparator.column_comparison import compare_columns, get_key_columns
+from comparator.hash_comparison import compare_records, row_hashes
+from configs import config
+from utils.ServerLogs import logger
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def get_no_of_workers():
+    """Function to get the number of comparison worker processes"""
+    return int(config.COMPARISON_WORKERS or os.cpu_count() or 1)
+
+
+def get_process_pool():
+    """Function to get the process pool shared by the comparisons of this server process
+
+    Workers are started with PROCESS_POOL_START_METHOD, not forked from the threads of the server.
+    """
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(
+                max_workers=get_no_of_workers(),
+                mp_context=multiprocessing.get_context(config.PROCESS_POOL_START_METHOD))
+        return _process_pool
+
+
+def reset_process_pool(broken_pool):
+    """Function to drop a pool broken by a worker which died, e.g. killed when out of memory, the next
+    get_process_pool starts a new one"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is broken_pool:
+            _process_pool = None
+    broken_pool.shutdown(wait=False, cancel_futures=True)
+
+
+def map_in_pool(function, tasks, in_flight=None):
+    """Function to run function with every argument tuple of tasks in the process pool
+
+    At most in_flight tasks, twice the number of workers by default, are submitted at a time, and a result is
+    dropped by the pool once it is read, so a caller which reads the results one at a time holds only a few
+    of them. When the pool breaks, it is replaced and the tasks whose results were not read yet are submitted
+    once more, a second break is raised.
+
+    Returns:
+        Iterator of the results, in the order of the tasks
+
+    """
+    tasks = list(tasks)
+    in_flight = int(in_flight or 2 * get_no_of_workers())
+
+    def results():
+        """Read the results, resubmitting the remaining tasks once to a new pool"""
+        pool = get_process_pool()
+        pending = deque()
+        submitted = 0
+        retried = False
+        while pending or submitted < len(tasks):
+            try:
+                while len(pending) < in_flight and submitted < len(tasks):
+                    pending.append(pool.submit(function, *tasks[submitted]))
+                    submitted += 1
+                result = pending[0].result()
+            except BrokenProcessPool:
+                reset_process_pool(pool)
+                if retried:
+                    raise
+                retried = True
+                logger.error("A worker process of the process pool died, the remaining tasks run in a new pool")
+                submitted -= len(pending)
+                pending.clear()
+                pool = get_process_pool()
+                continue
+            pending.popleft()
+            yield result
+
+    return results()
+
+
+def split_partitions(data_frame, hashes, no_of_partitions):
+    """Function to split a dataframe into partitions by hash, keeping the row order inside a partition"""
+    partitions = (hashes % np.uint64(no_of_partitions)).astype(np.int64)
+    order = np.argsort(partitions, kind='stable')
+    bounds = np.searchsorted(partitions[order], np.arange(no_of_partitions + 1))
+    return [data_frame.iloc[order[bounds[i]:bounds[i + 1]]] for i in range(no_of_partitions)]
+
+
+def run_partitions(function, partition_pairs, *args):
+    """Function to run a comparison on every partition pair, in the process pool for large inputs"""
+    no_of_rows = sum(len(src) + len(tgt) for src, tgt in partition_pairs)
+    if len(partition_pairs) == 1 or no_of_rows < int(config.PARALLEL_MIN_ROWS):
+        return [function(src, tgt, *args) for src, tgt in partition_pairs]
+
+    logger.info(f"Comparing {no_of_rows} rows in {len(partition_pairs)} parallel partitions")
+    return list(map_in_pool(function, [(src, tgt, *args) for src, tgt in partition_pairs]))
+
+
+def parallel_record_comparison(src_df, tgt_df, matched_limit=None, multiset=False):
+    """Function to compare records on all cores, partitioned by row hash
+
+    Args:
+        src_df: Source dataframe rendered as strings
+        tgt_df: Target dataframe rendered as strings, with the source column names
+        matched_limit: Maximum number of matched rows to materialize, None for all
+        multiset: Compare the records as multisets of identical rows
+
+    Returns:
+        Matched rows, source only rows, target only rows, number of matched rows,
+        number of source only rows, number of target only rows
+
+    """
+    no_of_partitions = get_no_of_workers()
+    partition_pairs = list(zip(split_partitions(src_df, row_hashes(src_df), no_of_partitions),
+                               split_partitions(tgt_df, row_hashes(tgt_df), no_of_partitions)))
+
+    results = run_partitions(compare_records, partition_pairs, matched_limit, config.RECORD_HASH_BITS, multiset)
+
+    rows_Similar = pd.concat([result[0] for result in results], ignore_index=True)
+    if matched_limit is not None:
+        rows_Similar = rows_Similar.head(matched_limit)
+    rows_SminusT = pd.concat([result[1] for result in results], ignore_index=True)
+    rows_TminusS = pd.concat([result[2] for result in results], ignore_index=True)
+
+    return (rows_Similar, rows_SminusT, rows_TminusS, sum(result[3] for result in results),
+            sum(result[4] for result in results), sum(result[5] for result in results))
+
+
+def parallel_column_comparison(src, tgt, source_pkey, column_rules=None, matched_limit=None):
+    """Function to compare columns on all cores, partitioned by primary key hash
+
+    Args:
+        src: Source dataframe rendered as strings
+        tgt: Target dataframe rendered as strings, with the source column names
+        source_pkey: Primary key column or columns
+        column_rules: Comparison rules per column
+        matched_limit: Maximum number of matched cells to materialize, None for all
+
+    Returns:
+        Mismatched cells, matched cells, mismatch count per column, total mismatch count
+
+    """
+    key_columns = get_key_columns(source_pkey)
+    no_of_partitions = get_no_of_workers()
+    partition_pairs = list(zip(split_partitions(src, row_hashes(src[key_columns]), no_of_partitions),
+                               split_partitions(tgt, row_hashes(tgt[key_columns]), no_of_partitions)))
+
+    results = run_partitions(compare_columns, partition_pairs, source_pkey, None, column_rules, matched_limit)
+
+    mismatch_data = pd.concat([result[0] for result in results], ignore_index=True)
+    match_data = pd.concat([result[1] for result in results], ignore_index=True)
+    if matched_limit is not None:
+        match_data = match_data.head(matched_limit)
+    column_wise_mismatch_dict = {col: sum(result[2][col] for result in results) for col in results[0][2]}
+
+    return mismatch_data, match_data, column_wise_mismatch_dict, sum(result[3] for result in results)
@@ -0,0 +1,386 @@
+'''
+Copyright 2024 Infosys Ltd.
+
+Use of this source code is governed by MIT license that can be found in the LICENSE file or at
+
+https://opensource.org/licenses/MIT.
+'''
+
+import itertools
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from comparator.hash_comparison import compare_records, row_hashes, groups_from_counts, take_records, \
+    MULTISET_COUNT_COLUMNS
+from comparision_checks.columnchecks import check_columns_length, check_columns_names
+from configs import config
+from reports.comparison_reports import RecordReportWriter, get_matched_rows_limit, get_sample_rows, \
+    RESPONSE_SAMPLE_ROWS
+from reports.response import RecordResponse
+from utils.ServerLogs import logger
+from utils.exceptions import ColumnsLengthMismatch, ColumnsNamesMismatch
+
+# Approximate size of a python string object held by a pandas object column
+PY_OBJECT_BYTES = 64
+
+# Working memory of the hash comparison relative to the size of the compared partitions
+MEMORY_OVERHEAD_FACTOR = 4
+
+
+def get_read_chunksize(record_or_column, comparison_engine):
+    """Function to get the number of rows per read chunk, None when the inputs are read at once"""
+    if record_or_column == 'column':
+        engine = comparison_engine or config.COLUMN_COMPARISON_ENGINE
+    else:
+        engine = comparison_engine or config.RECORD_COMPARISON_ENGINE
+    if (record_or_column, engine) in (('record', 'partitioned'), ('column', 'sorted')):
+        return int(config.READ_CHUNK_ROWS)
+    return None
+
+
+def peek_chunks(data, chunk_rows):
+    """Function to get the first chunk of a dataframe or of an iterable of dataframes
+
+    Args:
+        data: Dataframe or iterable of dataframes
+        chunk_rows: Number of rows per chunk when a dataframe is given
+
+    Returns:
+        First chunk, iterator over all the chunks including the first one
+
+    """
+    if isinstance(data, pd.DataFrame):
+        chunks = (data.iloc[start:start + chunk_rows] for start in range(0, max(len(data), 1), chunk_rows))
+    else:
+        chunks = iter(data)
+
+    first_chunk = next(chunks, None)
+    if first_chunk is None:
+        raise ValueError('No data to compare')
+    return first_chunk, itertools.chain([first_chunk], chunks)
+
+
+def prepare_records(chunk, columns):
+    """Function to render a chunk the same way as the in-memory record comparison"""
+    chunk = chunk.set_axis(columns, axis=1).astype(str)
+    return chunk.replace(['<NA>'], ' ')
+
+
+def partition_ids(chunk, no_of_partitions, level):
+    """Function to get the partition of every record, each level uses the next digits of the row hash"""
+    hashes = row_hashes(chunk)
+    return ((hashes // np.uint64(no_of_partitions ** level)) % np.uint64(no_of_partitions)).astype(np.int64)
+
+
+def spill_partitions(chunks, columns, spill_dir, side, no_of_partitions, level):
+    """Function to hash partition chunks of records into parquet files
+
+    Args:
+        chunks: Iterable of dataframes
+        columns: Column names of the records
+        spill_dir: Directory of the partition files
+        side: Prefix of the partition files, source or target
+        no_of_partitions: Number of partitions
+        level: Partitioning level, 0 for the first split
+
+    Returns:
+        Number of records spilled
+
+    """
+    schema = pa.schema([(str(column), pa.string()) for column in columns])
+    writers = {}
+    no_of_records = 0
+    try:
+        for chunk in chunks:
+            chunk = prepare_records(chunk, columns)
+            no_of_records += len(chunk)
+
+            partitions = partition_ids(chunk, no_of_partitions, level)
+            order = np.argsort(partitions, kind='stable')
+            bounds = np.searchsorted(partitions[order], np.arange(no_of_partitions + 1))
+
+            for partition in range(no_of_partitions):
+                if bounds[partition] == bounds[partition + 1]:
+                    continue
+                rows = chunk.iloc[order[bounds[partition]:bounds[partition + 1]]]
+                if partition not in writers:
+                    writers[partition] = pq.ParquetWriter(
+                        partition_file(spill_dir, side, partition), schema)
+                writers[partition].write_table(
+                    pa.Table.from_pandas(rows.set_axis(schema.names, axis=1), schema=schema, preserve_index=False))
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    return no_of_records
+
+
+def partition_file(spill_dir, side, partition):
+    """Function to get the path of a partition file"""
+    return os.path.join(spill_dir, f'{side}_{partition}.parquet')
+
+
+def estimated_memory(file_path):
+    """Function to estimate the in-memory size of a partition file as pandas object columns"""
+    if not os.path.exists(file_path):
+        return 0
+    metadata = pq.ParquetFile(file_path).metadata
+    uncompressed = sum(metadata.row_group(i).total_byte_size for i in range(metadata.num_row_groups))
+    return uncompressed + metadata.num_rows * metadata.num_columns * PY_OBJECT_BYTES
+
+
+def read_partition(file_path, columns, chunk_rows=None):
+    """Function to read a partition file, as one dataframe or as chunks of dataframes"""
+    if not os.path.exists(file_path):
+        empty = pd.DataFrame(columns=columns, dtype=object)
+        return empty if chunk_rows is None else iter([empty])
+
+    if chunk_rows is None:
+        return pq.read_table(file_path).to_pandas().set_axis(columns, axis=1)
+
+    return (batch.to_pandas().set_axis(columns, axis=1)
+            for batch in pq.ParquetFile(file_path).iter_batches(batch_size=chunk_rows))
+
+
+def count_records(file_path, columns, chunk_rows):
+    """Function to count the occurrences of the distinct records of a partition file, read chunk by chunk"""
+    counts = None
+    for chunk in read_partition(file_path, columns, chunk_rows):
+        chunk_counts = chunk.value_counts(sort=False)
+        counts = chunk_counts if counts is None else counts.add(chunk_counts, fill_value=0)
+    return counts
+
+
+def repeated_positions(groups, repeats, batch_rows):
+    """Function to get the positions of groups repeated the given number of times, in batches of at most
+    batch_rows positions"""
+    batch_groups, batch_repeats, size = [], [], 0
+    for group, count in zip(groups.tolist(), repeats.tolist()):
+        while count:
+            taken = min(count, batch_rows - size)
+            batch_groups.append(group)
+            batch_repeats.append(taken)
+            size += taken
+            count -= taken
+            if size == batch_rows:
+                yield np.repeat(batch_groups, batch_repeats)
+                batch_groups, batch_repeats, size = [], [], 0
+    if size:
+        yield np.repeat(batch_groups, batch_repeats)
+
+
+class PartitionedComparison:
+    """Class to compare source and target records partition by partition"""
+
+    def __init__(self, columns, report_writer, reportType, multiset=False):
+        """Init function"""
+        self.columns = columns
+        self.report_writer = report_writer
+        self.multiset = multiset
+        self.matched_limit = get_matched_rows_limit(reportType)
+
+        self.no_of_partitions = int(config.RECORD_PARTITION_COUNT)
+        self.max_level = int(config.RECORD_PARTITION_MAX_LEVEL)
+        self.chunk_rows = int(config.READ_CHUNK_ROWS)
+        self.memory_budget = int(config.COMPARISON_MEMORY_BUDGET_MB) * 1024 * 1024
+
+        self.matched = 0
+        self.source_only = 0
+        self.target_only = 0
+        self.samples = {'matched': [], 'source_only': [], 'target_only': []}
+
+    def compare(self, src_chunks, tgt_chunks, spill_dir, level=0):
+        """Spill both sides into partitions and compare the partition pairs one at a time"""
+        no_of_source_records = spill_partitions(src_chunks, self.columns, spill_dir, 'source',
+                                                self.no_of_partitions, level)
+        no_of_target_records = spill_partitions(tgt_chunks, self.columns, spill_dir, 'target',
+                                                self.no_of_partitions, level)
+
+        for partition in range(self.no_of_partitions):
+            src_file = partition_file(spill_dir, 'source', partition)
+            tgt_file = partition_file(spill_dir, 'target', partition)
+            if not os.path.exists(src_file) and not os.path.exists(tgt_file):
+                continue
+
+            needed = (estimated_memory(src_file) + estimated_memory(tgt_file)) * MEMORY_OVERHEAD_FACTOR
+            if needed > self.memory_budget and level < self.max_level:
+                logger.info(f"Partition {partition} at level {level} needs {needed} bytes - splitting further")
+                sub_dir = tempfile.mkdtemp(dir=spill_dir)
+                self.compare(read_partition(src_file, self.columns, self.chunk_rows),
+                             read_partition(tgt_file, self.columns, self.chunk_rows),
+                             sub_dir, level + 1)
+                shutil.rmtree(sub_dir, ignore_errors=True)
+            elif needed > self.memory_budget:
+                # The records of a partition which can not be split further mostly hash the same, i.e. are identical
+                logger.info(f"Partition {partition} at level {level} needs {needed} bytes - comparing distinct records")
+                self.compare_partition_counts(src_file, tgt_file)
+            else:
+                self.compare_partition(read_partition(src_file, self.columns),
+                                       read_partition(tgt_file, self.columns))
+
+            for file_path in (src_file, tgt_file):
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+
+        return no_of_source_records, no_of_target_records
+
+    def compare_partition(self, src_df, tgt_df):
+        """Compare a partition pair in memory and append the results"""
+        matched_limit = self.matched_limit
+        if matched_limit is not None:
+            matched_limit = max(matched_limit - self.matched, RESPONSE_SAMPLE_ROWS)
+
+        rows_Similar, rows_SminusT, rows_TminusS, no_of_matched, no_of_source_only, no_of_target_only = \
+            compare_records(src_df, tgt_df, matched_limit, config.RECORD_HASH_BITS, self.multiset)
+
+        self.matched += no_of_matched
+        self.source_only += no_of_source_only
+        self.target_only += no_of_target_only
+        self.write_records(rows_Similar, rows_SminusT, rows_TminusS)
+
+    def compare_partition_counts(self, src_file, tgt_file):
+        """Compare a partition pair by the occurrences of its distinct records, as compare_records does, the
+        records are read and reported in chunks"""
+        counts = pd.DataFrame({'source': count_records(src_file, self.columns, self.chunk_rows),
+                               'target': count_records(tgt_file, self.columns, self.chunk_rows)})
+        counts = counts.fillna(0).astype(np.int64)
+        records = counts.index.to_frame(index=False).set_axis(self.columns, axis=1)
+        src_counts, tgt_counts = counts['source'].to_numpy(), counts['target'].to_numpy()
+        logger.info(f"Partition of {int(src_counts.sum())} source and {int(tgt_counts.sum())} target records has "
+                    f"{len(records)} distinct records")
+
+        matched_limit = self.matched_limit
+        if matched_limit is not None:
+            matched_limit = max(matched_limit - self.matched, RESPONSE_SAMPLE_ROWS)
+
+        if self.multiset:
+            # One record per group, every group is in the records of both sides
+            positions = np.arange(len(records))
+            rows_Similar, rows_SminusT, rows_TminusS, no_of_matched, no_of_source_only, no_of_target_only = \
+                groups_from_counts(records, records, positions, positions, src_counts, tgt_counts, matched_limit)
+            self.matched += no_of_matched
+            self.source_only += no_of_source_only
+            self.target_only += no_of_target_only
+            self.write_records(rows_Similar, rows_SminusT, rows_TminusS)
+            return
+
+        # A record present a times in source and b times in target is matched a * b times
+        matched_repeats = src_counts * tgt_counts
+        self.matched += int(matched_repeats.sum())
+        self.source_only += int(src_counts[tgt_counts == 0].sum())
+        self.target_only += int(tgt_counts[src_counts == 0].sum())
+
+        matched_groups = np.flatnonzero(matched_repeats)
+        matched_repeats = matched_repeats[matched_groups]
+        if matched_limit is not None:
+            matched_repeats = np.minimum(matched_repeats, np.maximum(
+                matched_limit - np.concatenate([[0], np.cumsum(matched_repeats)[:-1]]), 0))
+
+        no_rows = np.array([], dtype=np.int64)
+        for groups, repeats, record_type in ((matched_groups, matched_repeats, 'Matched'),
+                                             (np.flatnonzero(tgt_counts == 0), src_counts[tgt_counts == 0], 'Source'),
+                                             (np.flatnonzero(src_counts == 0), tgt_counts[src_counts == 0], 'Target')):
+            for positions in repeated_positions(groups, repeats, self.chunk_rows):
+                rows = [take_records(records, positions if record_type == batch_type else no_rows, batch_type)
+                        for batch_type in ('Matched', 'Source', 'Target')]
+                self.write_records(*rows)
+
+    def write_records(self, rows_Similar, rows_SminusT, rows_TminusS):
+        """Keep the first compared rows as samples of the response and append the rows to the reports"""
+        for name, rows in (('matched', rows_Similar), ('source_only', rows_SminusT), ('target_only', rows_TminusS)):
+            missing = RESPONSE_SAMPLE_ROWS - len(self.samples[name])
+            if missing > 0:
+                self.samples[name].extend(get_sample_rows(rows.head(missing)))
+
+        self.report_writer.write_records(rows_Similar, rows_SminusT, rows_TminusS)
+
+
+def partitioned_record_comparison(src_data, tgt_data, reportType, multiset=False):
+    """Function to compare records larger than memory by spilling hash partitions to disk
+
+    Args:
+        src_data: Source dataframe or iterable of source dataframes
+        tgt_data: Target dataframe or iterable of target dataframes
+        reportType: Type of report
+        multiset: Compare the records as multisets of identical rows
+
+    Returns:
+        Message, record response
+
+    """
+    logger.info(f'{"*" * 50} "Partitioned record comparison started",{"*" * 50}')
+    record_response = RecordResponse()
+    spill_dir = None
+    try:
+        chunk_rows = int(config.READ_CHUNK_ROWS)
+        src_first, src_chunks = peek_chunks(src_data, chunk_rows)
+        tgt_first, tgt_chunks = peek_chunks(tgt_data, chunk_rows)
+
+        target_cols = list(tgt_first.columns)
+        if not check_columns_length(src_first, tgt_first):
+            raise ColumnsLengthMismatch
+
+        columns = list(src_first.columns)
+        if not check_columns_names(src_first, tgt_first.set_axis(columns, axis=1)):
+            raise ColumnsNamesMismatch
+
+        extra_columns = (MULTISET_COUNT_COLUMNS if multiset else []) + ['Record_type']
+        report_writer = RecordReportWriter(reportType, columns, target_cols, extra_columns)
+
+        os.makedirs(config.SPILL_FILE_DIR, exist_ok=True)
+        spill_dir = tempfile.mkdtemp(dir=config.SPILL_FILE_DIR)
+
+        comparison = PartitionedComparison(columns, report_writer, reportType, multiset)
+        nrow_src, nrow_tgt = comparison.compare(src_chunks, tgt_chunks, spill_dir)
+
+        matched_file, mismatched_file, source_only_file, target_only_file = report_writer.close()
+
+        logger.info("**************************** Comparison Report *********************************")
+        logger.info("Total number of records present in source : %s" % nrow_src)
+        logger.info("Total number of records present in target : %s" % nrow_tgt)
+        logger.info("Records present in both source and target : %s" % comparison.matched)
+        logger.info("Records only present in Source-Exclude Matching records : %s" % comparison.source_only)
+        logger.info("Records only present in Target-Exclude Matching records : %s" % comparison.target_only)
+
+        record_response.get_instantiated_instance(nrow_src,
+                                                  nrow_tgt,
+                                                  comparison.source_only + comparison.target_only + 1,
+                                                  comparison.source_only,
+                                                  comparison.target_only,
+                                                  comparison.samples['source_only'],
+                                                  comparison.samples['target_only'],
+                                                  comparison.matched,
+                                                  comparison.samples['matched'],
+                                                  columns,
+                                                  matched_file,
+                                                  mismatched_file,
+                                                  source_only_file,
+                                                  target_only_file)
+
+        logger.info("Completed comparison!")
+        return "success", record_response.get_json_representaion()
+
+    except TypeError:
+        message = 'Invalid Report Type'
+
+    except ColumnsLengthMismatch:
+        message = "Length of Source and target columns is different"
+
+    except ColumnsNamesMismatch:
+        message = "Names of Source and target columns are different"
+
+    except Exception as E:
+        logger.error(f"Exception occured during partitioned record comparison: - {E}")
+        message = "Some Internal error occurred"
+
+    finally:
+        if spill_dir:
+            shutil.rmtree(spill_dir, ignore_errors=True)
+
+    return (message, [])
@@ -0,0 +1,235 @@
+'''
+Copyright 2024 Infosys Ltd.
+
+Use of this source code is governed by MIT license that can be found in the LICENSE file or at
+
+https://opensource.org/licenses/MIT.
+'''
+
+import traceback
+
+import numpy as np
+import pandas as pd
+
+from comparator.column_comparison import compare_columns, check_column_rules, get_key_columns, object_array, \
+    CELL_COLUMNS, DUPLICATE_KEYS_SHOWN
+from comparator.partitioned_comparison import peek_chunks
+from comparision_checks.columnchecks import check_columns_length, check_columns_names
+from configs import config
+from reports.comparison_reports import ColumnReportWriter
+from reports.response import ColumnResponse
+from utils.ServerLogs import logger
+from utils.exceptions import ColumnsLengthMismatch, ColumnsNamesMismatch, InputNotSorted, DuplicatePrimaryKeys, \
+    InvalidColumnRule
+
+
+def is_numeric_key(keys):
+    """Function to check if every primary key value is a number"""
+    return bool(pd.to_numeric(keys, errors='coerce').notna().all())
+
+
+def order_keys(key_frame, numeric):
+    """Function to get the values which define the order of the primary keys, tuples for a composite key"""
+    columns = []
+    for column, is_numeric in zip(key_frame.columns, numeric):
+        if not is_numeric:
+            columns.append(key_frame[column].astype(str).to_numpy(dtype=object))
+            continue
+
+        order = pd.to_numeric(key_frame[column], errors='coerce')
+        if order.isna().any():
+            raise InputNotSorted
+        columns.append(order.to_numpy())
+
+    if len(columns) == 1:
+        return columns[0]
+    return object_array(zip(*columns), len(key_frame))
+
+
+def check_order(keys, last_key):
+    """Function to check that the primary keys of a chunk follow the previous chunk in strictly increasing order"""
+    previous, following = keys[:-1], keys[1:]
+    duplicated = previous == following
+    if last_key is not None and keys[0] == last_key:
+        raise DuplicatePrimaryKeys(str(keys[0]))
+    if duplicated.any():
+        raise DuplicatePrimaryKeys(', '.join(str(key) for key in pd.unique(following[duplicated])[:DUPLICATE_KEYS_SHOWN]))
+    if (last_key is not None and keys[0] < last_key) or (previous > following).any():
+        raise InputNotSorted
+
+
+class SortedCursor:
+    """Class to read one side of a sorted merge comparison chunk by chunk"""
+
+    def __init__(self, chunks, columns, key_columns, numeric):
+        """Init function"""
+        self.chunks = chunks
+        self.columns = columns
+        self.key_columns = key_columns
+        self.numeric = numeric
+
+        self.buffer = pd.DataFrame(columns=columns)
+        self.keys = np.array([], dtype=object)
+        self.last_key = None
+        self.done = False
+        self.no_of_records = 0
+
+    @property
+    def exhausted(self):
+        """True when every record of the side has been taken"""
+        return self.done and self.buffer.empty
+
+    def fill(self):
+        """Read chunks until the buffer has records or the side has no more chunks"""
+        while not self.done and self.buffer.empty:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                self.done = True
+                break
+
+            chunk = chunk.set_axis(self.columns, axis=1)
+            if chunk.empty:
+                continue
+
+            keys = order_keys(chunk[self.key_columns], self.numeric)
+            check_order(keys, self.last_key)
+            self.no_of_records += len(chunk)
+            self.buffer, self.keys, self.last_key = chunk, keys, keys[-1]
+
+    def take(self, boundary=None):
+        """Remove and return the buffered records with a key up to the boundary, all of them when it is None"""
+        if boundary is None:
+            end = len(self.keys)
+        else:
+            end = np.searchsorted(self.keys, object_array([boundary], 1), side='right')[0]
+        rows = self.buffer.iloc[:end]
+        self.buffer, self.keys = self.buffer.iloc[end:], self.keys[end:]
+        return rows
+
+
+def prepare_cells(rows):
+    """Function to render records the same way as the in-memory column comparison"""
+    return rows.astype(str).replace(['<NA>'], '')
+
+
+def merge_sorted(source, target, source_pkey, report_writer, column_rules=None):
+    """Function to advance both cursors in key order and compare the records they have in common
+
+    Every step compares the buffered records up to the smaller of the last buffered keys of both sides,
+    so no more than about one chunk per side is held in memory.
+
+    Args:
+        source: Source cursor
+        target: Target cursor, with the source column names
+        source_pkey: Primary key column or columns
+        report_writer: Writer of the column comparison reports
+        column_rules: Comparison rules per column
+
+    Returns:
+        Mismatch count per column, total mismatch count
+
+    """
+    column_wise_mismatch_dict = {col: 0 for col in source.columns if col not in source.key_columns}
+    total_count = 0
+
+    while True:
+        source.fill()
+        target.fill()
+        if source.exhausted and target.exhausted:
+            break
+
+        boundary = None
+        if not source.exhausted and not target.exhausted:
+            boundary = min(source.keys[-1], target.keys[-1])
+
+        mismatch_data, match_data, counts, count = compare_columns(
+            prepare_cells(source.take(boundary)), prepare_cells(target.take(boundary)), source_pkey, None, column_rules,
+            report_writer.remaining_matched())
+        report_writer.write(mismatch_data, match_data)
+
+        for col, col_count in counts.items():
+            column_wise_mismatch_dict[col] += col_count
+        total_count += count
+
+    return column_wise_mismatch_dict, total_count
+
+
+def sorted_merge_column_comparison(src_data, tgt_data, source_primary_key, reportType, column_rules=None):
+    """Function to compare columns of inputs ordered by the primary key with a streaming merge join
+
+    Args:
+        src_data: Source dataframe or iterable of source dataframes
+        tgt_data: Target dataframe or iterable of target dataframes
+        source_primary_key: Primary key column or columns
+        reportType: Type of report
+        column_rules: Comparison rules per column
+
+    Returns:
+        Message, column response
+
+    """
+    logger.info(f'{"*" * 50} "Sorted merge column comparison started",{"*" * 50}')
+    response = ColumnResponse()
+    try:
+        chunk_rows = int(config.READ_CHUNK_ROWS)
+        src_first, src_chunks = peek_chunks(src_data, chunk_rows)
+        tgt_first, tgt_chunks = peek_chunks(tgt_data, chunk_rows)
+
+        if not check_columns_length(src_first, tgt_first):
+            raise ColumnsLengthMismatch
+
+        columns = list(src_first.columns)
+        tgt_first = tgt_first.set_axis(columns, axis=1)
+        if not check_columns_names(src_first, tgt_first):
+            raise ColumnsNamesMismatch
+
+        # Key columns are ordered as numbers when both sides start with numeric values, as strings otherwise
+        key_columns = get_key_columns(source_primary_key)
+        numeric = [is_numeric_key(src_first[column]) and is_numeric_key(tgt_first[column]) for column in key_columns]
+
+        report_writer = ColumnReportWriter(reportType, CELL_COLUMNS)
+        source = SortedCursor(src_chunks, columns, key_columns, numeric)
+        target = SortedCursor(tgt_chunks, columns, key_columns, numeric)
+
+        check_column_rules(column_rules or {})
+        column_wise_mismatch_dict, total_count = merge_sorted(source, target, source_primary_key, report_writer,
+                                                              column_rules)
+        matched_csv, mismatched_csv = report_writer.close()
+
+        logger.info("Comparison completed.")
+        response.get_instantiated_instance(total_count,
+                                           column_wise_mismatch_dict,
+                                           matched_csv,
+                                           mismatched_csv,
+                                           source.no_of_records,
+                                           target.no_of_records)
+
+        return 'success', response.get_json_representaion()
+
+    except KeyError:
+        message = 'Columns/Keys mentioned not found'
+
+    except TypeError:
+        message = 'Invalid Report Type'
+
+    except ColumnsLengthMismatch:
+        message = "Length of Source and target columns is different"
+
+    except ColumnsNamesMismatch:
+        message = "Names of Source and target columns are different"
+
+    except DuplicatePrimaryKeys as E:
+        message = f'primary Key has duplicate values - {E}'
+
+    except InputNotSorted:
+        message = 'Source/Target are not sorted by the primary key'
+
+    except InvalidColumnRule as E:
+        message = f'Invalid comparison rule for column {E}'
+
+    except Exception as e:
+        logger.error("Exception has occurred in sorted merge column comparison ***" + str(e))
+        logger.error(traceback.format_exc())
+        message = "failure"
+
+    return message, []
@@ -0,0 +1,116 @@
+'''
+Copyright 2024 Infosys Ltd.
+
+Use of this source code is governed by MIT license that can be found in the LICENSE file or at
+
+https://opensource.org/licenses/MIT.
+'''
+
+from decimal import Decimal
+
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_datetime64_any_dtype, is_integer_dtype, is_numeric_dtype
+
+from utils.ServerLogs import logger
+
+
+def first_value(series):
+    """Function to get the first value of a series which is not missing, None when there is none"""
+    position = series.first_valid_index()
+    return None if position is None else series.loc[position]
+
+
+def is_decimal(series):
+    """Function to check if an object column holds decimal values, as read from DECIMAL/NUMERIC columns"""
+    return series.dtype == object and isinstance(first_value(series), Decimal)
+
+
+def is_number(series):
+    """Function to check if a column holds native numbers or decimals"""
+    return (is_numeric_dtype(series) and not is_bool_dtype(series)) or is_decimal(series)
+
+
+def to_numbers(series):
+    """Function to convert a column to numbers, None when a value is not a number"""
+    numbers = pd.to_numeric(series, errors='coerce')
+    if (numbers.isna() & series.notna()).any():
+        return None
+    return numbers
+
+
+def to_timestamps(series):
+    """Function to convert a column to timezone naive UTC timestamps, None when a value is not a date"""
+    try:
+        timestamps = pd.to_datetime(series, errors='coerce', utc=True, format='mixed')
+    except (TypeError, ValueError):
+        return None
+    if (timestamps.isna() & series.notna()).any():
+        return None
+    return timestamps.dt.tz_localize(None)
+
+
+def to_strings(series):
+    """Function to render a column as strings, missing values stay missing"""
+    strings = series.astype(str).astype(object)
+    strings[series.isna()] = None
+    return strings
+
+
+def reconcile_column(src_col, tgt_col):
+    """Function to bring a source and a target column to one comparable dtype
+
+    Both integer columns stay integers (nullable when a value is missing), any other pair of numbers
+    including decimals becomes float64, dates become timezone naive UTC timestamps. A string column
+    is converted only when the other side is a number or a date and every value converts, all the
+    other columns are compared as strings.
+
+    Args:
+        src_col: Source column
+        tgt_col: Target column
+
+    Returns:
+        Source column, target column
+
+    """
+    if is_bool_dtype(src_col) and is_bool_dtype(tgt_col):
+        return src_col, tgt_col
+
+    if is_number(src_col) or is_number(tgt_col):
+        src_numbers = src_col if is_numeric_dtype(src_col) else to_numbers(src_col)
+        tgt_numbers = tgt_col if is_numeric_dtype(tgt_col) else to_numbers(tgt_col)
+        if src_numbers is not None and tgt_numbers is not None:
+            if is_integer_dtype(src_numbers) and is_integer_dtype(tgt_numbers):
+                if src_numbers.hasnans or tgt_numbers.hasnans:
+                    return src_numbers.astype('Int64'), tgt_numbers.astype('Int64')
+                return src_numbers.astype('int64'), tgt_numbers.astype('int64')
+            return src_numbers.astype('float64'), tgt_numbers.astype('float64')
+
+    if is_datetime64_any_dtype(src_col) or is_datetime64_any_dtype(tgt_col):
+        src_timestamps = to_timestamps(src_col)
+        tgt_timestamps = to_timestamps(tgt_col)
+        if src_timestamps is not None and tgt_timestamps is not None:
+            return src_timestamps, tgt_timestamps
+
+    return to_strings(src_col), to_strings(tgt_col)
+
+
+def reconcile_dtypes(src_df, tgt_df):
+    """Function to align the dtypes of source and target column by column instead of casting them to strings
+
+    Args:
+        src_df: Source dataframe
+        tgt_df: Target dataframe with the source column names
+
+    Returns:
+        Source dataframe, target dataframe
+
+    """
+    src_columns = {}
+    tgt_columns = {}
+    for column in src_df.columns:
+        src_columns[column], tgt_columns[column] = reconcile_column(src_df[column], tgt_df[column])
+
+    src_df = pd.DataFrame(src_columns, index=src_df.index)
+    tgt_df = pd.DataFrame(tgt_columns, index=tgt_df.index)
+    logger.info(f"Reconciled datatypes are - {src_df.dtypes.astype(str).to_dict()}")
+    return src_df, tgt_df
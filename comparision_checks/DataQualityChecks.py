@@ -10,10 +10,13 @@ import csv
 import datetime
 import os
 
+import numpy as np
 import pandas as pd
 from pandas.api.types import is_numeric_dtype
 
+from configs import config
 from utils.ServerLogs import logger
+from utils.delimited_reader import read_delimited, read_delimited_chunks, infer_numbers
 
 
 def createTempFolder():
@@ -41,17 +44,19 @@ def createFileName(ext):
         logger.info(e)
 
 
-def read_data(data_filepath: str):
-    """function to read data"""
+def read_data(data_filepath: str, chunksize=None):
+    """function to read data, as an iterator of dataframes of at most chunksize rows when it is given"""
 
     df = None
     try:
         if data_filepath.endswith(".csv"):
-            df = pd.read_csv(data_filepath)
-            return df
+            if chunksize:
+                # Chunks are read as text, see quality_checks_from_chunks
+                return read_delimited_chunks(data_filepath, chunksize=chunksize, missing_values=True)
+            return read_delimited(data_filepath, as_strings=False)
         elif data_filepath.endswith(".xlsx"):
             df = pd.read_excel(data_filepath)
-            return df
+            return [df] if chunksize else df
         else:
             return df
     except Exception as e:
@@ -134,7 +139,7 @@ def getDataTypes(data):
                 temp[col] = "Number"
             elif val == "bool":
                 temp[col] = "Boolean"
-            elif val == "datetime64":
+            elif val.startswith("datetime64"):
                 temp[col] = "DateTime"
             else:
                 temp[col] = "Undefined"
@@ -145,6 +150,103 @@ def getDataTypes(data):
         return None
 
 
+def sample_numbers(sample, values, rng, size):
+    """Function to add the numbers of a chunk to a uniform sample of at most size numbers
+
+    Every number gets a random priority and the numbers of lowest priority are kept, so the sample holds
+    every number until there are more than size of them.
+    """
+    priorities = rng.random(len(values))
+    if sample is not None:
+        values, priorities = np.concatenate([sample[0], values]), np.concatenate([sample[1], priorities])
+    if len(values) > size:
+        kept = np.argpartition(priorities, size)[:size]
+        values, priorities = values[kept], priorities[kept]
+    return values, priorities
+
+
+def quality_checks_from_chunks(chunks):
+    """Function to perform the quality checks chunk by chunk
+
+    Delimited files are read as text, so that every chunk has the same schema, and the numeric columns
+    are inferred chunk by chunk. Between chunks only running totals, one hash per distinct row and a
+    uniform sample of QUALITY_SAMPLE_NUMBERS numbers per numeric column are kept. Outliers are counted
+    exactly when a column has no more numbers than the sample, and estimated from the sample otherwise.
+
+    Args:
+        chunks: Iterable of dataframes
+
+    Returns:
+        Quality checks
+
+    """
+    row_count = 0
+    columns = []
+    data_types = {}
+    missing_values = {}
+    row_hashes = []
+    no_of_distinct_rows = 0
+    numbers = {}
+    rng = np.random.default_rng(0)
+    sample_size = int(config.QUALITY_SAMPLE_NUMBERS)
+    for chunk in chunks:
+        if not columns:
+            columns = chunk.columns.to_list()
+            missing_values = {col: 0 for col in columns}
+
+        row_count += len(chunk)
+        # Identical rows hash the same in every chunk since they are hashed as read
+        row_hashes.append(np.unique(pd.util.hash_pandas_object(chunk, index=False).to_numpy()))
+        if sum(len(hashes) for hashes in row_hashes) > 2 * max(no_of_distinct_rows, int(config.READ_CHUNK_ROWS)):
+            row_hashes = [np.unique(np.concatenate(row_hashes))]
+            no_of_distinct_rows = len(row_hashes[0])
+
+        chunk = infer_numbers(chunk.copy())
+        # A column whose type differs between chunks holds text
+        for col, data_type in getDataTypes(chunk).items():
+            data_types[col] = data_type if data_types.get(col, data_type) == data_type else "Text"
+        for col, missing in checkMissingValues(chunk).items():
+            missing_values[col] += missing
+        for col in columns:
+            if col in numbers and numbers[col] is None:
+                continue
+            if is_numeric_dtype(chunk[col]):
+                values = chunk[col].to_numpy(dtype=float)
+                values = values[~np.isnan(values)]
+                column = numbers.setdefault(col, {"count": 0, "min": np.nan, "max": np.nan, "sample": None})
+                if len(values):
+                    column["count"] += len(values)
+                    column["min"] = np.fmin(column["min"], values.min())
+                    column["max"] = np.fmax(column["max"], values.max())
+                    column["sample"] = sample_numbers(column["sample"], values, rng, sample_size)
+            else:
+                numbers[col] = None
+
+    outliers_dict = {}
+    range_check = {}
+    for col in columns:
+        column = numbers.get(col)
+        if column:
+            sample = pd.DataFrame({col: column["sample"][0] if column["sample"] else []}, dtype=float)
+            outliers = find_outliers_pandas(sample, col)
+            if outliers is not None and len(sample) < column["count"]:
+                outliers = round(outliers * column["count"] / len(sample))
+            outliers_dict[col] = outliers
+            range_check[col] = {"min": float(column["min"]), "max": float(column["max"])}
+        else:
+            outliers_dict[col] = 'NA'
+            range_check[col] = 'NA'
+
+    duplicate_rows = row_count - len(np.unique(np.concatenate(row_hashes))) if row_hashes else 0
+    return {"row_count": row_count,
+            "column_count": len(columns),
+            "data_types_check": data_types,
+            "missing_values_check": missing_values,
+            "duplicate_rows_check": duplicate_rows,
+            "outliers_check": outliers_dict,
+            "range_check": range_check}
+
+
 def createCSVFile(quality_checks):
     """Function to create csv files"""
     try:
@@ -185,24 +287,9 @@ def createCSVFile(quality_checks):
 def perform_quality_checks(data_filepath: str):
     """Function to perform quality checks"""
     try:
-        data = read_data(data_filepath)
-        if isinstance(data, pd.DataFrame):
-            quality_checks = {}
-            # total rows
-            quality_checks["row_count"] = len(data)
-            # total cols
-            quality_checks["column_count"] = len(data.columns)
-            # check datatypes
-            quality_checks["data_types_check"] = getDataTypes(data)
-            # missing value check
-            quality_checks["missing_values_check"] = checkMissingValues(data)
-            # duplicate rows
-            quality_checks["duplicate_rows_check"] = checkDuplicateValues(data)
-            # outliers and range check
-            outliers_dict, range_check = outliersAndRangeCheck(data)
-            quality_checks["outliers_check"] = outliers_dict
-            quality_checks["range_check"] = range_check
-            return quality_checks
+        data = read_data(data_filepath, int(config.READ_CHUNK_ROWS))
+        if data is not None:
+            return quality_checks_from_chunks(data)
         else:
             return {"Error": "Can't process the data, invalid format..."}
     except Exception as e:
@@ -213,23 +300,9 @@ def perform_quality_checks(data_filepath: str):
 def perform_quality_checks_csv(data_filepath: str):
     """Function to perform quality checks"""
     try:
-        data = read_data(data_filepath)
-        if isinstance(data, pd.DataFrame):
-            quality_checks = {}
-            # total rows
-            quality_checks["row_count"] = len(data)
-            # total cols
-            quality_checks["column_count"] = len(data.columns)
-            # check datatypes
-            quality_checks["data_types_check"] = getDataTypes(data)
-            # missing value check
-            quality_checks["missing_values_check"] = checkMissingValues(data)
-            # duplicate rows
-            quality_checks["duplicate_rows_check"] = checkDuplicateValues(data)
-            # outliers and range check
-            outliers_dict, range_check = outliersAndRangeCheck(data)
-            quality_checks["outliers_check"] = outliers_dict
-            quality_checks["range_check"] = range_check
+        data = read_data(data_filepath, int(config.READ_CHUNK_ROWS))
+        if data is not None:
+            quality_checks = quality_checks_from_chunks(data)
             csv_filepath = createCSVFile(quality_checks)
             quality_checks["csv_filepath"] = csv_filepath
             return quality_checks
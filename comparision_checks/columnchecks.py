@@ -6,6 +6,8 @@ Use of this source code is governed by MIT license that can be found in the LICE
 https://opensource.org/licenses/MIT.
 '''
 
+import json
+
 from utils.ServerLogs import logger
 
 def check_columns_length(src, tgt):
@@ -20,3 +22,10 @@ def check_columns_names(src, tgt):
     logger.info(f"src@@@@@@@@ - {src.columns.values}")
     logger.info(f"tgt@@@@@@@@ - {tgt.columns.values}")
     return set(src.columns.values) == set(tgt.columns.values)
+
+
+def get_column_mapping(column_mapping):
+    """Function to get the column mapping of a request as a list of dicts"""
+    if isinstance(column_mapping, list):
+        return column_mapping
+    return json.loads(str(column_mapping).replace("\'", "\""))
@@ -6,14 +6,28 @@ Use of this source code is governed by MIT license that can be found in the LICE
 https://opensource.org/licenses/MIT.
 '''
 
+from reports.jsontodf import get_json_dataframe_chunks
 from utils.dataframes_utility import get_parquet_dataframe, get_json_dataframe, get_xml_dataframe, get_dat_dataframe, \
     get_delimited_dataframe, get_avro_dataframe
+from utils.avro_reader import get_avro_dataframe_chunks
+from utils.dataset_cache import get_cached_dataframe
+from utils.fixed_width_reader import MappedTextFile, get_layout
+from utils.xml_reader import get_xml_dataframe_chunks
 
 
-def is_csv_conversion_required(file_type):
-    """Function to check if input file needs conversion or not"""
-    FILE_TYPES = ['txt', 'parquet', 'json', 'xml', "DAT file", "dat file", "csv", "avro"]
-    return not (file_type in FILE_TYPES)
+# File types read directly into dataframes, without a conversion to csv
+FILE_TYPES = ['txt', 'parquet', 'json', 'xml', "dat file", "csv", "avro"]
+
+
+def get_file_type(file_type):
+    """Function to normalize the file type of a request, e.g. 'Parquet' is read as 'parquet'"""
+    return (file_type or '').strip().lower()
+
+
+def is_csv_conversion_required(file_type, convert_to_csv=False):
+    """Function to check if input file needs conversion to csv, only when requested or when it has no native reader"""
+    file_type = get_file_type(file_type)
+    return file_type != 'csv' and (bool(convert_to_csv) or file_type not in FILE_TYPES)
 
 
 def convert_columns_str_to_list(columns):
@@ -21,22 +35,69 @@ def convert_columns_str_to_list(columns):
     return columns.split(",")
 
 
-def get_dataframes(file_name, file_type, col_list, delimiter):
-    """Function to get data as a dataframe from file"""
+def get_dataframes(file_name, file_type, col_list, delimiter, chunksize=None, parquet_filter=None, record_tag=None,
+                   layout=None, mapped=False):
+    """Function to get data as a dataframe from file
+
+    Delimited files, and xml, json or avro files with mapped columns, are read in chunks when chunksize is given.
+    Parquet and avro files only decode the columns of col_list, with parquet_filter pushed down to parquet.
+    Xml records are the elements named record_tag, or the children of the root element.
+    DAT files are read one record per line, or as the fields of a fixed width layout, and are left memory mapped
+    when mapped is set, see MappedTextFile.
+    Whole files are parsed once per version of the file, see get_cached_dataframe.
+    """
+    file_type = get_file_type(file_type)
+    if chunksize and file_type in ('txt', 'csv'):
+        return get_delimited_dataframe(file_name, col_list, delimiter, chunksize)
+
+    # Records may miss fields, chunks get the mapped columns so that they all have the same ones
+    if chunksize and file_type == 'xml' and col_list:
+        return (chunk.reindex(columns=col_list) for chunk in get_xml_dataframe_chunks(file_name, record_tag, chunksize))
+    if chunksize and file_type == 'json' and col_list:
+        return (chunk.reindex(columns=col_list) for chunk in get_json_dataframe_chunks(file_name, chunksize))
+    if chunksize and file_type == 'avro' and col_list:
+        return (chunk[col_list] for chunk in get_avro_dataframe_chunks(file_name, col_list, chunksize))
+
+    if mapped and file_type == 'dat file':
+        return MappedTextFile(file_name, layout).select(col_list)
+
+    # Mapped columns of a delimited file are read as strings, see get_delimited_dataframe
+    options = get_reader_options(file_type, delimiter, bool(col_list) and delimiter != '', parquet_filter, record_tag,
+                                 layout)
+    return get_cached_dataframe(file_name, options, col_list,
+                                lambda: read_dataframe(file_name, file_type, col_list, delimiter, parquet_filter,
+                                                       record_tag, layout))
+
+
+def get_reader_options(file_type, delimiter=',', as_strings=False, parquet_filter=None, record_tag=None, layout=None):
+    """Function to get the options which change how a file is parsed, part of the key of its cached dataset"""
+    if file_type == 'parquet':
+        return {'reader': file_type, 'filter': parquet_filter}
+    if file_type == 'xml':
+        return {'reader': file_type, 'record_tag': record_tag}
+    if file_type == 'dat file':
+        return {'reader': file_type, 'layout': get_layout(layout)}
+    if file_type in ('json', 'avro'):
+        return {'reader': file_type}
+    return {'reader': 'delimited', 'delimiter': delimiter, 'as_strings': as_strings}
+
+
+def read_dataframe(file_name, file_type, col_list, delimiter, parquet_filter=None, record_tag=None, layout=None):
+    """Function to parse a whole file into a dataframe with the reader of its type"""
     if file_type == 'parquet':
-        data_frame = get_parquet_dataframe(file_name)
+        data_frame = get_parquet_dataframe(file_name, col_list, parquet_filter)
 
     elif file_type == 'json':
         data_frame = get_json_dataframe(file_name)
 
     elif file_type == 'xml':
-        data_frame = get_xml_dataframe(file_name)
+        data_frame = get_xml_dataframe(file_name, record_tag=record_tag)
 
-    elif file_type.lower() == "dat file":
-        data_frame = get_dat_dataframe(file_name)
+    elif file_type == "dat file":
+        data_frame = get_dat_dataframe(file_name, layout)
 
-    elif file_type.lower() == 'avro':
-        data_frame = get_avro_dataframe(file_name)
+    elif file_type == 'avro':
+        data_frame = get_avro_dataframe(file_name, col_list)
 
     else:
         data_frame = get_delimited_dataframe(file_name, col_list, delimiter)
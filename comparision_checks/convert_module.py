@@ -9,11 +9,8 @@ https://opensource.org/licenses/MIT.
 import csv
 import json
 import os
-import xml.etree.cElementTree as ET
-from io import BytesIO
 from pathlib import Path
 
-import fastavro
 import pandas as pd
 import pyarrow.parquet as pq
 from starlette import status
@@ -21,7 +18,9 @@ from starlette import status
 from comparision_checks.filescanner import check_for_csv_injection
 from configs import config as settings
 from utils.ServerLogs import logger
+from utils.avro_reader import get_avro_dataframe_chunks
 from utils.exceptions import CSVInjectionError
+from utils.xml_reader import iter_xml_records, get_xml_dataframe_chunks
 
 
 def convert_parquet(file_to_convert, converted_filetype):
@@ -31,18 +30,18 @@ def convert_parquet(file_to_convert, converted_filetype):
 
 
 def convert_xml(file_to_convert, converted_filetype, recordtag):
-    """Function to Convert xml to csv"""
-
-    def get_range(col):
-        return range(len(col))
+    """Function to Convert xml to csv, streaming the records twice: once for the columns, once to write them"""
 
     try:
+        columns = {}
+        for record in iter_xml_records(file_to_convert, recordtag):
+            columns.update(dict.fromkeys(record))
 
-        tree = ET.parse(file_to_convert)
-        root = tree.getroot()
-        l = [{r[i].tag: r[i].text for i in get_range(r)} for r in root]
-        df = pd.DataFrame.from_dict(l)
-        df.to_csv(converted_filetype, index=False)
+        header = True
+        for chunk in get_xml_dataframe_chunks(file_to_convert, recordtag, int(settings.READ_CHUNK_ROWS)):
+            chunk.reindex(columns=list(columns)).to_csv(converted_filetype, index=False, header=header,
+                                                        mode='w' if header else 'a')
+            header = False
 
     except Exception as E:
         logger.error(f"Exception - {str(E)}")
@@ -74,12 +73,11 @@ def convert_txt(file_to_convert, converted_filetype, delimCare, delimiter):
 
 
 def convert_avro(file_to_convert, converted_filetype):
-    with open(file_to_convert, "rb") as fb:
-        reader = fastavro.reader(BytesIO(fb.read()))
-        records = [dict(r) for r in reader]
-        df = pd.DataFrame(records)
-
-    df.to_csv(converted_filetype, index=False)
+    """Function to Convert avro to csv, block by block"""
+    header = True
+    for chunk in get_avro_dataframe_chunks(file_to_convert):
+        chunk.to_csv(converted_filetype, index=False, header=header, mode='w' if header else 'a')
+        header = False
 
 
 def get_file(fname, fpath):
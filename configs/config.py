@@ -15,3 +15,62 @@ RESULTS_FILE_DIR = os.path.join(BASE_DIR, 'Output')
 
 SUPPORTED_FILE_TYPES = ['txt', 'parquet', 'json', 'xml', "avro", "csv", "pdf"]
 SUPPORTED_DBS = ["Mysql", "MsSql", "Oracle", "MongoDB", "Postgresql", "Drill", "Hana"]
+
+# Record comparison engine used when the request does not specify "comparisonEngine"
+RECORD_COMPARISON_ENGINE = 'merge'
+RECORD_COMPARISON_ENGINES = ['merge', 'hash', 'partitioned', 'parallel', 'arrow']
+# Column comparison engine used when the request does not specify "comparisonEngine", column comparison also
+# streams inputs which are ordered by the primary key with 'sorted'
+COLUMN_COMPARISON_ENGINE = 'merge'
+COLUMN_COMPARISON_ENGINES = RECORD_COMPARISON_ENGINES + ['sorted']
+
+# Width of the row hash used by the hash engine (64 or 128)
+RECORD_HASH_BITS = 64
+
+# Spill-to-disk settings of the partitioned record comparison engine
+COMPARISON_MEMORY_BUDGET_MB = 1024
+RECORD_PARTITION_COUNT = 16
+RECORD_PARTITION_MAX_LEVEL = 3
+READ_CHUNK_ROWS = 100000
+SPILL_FILE_DIR = os.path.join(BASE_DIR, 'spill')
+
+# Worker processes of the parallel comparison engine, None for one per core
+COMPARISON_WORKERS = None
+# Inputs with fewer rows are compared in the request process
+PARALLEL_MIN_ROWS = 100000
+# Start method of the worker processes, spawn works on every platform and does not fork the server threads
+PROCESS_POOL_START_METHOD = 'spawn'
+
+# Numbers sampled per numeric column by the quality checks, outliers of larger columns are estimated from the sample
+QUALITY_SAMPLE_NUMBERS = 1000000
+
+# Size of the blocks of a delimited file which pyarrow.csv parses in parallel
+DELIMITED_READ_BLOCK_BYTES = 16 * 1024 * 1024
+
+# Parsed datasets are cached as Arrow files, least recently used ones are evicted beyond the size (0 disables)
+DATASET_CACHE_DIR = os.path.join(BASE_DIR, 'dataset_cache')
+DATASET_CACHE_SIZE_MB = 2048
+
+# Rows returned by /get_columns/, columns of json/xml/mongo sources are collected from the first sampled records
+PREVIEW_ROWS = 10
+COLUMN_SAMPLE_RECORDS = 1000
+
+# Database connections are pooled per connection alias and database, idle ones are closed down to the minimum
+DB_POOL_MIN_SIZE = 1
+DB_POOL_MAX_SIZE = 8
+DB_POOL_IDLE_SECONDS = 300
+# Connections idle for longer are validated before reuse, seconds to wait for a free connection
+DB_POOL_HEALTH_CHECK_SECONDS = 30
+DB_POOL_CHECKOUT_TIMEOUT = 60
+
+# Rows fetched per round trip by the server side cursors of chunked table reads
+SQL_FETCH_ARRAY_SIZE = 10000
+
+# Source and target are read at the same time, in two threads
+CONCURRENT_EXTRACTION = True
+
+# Ranges read in parallel by a partitioned extraction, at most DB_POOL_MAX_SIZE
+EXTRACTION_PARTITIONS = 4
+
+# Buckets whose digests are computed in the databases by a checksum pushdown
+CHECKSUM_BUCKETS = 1024
@@ -43,6 +43,14 @@ FILE_TO_FILE = {
         "targetTableQuery": "",
         "targetDatabase": "",
         "record_or_column": "record",
+        "comparisonEngine": "merge",
+        "multisetComparison": False,
+        "typedComparison": False,
+        "convertToCsv": False,
+        "sourceParquetFilter": [],
+        "targetParquetFilter": [],
+        "sourceLayout": [],
+        "targetLayout": [],
         "comparisonType": "file_to_file",
         "testCaseOpType": "file_to_file",
         "isRemotePath": False
@@ -85,6 +93,15 @@ FILE_TO_DB = {
         "targetTableQuery": "QUERY TO FETCH DATA",
         "targetDatabase": "TARGET DATABASE NAME",
         "record_or_column": "record",
+        "comparisonEngine": "merge",
+        "multisetComparison": False,
+        "typedComparison": False,
+        "convertToCsv": False,
+        "sourceParquetFilter": [],
+        "sourceLayout": [],
+        "targetPartitionColumn": "",
+        "targetPartitionBounds": [],
+        "extractionPartitions": 4,
         "comparisonType": "file_to_db",
         "testCaseOpType": "file_to_db",
         "operationType": "compare",
@@ -134,6 +151,16 @@ DB_TO_DB = {
         "targetTableQuery": "ENTER QUERY TO FETCH DATA",
         "targetDatabase": "TARGET DATABASE NAME",
         "record_or_column": "record",
+        "comparisonEngine": "merge",
+        "multisetComparison": False,
+        "typedComparison": False,
+        "sourcePartitionColumn": "",
+        "sourcePartitionBounds": [],
+        "targetPartitionColumn": "",
+        "targetPartitionBounds": [],
+        "extractionPartitions": 4,
+        "checksumPushdown": False,
+        "checksumBuckets": 1024,
         "comparisonType": "db_to_db",
         "testCaseOpType": "db_to_db",
         "source_connection_details": {
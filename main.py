@@ -28,6 +28,7 @@ from configs import config
 from routers.compare_routers import compare_router
 from routers.data_generator_routers import data_generator_router
 from utils.ServerLogs import logger
+from utils.connection_pool import close_pools
 from utils.login import TokenData, verify_token
 
 app = FastAPI(version="0.3.0", docs_url="/docs", redoc_url="/redoc", openapi_url="/openapi.json")
@@ -56,6 +57,12 @@ app.include_router(data_generator_router, prefix='/generator', tags=['synthetic_
 app.include_router(compare_router, prefix='', tags=['compare'])
 
 
+@app.on_event("shutdown")
+def shutdown():
+    """Function to close the pooled database connections when the server stops"""
+    close_pools()
+
+
 @app.post("/get_token")
 def get_token(credentials: Annotated[HTTPBasicCredentials, Depends(security)]):
     """Function to get the bearer token for authorization"""
@@ -14,6 +14,7 @@ from bs4 import BeautifulSoup
 from ydata_profiling import ProfileReport
 
 from utils.ServerLogs import logger
+from utils.delimited_reader import read_delimited
 
 
 def removeTagsFromHTML(filepath):
@@ -51,9 +52,9 @@ def createDataFrameFromSource(datafile):
             for e in encoding_modes:
                 try:
                     if e == 'ignore':
-                        df = pd.DataFrame(pd.read_csv(datafile), index=None)
+                        df = read_delimited(datafile, as_strings=False)
                     else:
-                        df = pd.DataFrame(pd.read_csv(datafile, encoding=e), index=None)
+                        df = read_delimited(datafile, as_strings=False, encoding=e)
                     break
                 except:
                     logger.info(f"Encoding failed : {e}")
@@ -6,6 +6,7 @@ Use of this source code is governed by MIT license that can be found in the LICE
 https://opensource.org/licenses/MIT.
 '''
 
+import math
 import os
 from datetime import datetime
 
@@ -14,6 +15,13 @@ import pandas as pd
 import configs.config as settings
 from utils.ServerLogs import logger
 
+# Number of rows written to the record comparison reports of a summary
+SUMMARY_MATCHED_ROWS = 1000000
+SUMMARY_MISMATCHED_ROWS = 100000
+
+# Number of rows shared in the record comparison response
+RESPONSE_SAMPLE_ROWS = 100
+
 
 def get_time_stamp():
     """Function to get timestamp"""
@@ -62,16 +70,9 @@ def create_record_comparison_files(timestr):
 
 
 def generate_mismatched_excel_rename_csv(mismatched_file, mismatch_data, reportType):
-    """Function to generate mismatched data report"""
+    """Function to generate mismatched data report from the long format mismatched cells"""
     try:
-        result_df = pd.DataFrame()
-
-        for key, item in mismatch_data.items():
-            if (len(item) != 0):
-                result_df = pd.concat([result_df, item])
-
-        result_df.to_csv(mismatched_file, index=False)
-
+        mismatch_data.to_csv(mismatched_file, index=False)
 
     except Exception as E:
         logger.error(f"Exception has occured in making mismatch record: - {str(E)}")
@@ -81,13 +82,9 @@ def generate_mismatched_excel_rename_csv(mismatched_file, mismatch_data, reportT
 
 # # -----------------------------New Addition--------------------------------
 def generate_column_match_report(matched_file, matched_data, reportType):
-    """Function to generate column comparison report"""
+    """Function to generate column comparison report from the long format matched cells"""
     try:
-        result_df = pd.DataFrame()
-        for key, item in matched_data.items():
-            if (len(item) != 0):
-                result_df = pd.concat([result_df, item])
-        result_df.to_csv(matched_file, index=False)
+        matched_data.to_csv(matched_file, index=False)
 
     except Exception as E:
         logger.error(f"Exception has occurred in making match record: - {str(E)}")
@@ -95,7 +92,7 @@ def generate_column_match_report(matched_file, matched_data, reportType):
     return matched_file
 
 
-def generate_report(mismatch_data, matched_data, reportType, df):
+def generate_report(mismatch_data, matched_data, reportType):
     """Caller function to generate report"""
 
     timestr = get_time_stamp()
@@ -161,10 +158,40 @@ def generate_record_comparison_report(matched_data, mismatch_data, rows_SminusT,
     return matched_file, mismatched_file, source_only_file, target_only_file
 
 
+def get_matched_rows_limit(reportType):
+    """Function to get the number of matched rows needed by a record comparison report"""
+    if reportType == "summary":
+        return SUMMARY_MATCHED_ROWS
+    elif reportType == "detailed mismatch":
+        return RESPONSE_SAMPLE_ROWS
+    return None
+
+
+def json_value(value):
+    """Function to get a value of a typed dataframe as a json value, missing values as None"""
+    if hasattr(value, 'item') and not isinstance(value, (pd.Timestamp, pd.Timedelta)):
+        # numpy scalars
+        value = value.item()
+    if value is None or value is pd.NaT or value is pd.NA:
+        return None
+    if isinstance(value, float):
+        return None if value != value else value if math.isfinite(value) else str(value)
+    if isinstance(value, (bool, int, str)):
+        return value
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def get_sample_rows(data_frame):
+    """Function to get the rows shared in a comparison response as lists of json values"""
+    return [[json_value(value) for value in row] for row in data_frame.itertuples(index=False, name=None)]
+
+
 def generate_record_matched_csv(matched_file, matched_data, reportType):
     """Function to generate matched file report"""
     if reportType == "summary":
-        matched_data.head(1000000).to_csv(matched_file, index=False)
+        matched_data.head(SUMMARY_MATCHED_ROWS).to_csv(matched_file, index=False)
     else:
         matched_data.to_csv(matched_file, index=False)
 
@@ -173,7 +200,7 @@ def generate_record_matched_csv(matched_file, matched_data, reportType):
 def generate_record_mismatched_csv(mismatched_file, mismatched_data, reportType):
     """Function to generate mismatched report"""
     if reportType == "summary":
-        mismatched_data.head(100000).to_csv(mismatched_file, index=False)
+        mismatched_data.head(SUMMARY_MISMATCHED_ROWS).to_csv(mismatched_file, index=False)
     else:
         mismatched_data.to_csv(mismatched_file, index=False)
 
@@ -182,7 +209,7 @@ def generate_record_mismatched_csv(mismatched_file, mismatched_data, reportType)
 def generate_source_target_csv(source_exclude_matched_file, rows_SminusT, reportType):
     """Function to only source records report"""
     if reportType == "summary":
-        rows_SminusT.head(100000).to_csv(
+        rows_SminusT.head(SUMMARY_MISMATCHED_ROWS).to_csv(
             source_exclude_matched_file, index=False)
     else:
         rows_SminusT.to_csv(source_exclude_matched_file, index=False)
@@ -191,7 +218,114 @@ def generate_source_target_csv(source_exclude_matched_file, rows_SminusT, report
 def generate_target_source_csv(target_exclude_matched_file, rows_TminusS, reportType):
     """Function to only target records report"""
     if reportType == "summary":
-        rows_TminusS.head(100000).to_csv(
+        rows_TminusS.head(SUMMARY_MISMATCHED_ROWS).to_csv(
             target_exclude_matched_file, index=False)
     else:
         rows_TminusS.to_csv(target_exclude_matched_file, index=False)
+
+
+class RecordReportWriter:
+    """Class to write the record comparison reports batch by batch"""
+
+    def __init__(self, reportType, source_columns, target_columns, extra_columns=('Record_type',)):
+        """Init function"""
+        if reportType not in ("summary", "detailed mismatch", "detailed match"):
+            raise TypeError('Invalid Report Type')
+
+        timestr = get_time_stamp()
+        matched_file, mismatched_file, source_only_file, target_only_file = create_record_comparison_files(
+            timestr)
+        os.makedirs(os.path.dirname(matched_file), exist_ok=True)
+
+        limit = SUMMARY_MISMATCHED_ROWS if reportType == "summary" else None
+        self.files = {}
+        if reportType != "detailed mismatch":
+            self.files['matched'] = [matched_file, SUMMARY_MATCHED_ROWS if reportType == "summary" else None, -1]
+        if reportType != "detailed match":
+            self.files['mismatched'] = [mismatched_file, limit, -1]
+            self.files['source_only'] = [source_only_file, limit, -1]
+            self.files['target_only'] = [target_only_file, limit, -1]
+
+        self.source_columns = list(source_columns) + list(extra_columns)
+        self.target_columns = list(target_columns) + list(extra_columns)
+
+    def write(self, report, rows):
+        """Append rows to a report, the header is written with the first batch"""
+        if report not in self.files:
+            return
+
+        file_path, limit, written = self.files[report]
+        if limit is not None and written >= 0:
+            rows = rows.head(max(limit - written, 0))
+
+        if written >= 0 and rows.empty:
+            return
+
+        rows.to_csv(file_path, mode='a' if written >= 0 else 'w', header=written < 0, index=False)
+        self.files[report][2] = max(written, 0) + len(rows)
+
+    def remaining(self, report):
+        """Number of rows a report can still take, None when it is not limited"""
+        file_path, limit, written = self.files[report]
+        return None if limit is None else max(limit - max(written, 0), 0)
+
+    def write_records(self, rows_Similar, rows_SminusT, rows_TminusS):
+        """Append the rows of a compared batch to the reports"""
+        self.write('matched', rows_Similar)
+        self.write('source_only', rows_SminusT)
+        self.write('mismatched', rows_SminusT)
+        self.write('target_only', rows_TminusS.set_axis(self.target_columns, axis=1))
+
+    def close(self):
+        """Complete the reports and return their paths"""
+        for report, columns in (('matched', self.source_columns), ('source_only', self.source_columns),
+                                ('target_only', self.target_columns)):
+            self.write(report, pd.DataFrame(columns=columns))
+
+        # Target only records follow a header row in the mismatched report
+        self.write('mismatched', pd.DataFrame([self.source_columns], columns=self.source_columns))
+        if 'target_only' in self.files:
+            for chunk in pd.read_csv(self.files['target_only'][0], dtype=str, keep_default_na=False,
+                                     chunksize=SUMMARY_MISMATCHED_ROWS):
+                if self.remaining('mismatched') == 0:
+                    break
+                self.write('mismatched', chunk.set_axis(self.source_columns, axis=1))
+
+        return tuple(self.files[report][0] if report in self.files else None
+                     for report in ('matched', 'mismatched', 'source_only', 'target_only'))
+
+
+class ColumnReportWriter:
+    """Class to write the column comparison reports batch by batch"""
+
+    def __init__(self, reportType, columns):
+        """Init function"""
+        if reportType != "summary":
+            raise TypeError('Invalid Report Type')
+
+        timestr = get_time_stamp()
+        matched_file, mismatched_file, additional_in_source, additional_in_target = create_result_reports(
+            timestr)
+        os.makedirs(os.path.dirname(matched_file), exist_ok=True)
+
+        self.files = {'matched': matched_file, 'mismatched': mismatched_file}
+        for file_path in self.files.values():
+            pd.DataFrame(columns=columns).to_csv(file_path, index=False)
+        self.matched_limit = get_matched_rows_limit(reportType)
+        self.matched_cells = 0
+
+    def remaining_matched(self):
+        """Number of matched cells the matched report can still take, None when it is not limited"""
+        return None if self.matched_limit is None else max(self.matched_limit - self.matched_cells, 0)
+
+    def write(self, mismatch_data, matched_data):
+        """Append the cells of a compared batch to the reports"""
+        mismatch_data.to_csv(self.files['mismatched'], mode='a', header=False, index=False)
+        if self.matched_limit is not None:
+            matched_data = matched_data.head(self.remaining_matched())
+        matched_data.to_csv(self.files['matched'], mode='a', header=False, index=False)
+        self.matched_cells += len(matched_data)
+
+    def close(self):
+        """Return the paths of the matched and mismatched reports"""
+        return self.files['matched'], self.files['mismatched']
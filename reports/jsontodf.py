@@ -8,8 +8,113 @@ https://opensource.org/licenses/MIT.
 
 import json
 
+import numpy as np
 import pandas as pd
 
+from configs import config
+from utils.flatten import flatten_dict
+
+# Number of characters read from the file at a time
+READ_BLOCK_CHARS = 1024 * 1024
+
+
+def iter_json_values(file, in_array, buffer=''):
+    """Function to decode the values of an open json file one at a time
+
+    The values are the elements of the top level array, or the objects written one after the other
+    as in NDJSON, so only the value being decoded is held in memory.
+
+    Args:
+        file: Open text file, positioned after the '[' of an array
+        in_array: The values are the elements of a top level array
+        buffer: Text already read from the file
+
+    Returns:
+        Iterator of values
+
+    """
+    decoder = json.JSONDecoder()
+    position = 0
+    eof = False
+    while True:
+        # Separators between values
+        while position < len(buffer) and (buffer[position].isspace() or (in_array and buffer[position] == ',')):
+            position += 1
+        if in_array and position < len(buffer) and buffer[position] == ']':
+            return
+
+        if position < len(buffer):
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+                # Only a number which ends with the buffer may continue in the next block
+                if end < len(buffer) or eof or isinstance(value, bool) or not isinstance(value, (int, float)):
+                    yield value
+                    position = end
+                    continue
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+
+        if eof:
+            if in_array:
+                raise json.JSONDecodeError("Unterminated array", buffer, position)
+            return
+
+        # The pending text is at least doubled before it is decoded again, so a value which spans many
+        # blocks, e.g. one top level object, is decoded a logarithmic number of times instead of once per block
+        block = file.read(max(READ_BLOCK_CHARS, len(buffer) - position))
+        eof = not block
+        buffer = buffer[position:] + block
+        position = 0
+
+
+def iter_json_records(filepath):
+    """Function to stream the records of a json file, a top level array, one object or NDJSON lines"""
+    with open(filepath) as data_file:
+        first = ''
+        while not first:
+            first = data_file.read(1)
+            if not first:
+                return
+            if first.isspace():
+                first = ''
+
+        if first == '[':
+            yield from iter_json_values(data_file, in_array=True)
+        elif first == '{':
+            yield from iter_json_values(data_file, in_array=False, buffer=first)
+        else:
+            data_file.seek(0)
+            yield json.load(data_file)
+
+
+def columnar_batch(rows):
+    """Function to build a dataframe from flattened rows column by column, missing values are NaN"""
+    columns = {}
+    for position, row in enumerate(rows):
+        for key, value in row.items():
+            column = columns.get(key)
+            if column is None:
+                column = columns[key] = [np.nan] * position
+            column.append(value)
+        for column in columns.values():
+            if len(column) == position:
+                column.append(np.nan)
+    return pd.DataFrame(columns, index=pd.RangeIndex(len(rows)))
+
+
+def get_json_dataframe_chunks(filepath, chunksize=100000):
+    """Function to read the flattened records of a json file as dataframes of at most chunksize records"""
+    rows = []
+    for record in iter_json_records(filepath):
+        rows.append(flatten_dict(record))
+        if len(rows) == chunksize:
+            yield columnar_batch(rows)
+            rows = []
+
+    if rows:
+        yield columnar_batch(rows)
+
 
 class JsonToCsv:
     """class to convert json to csv"""
@@ -21,28 +126,10 @@ class JsonToCsv:
         self.main(self.JsonPath)
 
     def main(self, filepath):
-        """Main function Load the JSON data from the file"""
-        # Load the JSON data from the file (assuming the file is named "myJson.json")
-        try:
-            with open(filepath) as data_file:
-                data = json.load(data_file)
-        except json.decoder.JSONDecodeError:
-            # If direct loading fails, assume it's a line-delimited JSON
-            with open(filepath, 'r') as f:
-                lines = f.readlines()
-                data = [json.loads(line) for line in lines]
-
-        rows = []
-        if isinstance(data, dict):
-            data = [data]
-
-        for row in data:
-            # Flatten the nested JSON into a dictionary
-            flat_data = self.flatten_json(row)
-            rows.append(flat_data)
-
-        # Create a DataFrame from the flattened dictionary
-        self.dataframe = pd.DataFrame(rows)
+        """Main function Load the JSON data from the file, record by record"""
+        chunks = list(get_json_dataframe_chunks(filepath, int(config.READ_CHUNK_ROWS)))
+        if chunks:
+            self.dataframe = pd.concat(chunks, ignore_index=True)
 
     def get_df(self):
         """function to get dataframe"""
@@ -52,17 +139,4 @@ class JsonToCsv:
         """
         Flatten a nested JSON object into a flat dictionary.
         """
-        items = []
-        for k, v in json_data.items():
-            new_key = f"{parent_key}{sep}{k}" if parent_key else k
-            if isinstance(v, dict):
-                items.extend(self.flatten_json(v, new_key, sep=sep).items())
-            elif isinstance(v, list):
-                if all(isinstance(item, dict) for item in v):
-                    for idx, item in enumerate(v):
-                        items.extend(self.flatten_json(item, f"{new_key}[{idx}]", sep=sep).items())
-                else:
-                    items.append((new_key, v))
-            else:
-                items.append((new_key, v))
-        return dict(items)
+        return flatten_dict(json_data, parent_key, sep)
@@ -0,0 +1,140 @@
+'''
+Copyright 2024 Infosys Ltd.
+
+Use of this source code is governed by MIT license that can be found in the LICENSE file or at
+
+https://opensource.org/licenses/MIT.
+'''
+
+import json
+from io import BytesIO
+
+import fastavro
+import pandas as pd
+
+from comparator.parallel_comparison import map_in_pool
+from configs import config
+from utils.ServerLogs import logger
+
+# Length of the sync marker which ends every block of an avro file
+SYNC_SIZE = 16
+
+
+def read_long(file):
+    """Function to read a zig-zag encoded avro long, None at the end of the file"""
+    shift = 0
+    value = 0
+    while True:
+        byte = file.read(1)
+        if not byte:
+            return None
+        value |= (byte[0] & 0x7F) << shift
+        if not byte[0] & 0x80:
+            return (value >> 1) ^ -(value & 1)
+        shift += 7
+
+
+def read_header(file_name):
+    """Function to read the header of an avro file
+
+    Returns:
+        Header bytes, writer schema, block ranges as (start, end, no_of_records)
+
+    """
+    with open(file_name, 'rb') as f:
+        reader = fastavro.reader(f)
+        sync = reader._header['sync']
+        schema = json.loads(reader.metadata['avro.schema'])
+        header_end = f.tell()
+
+        # Blocks are skipped over without decompressing them
+        blocks = []
+        start = header_end
+        while True:
+            no_of_records = read_long(f)
+            if no_of_records is None:
+                break
+            size = read_long(f)
+            f.seek(size, 1)
+            if f.read(SYNC_SIZE) != sync:
+                raise ValueError(f'Invalid sync marker after the block at {start}')
+            blocks.append((start, f.tell(), no_of_records))
+            start = f.tell()
+
+        f.seek(0)
+        return f.read(header_end), schema, blocks
+
+
+def get_reader_schema(schema, col_list):
+    """Function to get a reader schema with only the mapped fields, None to read every field"""
+    if not col_list or schema.get('type') != 'record':
+        return None
+
+    projected = dict(schema, fields=[field for field in schema['fields'] if field['name'] in col_list])
+    try:
+        fastavro.parse_schema(projected)
+    except Exception as e:
+        # A kept field may refer to a named type defined by a dropped field
+        logger.info(f"Avro projection is not possible, every field is read - {e}")
+        return None
+    return projected
+
+
+def split_tasks(blocks, records_per_task):
+    """Function to group consecutive blocks into byte ranges of about records_per_task records"""
+    tasks = []
+    start, no_of_records = None, 0
+    for block_start, block_end, block_records in blocks:
+        if start is None:
+            start = block_start
+        no_of_records += block_records
+        if no_of_records >= records_per_task:
+            tasks.append((start, block_end))
+            start, no_of_records = None, 0
+
+    if start is not None:
+        tasks.append((start, blocks[-1][1]))
+    return tasks
+
+
+def decode_blocks(file_name, header, start, end, reader_schema=None):
+    """Function to decode a byte range of avro blocks into a dataframe, column by column"""
+    with open(file_name, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    reader = fastavro.reader(BytesIO(header + data), reader_schema=reader_schema)
+    schema = reader_schema or reader.writer_schema
+    if schema.get('type') != 'record':
+        return pd.DataFrame(list(reader))
+
+    columns = {field['name']: [] for field in schema['fields']}
+    appends = [(name, column.append) for name, column in columns.items()]
+    for record in reader:
+        for name, append in appends:
+            append(record[name])
+    return pd.DataFrame(columns)
+
+
+def get_avro_dataframe_chunks(file_name, col_list=None, records_per_chunk=None):
+    """Function to read an avro file as dataframes of whole blocks, decoded in worker processes for large files
+
+    Args:
+        file_name: Path of the avro file
+        col_list: Fields to decode, all of them when empty
+        records_per_chunk: Number of records per dataframe, rounded up to whole blocks
+
+    Returns:
+        Iterator of dataframes
+
+    """
+    header, schema, blocks = read_header(file_name)
+    reader_schema = get_reader_schema(schema, col_list)
+    tasks = split_tasks(blocks, records_per_chunk or int(config.READ_CHUNK_ROWS))
+
+    no_of_records = sum(block[2] for block in blocks)
+    if len(tasks) <= 1 or no_of_records < int(config.PARALLEL_MIN_ROWS):
+        return (decode_blocks(file_name, header, start, end, reader_schema) for start, end in tasks)
+
+    logger.info(f"Decoding {no_of_records} avro records of {len(blocks)} blocks in {len(tasks)} parallel tasks")
+    return map_in_pool(decode_blocks, [(file_name, header, start, end, reader_schema) for start, end in tasks])
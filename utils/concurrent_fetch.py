@@ -0,0 +1,53 @@
+'''
+Copyright 2024 Infosys Ltd.
+
+Use of this source code is governed by MIT license that can be found in the LICENSE file or at
+
+https://opensource.org/licenses/MIT.
+'''
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from configs import config
+from utils.ServerLogs import logger
+
+
+def timed(read):
+    """Function to run a read and measure its duration in seconds"""
+    start_time = time.time()
+    data = read()
+    return data, round(time.time() - start_time, 2)
+
+
+def fetch_concurrently(source_read, target_read):
+    """Function to read the source and the target at the same time, in two threads
+
+    Reads wait on files, databases and the network, so the threads overlap even with the GIL. A failing
+    read raises once both reads are over. Reads run one after the other when CONCURRENT_EXTRACTION is off.
+
+    Args:
+        source_read: Function which returns the source data
+        target_read: Function which returns the target data
+
+    Returns:
+        Source data, target data, extraction time of each side in seconds
+
+    """
+    if not config.CONCURRENT_EXTRACTION:
+        (source_data, source_time), (target_data, target_time) = timed(source_read), timed(target_read)
+    else:
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix='extraction') as pool:
+            source_future = pool.submit(timed, source_read)
+            target_future = pool.submit(timed, target_read)
+            (source_data, source_time), (target_data, target_time) = source_future.result(), target_future.result()
+
+    logger.info(f"Extraction time - source {source_time}s, target {target_time}s")
+    return source_data, target_data, {'source_extraction_time': source_time, 'target_extraction_time': target_time}
+
+
+def add_extraction_times(response, extraction_times):
+    """Function to report the extraction time of each side with a comparison response"""
+    if isinstance(response, dict):
+        response.update(extraction_times)
+    return response
@@ -0,0 +1,250 @@
+'''
+Copyright 2024 Infosys Ltd.
+
+Use of this source code is governed by MIT license that can be found in the LICENSE file or at
+
+https://opensource.org/licenses/MIT.
+'''
+
+import threading
+import time
+from collections import deque
+
+from configs import config
+from utils.ServerLogs import logger
+from utils.exceptions import ConnectionPoolTimeout
+
+# Query run on a connection which was idle for a while before it is handed out again
+VALIDATION_QUERIES = {'Oracle': 'SELECT 1 FROM DUAL', 'Hana': 'SELECT 1 FROM DUMMY'}
+DEFAULT_VALIDATION_QUERY = 'SELECT 1'
+
+# Pools by (connection alias, database), with the connection details they were created for
+_pools = {}
+_pools_lock = threading.Lock()
+
+# Pool of every checked out connection, by id of the connection
+_checked_out = {}
+
+# Clients which pool their own connections, e.g. MongoClient, by connection alias with their connection details
+_clients = {}
+
+
+def close_quietly(connection):
+    """Function to close a connection, ignoring the errors of a connection which is already broken"""
+    try:
+        connection.close()
+    except Exception as e:
+        logger.info(f"Connection could not be closed - {e}")
+
+
+class ConnectionPool:
+    """Class to keep the open connections of one connection alias and database for reuse
+
+    Connections are checked out for a query and returned once its results are read. Returned connections
+    wait in the pool, the ones idle for more than idle_seconds are closed down to min_size. A connection
+    idle for more than health_check_seconds is validated before it is handed out again.
+    """
+
+    def __init__(self, name, connect, database_type=None, min_size=None, max_size=None, idle_seconds=None,
+                 health_check_seconds=None):
+        """Init function"""
+        self.name = name
+        self.connect = connect
+        self.validation_query = VALIDATION_QUERIES.get(database_type, DEFAULT_VALIDATION_QUERY)
+        self.min_size = int(config.DB_POOL_MIN_SIZE) if min_size is None else min_size
+        self.max_size = max(1, int(config.DB_POOL_MAX_SIZE) if max_size is None else max_size)
+        self.idle_seconds = int(config.DB_POOL_IDLE_SECONDS) if idle_seconds is None else idle_seconds
+        self.health_check_seconds = int(config.DB_POOL_HEALTH_CHECK_SECONDS) if health_check_seconds is None \
+            else health_check_seconds
+
+        # Idle connections with the time they were returned, most recently returned last
+        self.idle = deque()
+        self.size = 0
+        self.closed = False
+        self.condition = threading.Condition()
+
+    def is_healthy(self, connection):
+        """Run the validation query on a connection"""
+        cursor = None
+        try:
+            cursor = connection.cursor()
+            cursor.execute(self.validation_query)
+            cursor.fetchall()
+            return True
+        except Exception as e:
+            logger.info(f"Pooled connection of {self.name} is not usable - {e}")
+            return False
+        finally:
+            if cursor is not None:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+
+    def evict_idle(self, now):
+        """Close the connections idle for more than idle_seconds, keeping min_size connections open"""
+        expired = []
+        with self.condition:
+            while self.idle and self.size > self.min_size and now - self.idle[0][1] > self.idle_seconds:
+                expired.append(self.idle.popleft()[0])
+                self.size -= 1
+            if expired:
+                self.condition.notify(len(expired))
+        for connection in expired:
+            close_quietly(connection)
+
+    def checkout(self, timeout=None):
+        """Get an open connection, waiting up to timeout seconds when max_size connections are checked out
+
+        Args:
+            timeout: Seconds to wait for a free connection, DB_POOL_CHECKOUT_TIMEOUT by default
+
+        Returns:
+            Connection, to be given back with checkin
+
+        """
+        timeout = int(config.DB_POOL_CHECKOUT_TIMEOUT) if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        self.evict_idle(time.monotonic())
+
+        while True:
+            with self.condition:
+                while not self.idle and self.size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or self.closed:
+                        raise ConnectionPoolTimeout(self.name)
+                    self.condition.wait(remaining)
+
+                if self.idle:
+                    connection, returned_at = self.idle.pop()
+                else:
+                    # The slot is taken before connecting so that concurrent checkouts respect max_size
+                    connection, returned_at = None, None
+                    self.size += 1
+
+            if connection is None:
+                try:
+                    return self.connect()
+                except Exception:
+                    self.discard()
+                    raise
+
+            if time.monotonic() - returned_at <= self.health_check_seconds or self.is_healthy(connection):
+                return connection
+            close_quietly(connection)
+            self.discard()
+
+    def checkin(self, connection, broken=False):
+        """Give back a checked out connection, open transactions are rolled back and broken connections closed"""
+        if not broken:
+            try:
+                connection.rollback()
+            except Exception as e:
+                logger.info(f"Connection of {self.name} is dropped - {e}")
+                broken = True
+
+        if broken or self.closed:
+            close_quietly(connection)
+            self.discard()
+            return
+
+        with self.condition:
+            self.idle.append((connection, time.monotonic()))
+            self.condition.notify()
+
+    def discard(self):
+        """Free the slot of a connection which was closed or could not be opened"""
+        with self.condition:
+            self.size -= 1
+            self.condition.notify()
+
+    def close(self):
+        """Close the idle connections, checked out ones are closed when they are given back"""
+        with self.condition:
+            self.closed = True
+            idle = [connection for connection, _ in self.idle]
+            self.idle.clear()
+            self.size -= len(idle)
+            self.condition.notify_all()
+        for connection in idle:
+            close_quietly(connection)
+
+
+def get_pool(connection_alias, database, details, connect):
+    """Function to get the pool of a connection alias and database, a new one when its connection details changed
+
+    Args:
+        connection_alias: Alias of the DBConnectionModel entry
+        database: Database of the connections, None when the alias connects to one database
+        details: DBConnectionModel entry of the alias
+        connect: Function which opens a new connection
+
+    Returns:
+        ConnectionPool
+
+    """
+    key = (connection_alias, database)
+    fingerprint = repr(sorted((details or {}).items()))
+    with _pools_lock:
+        pool, pool_fingerprint = _pools.get(key, (None, None))
+        if pool is not None and pool_fingerprint == fingerprint:
+            return pool
+
+        stale = pool
+        pool = ConnectionPool(f"{connection_alias}/{database}" if database else connection_alias, connect,
+                              (details or {}).get('databaseType'))
+        _pools[key] = (pool, fingerprint)
+
+    if stale is not None:
+        logger.info(f"Connection details of {connection_alias} changed, its pooled connections are closed")
+        stale.close()
+    return pool
+
+
+def checkout_connection(connection_alias, database, details, connect):
+    """Function to check out a connection of the pool of a connection alias and database, see release_connection"""
+    pool = get_pool(connection_alias, database, details, connect)
+    connection = pool.checkout()
+    with _pools_lock:
+        _checked_out[id(connection)] = (pool, connection)
+    return connection
+
+
+def release_connection(connection, broken=False):
+    """Function to give a checked out connection back to its pool, other connections are left as they are"""
+    if connection is None:
+        return
+    with _pools_lock:
+        pool, _ = _checked_out.pop(id(connection), (None, None))
+    if pool is not None:
+        pool.checkin(connection, broken)
+
+
+def get_shared_client(connection_alias, details, connect):
+    """Function to get the client of a connection alias which pools its own connections, one per process"""
+    fingerprint = repr(sorted((details or {}).items()))
+    with _pools_lock:
+        client, client_fingerprint = _clients.get(connection_alias, (None, None))
+        if client is not None and client_fingerprint == fingerprint:
+            return client
+
+        stale = client
+        client = connect()
+        _clients[connection_alias] = (client, fingerprint)
+
+    if stale is not None:
+        close_quietly(stale)
+    return client
+
+
+def close_pools():
+    """Function to close the idle connections of every pool and the shared clients"""
+    with _pools_lock:
+        pools = [pool for pool, _ in _pools.values()]
+        clients = [client for client, _ in _clients.values()]
+        _pools.clear()
+        _clients.clear()
+    for pool in pools:
+        pool.close()
+    for client in clients:
+        close_quietly(client)
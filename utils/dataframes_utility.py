@@ -9,55 +9,79 @@ https://opensource.org/licenses/MIT.
 import json
 import re
 
-import fastavro
 import pandas as pd
 import pydrill
 import pymongo
-import xmltodict
 
+from configs import config
 from reports.jsontodf import JsonToCsv
 from utils.ServerLogs import logger
+from utils.avro_reader import get_avro_dataframe_chunks
+from utils.delimited_reader import read_delimited, read_delimited_chunks
+from utils.fixed_width_reader import MappedTextFile
+from utils.partitioned_extraction import read_table_partitions, stream_table_partitions
+from utils.sql_stream import iter_query_batches
+from utils.xml_reader import get_xml_dataframe_chunks
 
 
-def get_parquet_dataframe(file_name):
-    """Function to read parquet data"""
-    return pd.read_parquet(file_name)
+def get_parquet_filters(filters):
+    """Function to get a parquet filter from a list or json string of [column, op, value] predicates
 
+    The predicates of a list must all hold. A list of such lists matches the rows where one of them holds.
+    """
+    if not filters:
+        return None
+    if isinstance(filters, str):
+        filters = json.loads(filters)
+    if isinstance(filters[0][0], str):
+        filters = [filters]
+    return [[tuple(predicate) for predicate in conjunction] for conjunction in filters]
 
-def get_avro_dataframe(file_name):
-    """Function to get avro dataframe"""
-    with open(file_name, 'rb') as f:
-        reader = fastavro.reader(f)
-        records = [r for r in reader]
-        df = pd.DataFrame(records)
-    return df
+
+def get_parquet_dataframe(file_name, col_list=None, filters=None):
+    """Function to read parquet data
+
+    Only the column chunks of col_list are read, and row groups whose statistics rule out the filter are
+    skipped before the remaining rows are filtered.
+
+    Args:
+        file_name: Path of the parquet file or dataset directory
+        col_list: Columns to read, all of them when empty
+        filters: Filter from the request, see get_parquet_filters
+
+    Returns:
+        Dataframe
+
+    """
+    return pd.read_parquet(file_name, columns=col_list or None, filters=get_parquet_filters(filters))
+
+
+def get_avro_dataframe(file_name, col_list=None):
+    """Function to get avro dataframe, with only the fields of col_list decoded when it is given"""
+    chunks = list(get_avro_dataframe_chunks(file_name, col_list))
+    return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=col_list)
 
 
-def get_delimited_dataframe(file_name, col_list, delimiter):
-    """Function to read csv data"""
+def get_delimited_dataframe(file_name, col_list, delimiter, chunksize=None):
+    """Function to read csv data, as an iterator of dataframes of at most chunksize rows when it is given"""
+    if chunksize:
+        return get_delimited_dataframe_chunks(file_name, col_list, delimiter, chunksize)
+
     try:
         if col_list:
             if delimiter != '':
-                df = pd.read_csv(file_name, usecols=col_list, delimiter=delimiter, header=0, dtype=str,
-                                 keep_default_na=False).fillna('')
-
-                sample = df
+                df = read_delimited(file_name, col_list, delimiter)
 
                 logger.info("Dataframe inside dataframe utility---")
-
-                sample = sample.convert_dtypes()
-
                 logger.info("Datatype is----")
-                logger.info(sample.dtypes)
+                logger.info(df.dtypes)
 
-                return sample[col_list]
+                return df
             else:
 
-                df = pd.read_csv(file_name, usecols=col_list, header=0).fillna('')
-
-                return df[col_list]
+                return read_delimited(file_name, col_list, as_strings=False).fillna('')
         else:
-            return pd.read_csv(file_name, delimiter=delimiter).fillna('')
+            return read_delimited(file_name, delimiter=delimiter, as_strings=False).fillna('')
 
 
     except Exception as e:
@@ -65,6 +89,15 @@ def get_delimited_dataframe(file_name, col_list, delimiter):
         raise Exception(f"Exception while dataframe creation : {e}")
 
 
+def get_delimited_dataframe_chunks(file_name, col_list, delimiter, chunksize):
+    """Function to read csv data as dataframes of at most chunksize rows, only the listed columns are parsed"""
+    try:
+        return read_delimited_chunks(file_name, col_list, delimiter, chunksize)
+    except Exception as e:
+        logger.error(f"Exception while dataframe creation : {e}")
+        raise Exception(f"Exception while dataframe creation : {e}")
+
+
 def get_dataframe_from_file(query, connection, delimiter, filepath, *args):
     """Function to read sql data from file"""
     try:
@@ -100,14 +133,9 @@ def get_dataframe_from_file(query, connection, delimiter, filepath, *args):
         return None
 
 
-def get_dat_dataframe(file_name):
-    """Function to read text data"""
-    df = pd.DataFrame()
-    with open(file_name, "r") as f:
-        text = f.read()
-    lines = text.split()
-    df["Records"] = lines
-    return df
+def get_dat_dataframe(file_name, layout=None):
+    """Function to read text data, one record per line or the fields of a fixed width layout"""
+    return MappedTextFile(file_name, layout).to_dataframe()
 
 
 def get_json_dataframe(file_name, data_frame=False):
@@ -129,63 +157,16 @@ def get_json_dataframe(file_name, data_frame=False):
         return None
 
 
-def get_xml_dataframe(file_name, data_frame=False):
-    """Function to read xml data"""
+def get_xml_dataframe(file_name, data_frame=False, record_tag=None):
+    """Function to read xml data, streaming the records named record_tag or the children of the root element"""
     try:
-        with open(file_name, 'r') as file:
-            xml_content = file.read()
-            file.close()
-
-        # Parse XML content into an OrderedDict
-        data_dict = xmltodict.parse(xml_content)
-
-        # Find the root element and the first key which contains the data
-        root_key = list(data_dict.keys())[0]
-        data_list = data_dict[root_key]
-
-        # If the data list is actually a dictionary, convert it to a list of dictionaries
-        if isinstance(data_list, dict):
-            data_list = [data_list]
-        elif not isinstance(data_list, list):
-            raise ValueError("Unexpected XML structure")
-
-        # Handle cases where nested dictionaries exist under a single key (like "person")
-        if isinstance(data_list, list) and all(isinstance(elem, dict) and len(elem) == 1 for elem in data_list):
-            key_to_flatten = list(data_list[0].keys())[0]
-            data_list = [item[key_to_flatten] for item in data_list][0]
-
-        # Flatten each dictionary in the list
-        flat_data = [flatten_dict(item) for item in data_list]
-
-        # Create a DataFrame from the flattened data
-        df = pd.DataFrame(flat_data)
-
-        return df
+        chunks = list(get_xml_dataframe_chunks(file_name, record_tag, int(config.READ_CHUNK_ROWS)))
+        return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
     except Exception as E:
         logger.error(f"Error happened while converting XML file: - {E}")
         raise Exception("Error happened while converting XML file:", E)
 
 
-def flatten_dict(d, parent_key='', sep='.'):
-    """
-    Flatten a nested dictionary.
-    """
-    items = []
-    for k, v in d.items():
-        new_key = f"{parent_key}{sep}{k}" if parent_key else k
-        if isinstance(v, dict):
-            items.extend(flatten_dict(v, new_key, sep=sep).items())
-        elif isinstance(v, list):
-            if all(isinstance(i, dict) for i in v):
-                for idx, item in enumerate(v):
-                    items.extend(flatten_dict(item, f"{new_key}[{idx}]", sep=sep).items())
-            else:
-                items.append((new_key, v))
-        else:
-            items.append((new_key, v))
-    return dict(items)
-
-
 def get_data_frame_obj(json_data):
     """Function to get json dataframe object"""
     parent_key = list(json_data.keys())
@@ -242,6 +223,44 @@ def get_dataframe_from_table(query, connection, *args):
         return None
 
 
+def get_table_data(query, connection, table_name, columns, chunksize=None, partitioning=None):
+    """Function to read the mapped columns of a query, or of a mongo collection, in chunks when chunksize is given
+
+    With partitioning, see get_partitioning, the query is read as ranges of its partition column, in parallel as
+    one dataframe or, when chunksize is given, streamed one range after another.
+    """
+    if isinstance(connection, pymongo.database.Database):
+        logger.info("Trying to utils to Mongoinside db 2 db")
+        cursor = connection[table_name].find()
+        df = pd.DataFrame(list(cursor))
+        return df.drop(columns=['_id'])[columns]
+
+    if partitioning and chunksize:
+        return stream_table_partitions(query, connection,
+                                       lambda range_query, range_connection: get_dataframe_chunks_from_table(
+                                           range_query, range_connection, columns, chunksize),
+                                       partitioning['partition_column'], partitioning.get('bounds'),
+                                       partitioning.get('no_of_partitions'))
+
+    if partitioning:
+        frames = read_table_partitions(query, connection, partitioning['connect'],
+                                       lambda range_query, range_connection: get_dataframe_from_table(
+                                           range_query, range_connection, columns),
+                                       partitioning['partition_column'], partitioning.get('bounds'),
+                                       partitioning.get('no_of_partitions'))
+        return None if frames is None else pd.concat(frames, ignore_index=True)
+
+    if chunksize and not isinstance(connection, pydrill.client.PyDrill):
+        return get_dataframe_chunks_from_table(query, connection, columns, chunksize)
+    return get_dataframe_from_table(query, connection, columns)
+
+
+def get_dataframe_chunks_from_table(query, connection, columns, chunksize):
+    """Function to read data from table as dataframes of at most chunksize rows, streamed from a server side cursor"""
+    for chunk in iter_query_batches(query, connection, chunksize):
+        yield chunk.fillna('')[columns]
+
+
 def dynamic_query_hbase_convert(df, connection, query, columns):
     """
     Hbase UTF to Readable Format
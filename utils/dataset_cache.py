@@ -0,0 +1,199 @@
+'''
+Copyright 2024 Infosys Ltd.
+
+Use of this source code is governed by MIT license that can be found in the LICENSE file or at
+
+https://opensource.org/licenses/MIT.
+'''
+
+import hashlib
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from configs import config
+from utils.ServerLogs import logger
+
+# Bytes of the file hashed at a time
+HASH_BLOCK_BYTES = 8 * 1024 * 1024
+
+# Content hashes of the files most recently hashed by this process, by path with the size and mtime they
+# were hashed at, at most CONTENT_HASH_ENTRIES files
+CONTENT_HASH_ENTRIES = 1024
+_content_hashes = OrderedDict()
+_content_hashes_lock = threading.Lock()
+
+# Schema metadata of a cached dataset listing the object columns whose missing values are NaN
+NAN_COLUMNS_KEY = b'idvex_nan_columns'
+
+
+def get_content_hash(file_name, stat):
+    """Function to hash the content of a file, once per version of the file"""
+    path, version = os.path.realpath(file_name), (stat.st_size, stat.st_mtime_ns)
+    with _content_hashes_lock:
+        hashed_version, content_hash = _content_hashes.get(path, (None, None))
+        if hashed_version == version:
+            _content_hashes.move_to_end(path)
+            return content_hash
+
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_name, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b''):
+            digest.update(block)
+
+    # A new version of a file replaces the hash of the previous one
+    with _content_hashes_lock:
+        _content_hashes[path] = (version, digest.hexdigest())
+        _content_hashes.move_to_end(path)
+        while len(_content_hashes) > CONTENT_HASH_ENTRIES:
+            _content_hashes.popitem(last=False)
+    return digest.hexdigest()
+
+
+def get_cache_key(file_name, stat, options, col_list):
+    """Function to get the cache key of a file read with reader options and columns"""
+    fingerprint = [os.path.realpath(file_name), stat.st_size, stat.st_mtime_ns, get_content_hash(file_name, stat),
+                   options, list(col_list) if col_list else None]
+    return hashlib.sha256(json.dumps(fingerprint, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def get_cache_path(key):
+    """Function to get the path of a cached dataset"""
+    return os.path.join(config.DATASET_CACHE_DIR, key + '.arrow')
+
+
+def is_cacheable(table, data_frame):
+    """Function to check that a dataframe comes back unchanged from Arrow, with string column names and
+    object columns holding strings"""
+    if not all(isinstance(column, str) for column in data_frame.columns):
+        return False
+    for column, field in zip(data_frame.columns, table.schema):
+        if data_frame[column].dtype == object and not (pa.types.is_string(field.type) or
+                                                       pa.types.is_large_string(field.type) or
+                                                       pa.types.is_binary(field.type) or
+                                                       pa.types.is_null(field.type)):
+            return False
+    return True
+
+
+def get_nan_columns(data_frame):
+    """Function to get the object columns whose missing values are NaN rather than None
+
+    Arrow stores both as null, which come back as None. None is returned when a column mixes NaN, None or
+    other missing values, the dataset can then not be restored as it was parsed.
+    """
+    nan_columns = []
+    for column in data_frame.columns:
+        series = data_frame[column]
+        if series.dtype != object:
+            continue
+        kinds = {type(value) for value in series[series.isna()]}
+        if kinds == {float}:
+            nan_columns.append(column)
+        elif kinds and kinds != {type(None)}:
+            return None
+    return nan_columns
+
+
+def read_cached(key):
+    """Function to read a cached dataset and mark it as recently used, None when it is not cached"""
+    path = get_cache_path(key)
+    try:
+        table = feather.read_table(path, memory_map=True)
+        os.utime(path)
+    except (FileNotFoundError, pa.ArrowInvalid):
+        return None
+
+    data_frame = table.to_pandas()
+    for column in json.loads((table.schema.metadata or {}).get(NAN_COLUMNS_KEY, b'[]')):
+        data_frame[column] = data_frame[column].where(data_frame[column].notna(), float('nan'))
+    return data_frame
+
+
+def evict(budget_bytes):
+    """Function to delete the least recently used datasets until the cache fits in its budget"""
+    entries = []
+    for entry in os.scandir(config.DATASET_CACHE_DIR):
+        if entry.name.endswith('.arrow'):
+            stat = entry.stat()
+            entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= budget_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except FileNotFoundError:
+            pass
+
+
+def write_cached(key, data_frame):
+    """Function to store a parsed dataset in the cache, datasets which do not round trip through Arrow are skipped"""
+    budget_bytes = int(config.DATASET_CACHE_SIZE_MB) * 1024 * 1024
+    try:
+        table = pa.Table.from_pandas(data_frame)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError, ValueError) as e:
+        logger.info(f"Dataset is not cached - {e}")
+        return
+    nan_columns = get_nan_columns(data_frame)
+    if nan_columns is None or not is_cacheable(table, data_frame) or table.nbytes > budget_bytes:
+        logger.info("Dataset is not cached")
+        return
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                           NAN_COLUMNS_KEY: json.dumps(nan_columns).encode()})
+
+    os.makedirs(config.DATASET_CACHE_DIR, exist_ok=True)
+    temp_path = os.path.join(config.DATASET_CACHE_DIR, f'{key}.{uuid.uuid4().hex}.tmp')
+    feather.write_feather(table, temp_path, compression='lz4')
+    os.replace(temp_path, get_cache_path(key))
+    evict(budget_bytes)
+
+
+def get_cached_dataframe(file_name, options, col_list, load):
+    """Function to get a parsed dataset from the cache, parsing and storing it when it is not cached
+
+    A dataset is cached under the path, size, modification time and content hash of the file, the reader
+    options and the columns read. A read of some columns is also served from a cached read of the whole
+    file with the same options.
+
+    Args:
+        file_name: Path of the file
+        options: Reader options which change the parsed data, json serializable
+        col_list: Columns read, all of them when empty
+        load: Function which parses the file
+
+    Returns:
+        Dataframe
+
+    """
+    if not int(config.DATASET_CACHE_SIZE_MB) or not os.path.isfile(file_name):
+        return load()
+
+    stat = os.stat(file_name)
+    key = get_cache_key(file_name, stat, options, col_list)
+    data_frame = read_cached(key)
+    if data_frame is None and col_list:
+        data_frame = read_cached(get_cache_key(file_name, stat, options, None))
+        if data_frame is not None and not set(col_list).issubset(data_frame.columns):
+            data_frame = None
+        if data_frame is not None:
+            data_frame = data_frame[list(col_list)]
+
+    if data_frame is not None:
+        logger.info(f"Parsed dataset of {file_name} read from the cache")
+        return data_frame
+
+    data_frame = load()
+    if data_frame is not None:
+        try:
+            write_cached(key, data_frame)
+        except OSError as e:
+            logger.error(f"Dataset could not be cached - {e}")
+    return data_frame
@@ -23,15 +23,24 @@ from pymongo import MongoClient
 from configs import config
 
 from utils.ServerLogs import logger
+from utils.connection_pool import checkout_connection, get_shared_client
 
 DRILL_ALLOWED_SET = {"hbase"}
 message = ''
 
+# Result of the initiation of the oracle client, None until it is initiated
+oracle_client_initiated = None
+
 
 def postgres_db_obj(database, connection_details):
-    """Function to get postgresql connection object"""
+    """Function to check out a pooled postgresql connection object, given back with release_connection"""
     dbDetailsObject = get_db_details(connection_details)
+    return checkout_connection(connection_details, database, dbDetailsObject,
+                               lambda: open_postgres_connection(database, dbDetailsObject))
+
 
+def open_postgres_connection(database, dbDetailsObject):
+    """Function to open a postgresql connection"""
     try:
         if (dbDetailsObject['sslCert'] != None):
 
@@ -53,8 +62,13 @@ def postgres_db_obj(database, connection_details):
 
 
 def mysql_db_Obj(db, connectionAlias):
-    """Function to get mysql connection object"""
+    """Function to check out a pooled mysql connection object, given back with release_connection"""
     dbDetailsObject = get_db_details(connectionAlias)
+    return checkout_connection(connectionAlias, db, dbDetailsObject, lambda: open_mysql_connection(db, dbDetailsObject))
+
+
+def open_mysql_connection(db, dbDetailsObject):
+    """Function to open a mysql connection"""
     try:
         connection = pymysql.connect(host=dbDetailsObject['hostname_or_url'],
                                      user=dbDetailsObject['userName'],
@@ -66,9 +80,14 @@ def mysql_db_Obj(db, connectionAlias):
 
 
 def sql_server_db_obj(db, connectionAlias):
-    """Function to get SQL Server Connection object"""
+    """Function to check out a pooled SQL Server connection object, given back with release_connection"""
     dbDetailsObject = get_db_details(connectionAlias)
+    return checkout_connection(connectionAlias, db, dbDetailsObject,
+                               lambda: open_sql_server_connection(db, dbDetailsObject))
 
+
+def open_sql_server_connection(db, dbDetailsObject):
+    """Function to open a SQL Server connection"""
     try:
         connection = pyodbc.connect(driver='{SQL Server}',
                                     Server=dbDetailsObject['hostname_or_url'],
@@ -82,8 +101,13 @@ def sql_server_db_obj(db, connectionAlias):
 
 
 def oracle_obj(connectionAlias):
-    """function to get oracle connection object"""
+    """function to check out a pooled oracle connection object, given back with release_connection"""
     dbDetailsObject = get_db_details(connectionAlias)
+    return checkout_connection(connectionAlias, None, dbDetailsObject, lambda: open_oracle_connection(dbDetailsObject))
+
+
+def open_oracle_connection(dbDetailsObject):
+    """function to open an oracle connection"""
     initiator = client_initiator()
     logger.info(f"Initiator inside login ---- {initiator}")
 
@@ -120,18 +144,25 @@ def drill_obj(connectionAlias):
 
 
 def mongo_client_obj(db, connectionAlias):
-    """Function to get monodb client object"""
+    """Function to get monodb client object, the client of an alias is shared and pools its own connections"""
     dbDetailsObject = get_db_details(connectionAlias)
     try:
-        client = MongoClient('mongodb://localhost:27017/')
+        client = get_shared_client(connectionAlias, dbDetailsObject, lambda: MongoClient(
+            'mongodb://localhost:27017/', minPoolSize=int(config.DB_POOL_MIN_SIZE),
+            maxPoolSize=int(config.DB_POOL_MAX_SIZE), maxIdleTimeMS=int(config.DB_POOL_IDLE_SECONDS) * 1000))
         return client[db]
     except Exception as e:
         raise Exception(f'Unable to connect to Db -{e}')
 
 
 def s4_hana_obj(connectionAlias):
-    """Function to hana connection object"""
+    """Function to check out a pooled hana connection object, given back with release_connection"""
     dbDetailsObject = get_db_details(connectionAlias)
+    return checkout_connection(connectionAlias, None, dbDetailsObject, lambda: open_hana_connection(dbDetailsObject))
+
+
+def open_hana_connection(dbDetailsObject):
+    """Function to open a hana connection"""
     try:
         connection = pyhdb.connect(dbDetailsObject['hostname_or_url'],
                                    dbDetailsObject['portNumber'],
@@ -497,14 +528,17 @@ class DBConnectionModel:
 
 
 def client_initiator():
-    """Function to initiate an oracle client connection"""
-    try:
-        ORACLE_CLIENT = os.path.join(config.BASE_DIR, config.ORACLE_CLIENT_ID)
-        cx_Oracle.init_oracle_client(lib_dir=ORACLE_CLIENT)
-        return True
-    except Exception as e:
-        logger.error(f'Exception - {e}')
-        return False
+    """Function to initiate the oracle client, once per process"""
+    global oracle_client_initiated
+    if oracle_client_initiated is None:
+        try:
+            ORACLE_CLIENT = os.path.join(config.BASE_DIR, config.ORACLE_CLIENT_ID)
+            cx_Oracle.init_oracle_client(lib_dir=ORACLE_CLIENT)
+            oracle_client_initiated = True
+        except Exception as e:
+            logger.error(f'Exception - {e}')
+            oracle_client_initiated = False
+    return oracle_client_initiated
 
 
 ##mongo credentials
@@ -0,0 +1,171 @@
+'''
+Copyright 2024 Infosys Ltd.
+
+Use of this source code is governed by MIT license that can be found in the LICENSE file or at
+
+https://opensource.org/licenses/MIT.
+'''
+
+import codecs
+import csv
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+from configs import config
+from utils.ServerLogs import logger
+
+
+def read_header(file_name, delimiter=',', encoding='utf8'):
+    """Function to read the column names from the first line of a delimited file, without the byte order mark
+    which pyarrow also skips"""
+    if codecs.lookup(encoding).name == 'utf-8':
+        encoding = 'utf-8-sig'
+    with open(file_name, newline='', encoding=encoding, errors='replace') as f:
+        return next(csv.reader(f, delimiter=delimiter), [])
+
+
+def get_csv_options(file_name, col_list=None, delimiter=',', as_strings=True, encoding='utf8', missing_values=False):
+    """Function to get the pyarrow.csv options of a delimited file
+
+    Args:
+        file_name: Path of the file
+        col_list: Columns to parse, all of them when empty
+        delimiter: Single character delimiter
+        as_strings: Read every column as strings instead of inferring the types
+        encoding: Encoding of the file
+        missing_values: Read empty and NA like strings as missing values
+
+    Returns:
+        Read options, parse options, convert options
+
+    """
+    read_options = pacsv.ReadOptions(use_threads=True, encoding=encoding,
+                                     block_size=int(config.DELIMITED_READ_BLOCK_BYTES))
+    parse_options = pacsv.ParseOptions(delimiter=delimiter)
+
+    column_types = None
+    if as_strings:
+        column_types = {column: pa.string() for column in col_list or read_header(file_name, delimiter, encoding)}
+
+    # Empty fields stay empty strings, as with keep_default_na=False, unless missing values are requested
+    convert_options = pacsv.ConvertOptions(include_columns=col_list or None, column_types=column_types,
+                                           strings_can_be_null=missing_values, quoted_strings_can_be_null=False)
+    return read_options, parse_options, convert_options
+
+
+def get_temporal_columns(file_name, read_options, parse_options, convert_options):
+    """Function to get the columns which pyarrow infers as dates, times or timestamps in the first block of a file"""
+    with pacsv.open_csv(file_name, read_options=read_options, parse_options=parse_options,
+                        convert_options=convert_options) as reader:
+        return [field.name for field in reader.schema if pa.types.is_temporal(field.type)]
+
+
+def read_delimited_table(file_name, col_list=None, delimiter=',', as_strings=True, encoding='utf8'):
+    """Function to read a delimited file into an Arrow table, parsing blocks of the file on all cores
+
+    Without as_strings the types are inferred, except that dates and times stay text as pandas.read_csv
+    reads them, so the data types of the quality checks and of the profiles do not depend on the reader.
+    """
+    read_options, parse_options, convert_options = get_csv_options(file_name, col_list, delimiter or ',',
+                                                                   as_strings, encoding, missing_values=not as_strings)
+    if not as_strings:
+        temporal_columns = get_temporal_columns(file_name, read_options, parse_options, convert_options)
+        if temporal_columns:
+            convert_options.column_types = {column: pa.string() for column in temporal_columns}
+    return pacsv.read_csv(file_name, read_options=read_options, parse_options=parse_options,
+                          convert_options=convert_options)
+
+
+def read_delimited(file_name, col_list=None, delimiter=',', as_strings=True, encoding='utf8'):
+    """Function to read a delimited file into a dataframe, with the columns in the order of col_list
+
+    Delimiters which are not a single character are not supported by pyarrow.csv and are read by pandas.
+
+    Args:
+        file_name: Path of the file
+        col_list: Columns to read, all of them when empty
+        delimiter: Delimiter, ',' when empty
+        as_strings: Read every column as strings instead of inferring the types
+        encoding: Encoding of the file
+
+    Returns:
+        Dataframe
+
+    """
+    delimiter = delimiter or ','
+    if len(delimiter) != 1:
+        logger.info(f"Delimiter {delimiter} is read with pandas")
+        data_frame = pd.read_csv(file_name, usecols=col_list or None, delimiter=delimiter, encoding=encoding,
+                                 engine='python', dtype=str if as_strings else None, keep_default_na=not as_strings)
+    else:
+        data_frame = read_delimited_table(file_name, col_list, delimiter, as_strings, encoding).to_pandas()
+
+    return data_frame[col_list] if col_list else data_frame
+
+
+def read_delimited_chunks(file_name, col_list=None, delimiter=',', chunksize=100000, as_strings=True,
+                          encoding='utf8', missing_values=None):
+    """Function to read a delimited file as dataframes of at most chunksize rows
+
+    The file is streamed block by block as strings. Without as_strings the missing values are kept and
+    the columns whose values are all numbers are converted chunk by chunk, so a column may be numeric
+    in one chunk and not in another.
+
+    Args:
+        file_name: Path of the file
+        col_list: Columns to read, all of them when empty
+        delimiter: Delimiter, ',' when empty
+        chunksize: Maximum number of rows per dataframe
+        as_strings: Read every column as strings instead of inferring the types
+        encoding: Encoding of the file
+        missing_values: Read empty and NA like strings as missing values, by default when the types are inferred
+
+    Returns:
+        Iterator of dataframes
+
+    """
+    delimiter = delimiter or ','
+    if missing_values is None:
+        missing_values = not as_strings
+    if len(delimiter) != 1:
+        reader = pd.read_csv(file_name, usecols=col_list or None, delimiter=delimiter, encoding=encoding,
+                             engine='python', dtype=str if as_strings else None, keep_default_na=missing_values,
+                             chunksize=chunksize)
+        return (chunk[col_list] if col_list else chunk for chunk in reader)
+
+    read_options, parse_options, convert_options = get_csv_options(file_name, col_list, delimiter, True, encoding,
+                                                                   missing_values=missing_values)
+    reader = pacsv.open_csv(file_name, read_options=read_options, parse_options=parse_options,
+                            convert_options=convert_options)
+    chunks = rebatch(reader, chunksize, col_list)
+    return chunks if as_strings else (infer_numbers(chunk) for chunk in chunks)
+
+
+def infer_numbers(data_frame):
+    """Function to convert the string columns whose values are all numbers or missing to numbers"""
+    for position in range(data_frame.shape[1]):
+        values = data_frame.iloc[:, position]
+        if values.dtype != object:
+            continue
+        numbers = pd.to_numeric(values, errors='coerce')
+        if not (numbers.isna() & values.notna()).any():
+            data_frame.isetitem(position, numbers)
+    return data_frame
+
+
+def rebatch(reader, chunksize, col_list=None):
+    """Function to turn the record batches of a streaming reader into dataframes of chunksize rows"""
+    pending = None
+    for batch in reader:
+        table = pa.Table.from_batches([batch])
+        pending = table if pending is None else pa.concat_tables([pending, table])
+        while len(pending) >= chunksize:
+            data_frame = pending.slice(0, chunksize).to_pandas()
+            pending = pending.slice(chunksize)
+            yield data_frame[col_list] if col_list else data_frame
+
+    if pending is not None and len(pending):
+        data_frame = pending.to_pandas()
+        yield data_frame[col_list] if col_list else data_frame
@@ -30,3 +30,33 @@ class DataFrameReadError(Error):
 class CSVInjectionError(Error):
     """Raised when the CSV Contains Malicious data"""
     pass
+
+
+class InvalidComparisonEngine(Error):
+    """Raised when the requested comparison engine is not supported"""
+    pass
+
+
+class InputNotSorted(Error):
+    """Raised when the inputs of a sorted merge comparison are not ordered by the primary key"""
+    pass
+
+
+class DuplicatePrimaryKeys(Error):
+    """Raised when the primary key of a column comparison has duplicate values"""
+    pass
+
+
+class InvalidColumnRule(Error):
+    """Raised when a comparison rule of the column mapping is not valid"""
+    pass
+
+
+class InvalidLayout(Error):
+    """Raised when a field of a fixed width layout is not valid"""
+    pass
+
+
+class ConnectionPoolTimeout(Error):
+    """Raised when no pooled database connection is free before the checkout timeout"""
+    pass
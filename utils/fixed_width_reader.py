@@ -0,0 +1,251 @@
+'''
+Copyright 2024 Infosys Ltd.
+
+Use of this source code is governed by MIT license that can be found in the LICENSE file or at
+
+https://opensource.org/licenses/MIT.
+'''
+
+import hashlib
+import json
+import mmap
+
+import numpy as np
+import pandas as pd
+
+from utils.exceptions import InvalidLayout
+
+# Column of a DAT file read without a layout, one record per line
+RECORDS_COLUMN = 'Records'
+
+# Bytes scanned for line ends, and bytes of records hashed, at a time
+SCAN_BLOCK_BYTES = 64 * 1024 * 1024
+HASH_BLOCK_BYTES = 4 * 1024 * 1024
+
+# Lines whose fields are sliced at a time
+SLICE_BLOCK_LINES = 1024 * 1024
+
+
+def get_layout(layout):
+    """Function to get the fields of a fixed width layout from a list or a json string
+
+    Every field is a {"name", "start", "width"} entry, start being the 0 based byte offset in the line.
+    """
+    if not layout:
+        return None
+    if isinstance(layout, str):
+        layout = json.loads(layout)
+
+    fields = []
+    for field in layout:
+        try:
+            name, start, width = str(field['name']), int(field['start']), int(field['width'])
+        except (KeyError, TypeError, ValueError):
+            raise InvalidLayout(field)
+        if start < 0 or width <= 0:
+            raise InvalidLayout(field)
+        fields.append((name, start, width))
+    return fields
+
+
+def mix64(values):
+    """Function to scramble 64 bit values with the splitmix64 finalizer"""
+    values = values ^ (values >> np.uint64(30))
+    values = values * np.uint64(0xBF58476D1CE4E5B9)
+    values = values ^ (values >> np.uint64(27))
+    values = values * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def strip_records(matrix, lengths):
+    """Function to strip ascii whitespace around the records in the rows of a zero padded byte matrix
+
+    Returns:
+        Matrix with every record moved to the start of its row and zero padded, lengths of the stripped records
+
+    """
+    columns = np.arange(matrix.shape[1])
+    kept = (columns < lengths[:, None]) & (matrix != 32) & ((matrix < 9) | (matrix > 13))
+    non_blank = kept.any(axis=1)
+    leading = np.where(non_blank, kept.argmax(axis=1), 0)
+    ends = np.where(non_blank, matrix.shape[1] - kept[:, ::-1].argmax(axis=1), 0)
+
+    if leading.any():
+        matrix = np.take_along_axis(matrix, np.minimum(leading[:, None] + columns, matrix.shape[1] - 1), axis=1)
+    stripped = ends - leading
+    matrix[columns >= stripped[:, None]] = 0
+    return matrix, stripped
+
+
+class MappedTextFile:
+    """Class to read the lines of a DAT or fixed width file through a memory map, without copying the file"""
+
+    def __init__(self, file_name, layout=None, encoding='utf-8'):
+        """Init function"""
+        self.file_name = file_name
+        self.layout = get_layout(layout)
+        self.encoding = encoding
+        self.columns = [field[0] for field in self.layout] if self.layout else [RECORDS_COLUMN]
+
+        with open(file_name, 'rb') as f:
+            try:
+                self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self.buffer = np.frombuffer(self.map, dtype=np.uint8)
+            except ValueError:
+                # Empty files can not be mapped
+                self.map = None
+                self.buffer = np.zeros(0, dtype=np.uint8)
+
+        self.starts, self.ends = self.line_offsets()
+
+    @property
+    def columns(self):
+        """Column names, as the index of a dataframe"""
+        return self._columns
+
+    @columns.setter
+    def columns(self, columns):
+        """Rename the columns, keeping their number as a dataframe does"""
+        columns = pd.Index(columns)
+        if self.layout and len(columns) != len(self.layout) or not self.layout and len(columns) != 1:
+            raise ValueError(f'Length mismatch: {len(columns)} names for the columns of {self.file_name}')
+        self._columns = columns
+
+    @property
+    def shape(self):
+        """Number of lines and columns"""
+        return len(self.starts), len(self.columns)
+
+    def __len__(self):
+        """Number of lines"""
+        return len(self.starts)
+
+    def line_offsets(self):
+        """Scan the map for line ends, empty lines are skipped and a trailing carriage return is not part of a line"""
+        newlines = [np.flatnonzero(self.buffer[start:start + SCAN_BLOCK_BYTES] == 10) + start
+                    for start in range(0, len(self.buffer), SCAN_BLOCK_BYTES)]
+        ends = np.concatenate(newlines + [np.array([len(self.buffer)], dtype=np.int64)]).astype(np.int64)
+        starts = np.concatenate([[0], ends[:-1] + 1]).astype(np.int64)
+
+        carriage_returns = (ends > starts) & (self.buffer[np.maximum(ends - 1, 0)] == 13) if len(self.buffer) else \
+            np.zeros(len(ends), dtype=bool)
+        ends = ends - carriage_returns
+
+        non_empty = ends > starts
+        return starts[non_empty], ends[non_empty]
+
+    def select(self, col_list):
+        """Keep only the fields of col_list, in their order"""
+        if col_list and list(col_list) != list(self.columns):
+            fields = {field[0]: field for field in self.layout or []}
+            self.layout = [fields[col] for col in col_list]
+            self.columns = col_list
+        return self
+
+    def segments(self):
+        """Start and width of the bytes of a line which are compared, the whole line or every field of the layout"""
+        if not self.layout:
+            return [(0, None)]
+        return [(start, width) for _, start, width in self.layout]
+
+    def record_bytes(self, starts, lengths, width):
+        """Copy records into the rows of a zero padded byte matrix, with a strided view of the map when the
+        records have the same length and are evenly spaced"""
+        matrix = np.zeros((len(starts), width), dtype=np.uint8)
+        strides = np.diff(starts)
+        if len(starts) and lengths.min() == lengths.max() and (len(strides) == 0 or strides.min() == strides.max()):
+            length = int(lengths[0])
+            stride = int(strides[0]) if len(strides) else length
+            matrix[:, :length] = np.lib.stride_tricks.as_strided(self.buffer[starts[0]:], shape=(len(starts), length),
+                                                                 strides=(stride, 1), writeable=False)
+            return matrix
+
+        columns = np.arange(width)
+        inside = columns < lengths[:, None]
+        indexes = np.minimum(starts[:, None] + columns, len(self.buffer) - 1)
+        matrix[inside] = self.buffer[indexes[inside]]
+        return matrix
+
+    def line_hashes(self, hash_key):
+        """Hash the bytes of every record straight from the map
+
+        The whole line, or every field of the layout, is read as little endian 64 bit words, zero padded, and
+        folded with its length into a hash seeded with the hash key, see fold_records. Records with the same
+        number of words are hashed together, in blocks of about HASH_BLOCK_BYTES.
+
+        Args:
+            hash_key: Key of the hash, as used for the rows of dataframes
+
+        Returns:
+            uint64 hash of every line
+
+        """
+        digest = hashlib.blake2b(str(hash_key).encode(), digest_size=16).digest()
+        hashes = np.full(len(self), int.from_bytes(digest[:8], 'little'), dtype=np.uint64)
+        multiplier = np.uint64(int.from_bytes(digest[8:], 'little') | 1)
+
+        for start, width in self.segments():
+            starts = np.minimum(self.starts + start, self.ends)
+            ends = self.ends if width is None else np.minimum(starts + width, self.ends)
+            hashes = self.fold_records(hashes, starts, ends - starts, multiplier, width)
+
+        return mix64(hashes)
+
+    def fold_records(self, hashes, starts, lengths, multiplier, width=None):
+        """Fold the length and the words of one record of every line into the line hashes
+
+        Fields are stripped of leading and trailing whitespace first, so that they hash the same when their
+        stripped values, as sliced by take, are the same.
+        """
+        no_of_words = (lengths + 7) // 8 if width is None else np.full(len(lengths), (width + 7) // 8)
+
+        for words in np.unique(no_of_words):
+            lines = np.flatnonzero(no_of_words == words)
+            block_lines = max(1, HASH_BLOCK_BYTES // (8 * int(words)))
+            for first in range(0, len(lines), block_lines):
+                block = lines[first:first + block_lines]
+                matrix = self.record_bytes(starts[block], lengths[block], 8 * int(words))
+                block_lengths = lengths[block]
+                if width is not None:
+                    matrix, block_lengths = strip_records(matrix, block_lengths)
+
+                block_hashes = mix64(hashes[block] ^ block_lengths.astype(np.uint64))
+                words_matrix = matrix.view('<u8')
+                with np.errstate(over='ignore'):
+                    for word in range(int(words)):
+                        block_hashes = (block_hashes ^ words_matrix[:, word]) * multiplier
+                        block_hashes ^= block_hashes >> np.uint64(29)
+                hashes[block] = block_hashes
+        return hashes
+
+    def field_values(self, positions, start, width):
+        """Slice one fixed width field out of the lines at the given positions, as stripped strings"""
+        line_starts = self.starts[positions]
+        offsets = start + np.arange(width)
+        inside = offsets < (self.ends[positions] - line_starts)[:, None]
+        indexes = np.minimum(line_starts[:, None] + offsets, max(len(self.buffer) - 1, 0))
+        chars = np.where(inside, self.buffer[indexes] if len(self.buffer) else 32, 32).astype(np.uint8)
+        values = np.ascontiguousarray(chars).view(f'S{width}').ravel()
+        return pd.Series(values).str.decode(self.encoding, errors='replace').str.strip()
+
+    def take(self, positions):
+        """Materialize the lines at the given positions as a dataframe of records or of layout fields"""
+        positions = np.asarray(positions, dtype=np.int64)
+        if not self.layout:
+            lines = [self.map[start:end].decode(self.encoding, errors='replace')
+                     for start, end in zip(self.starts[positions], self.ends[positions])]
+            return pd.DataFrame({self.columns[0]: pd.Series(lines, dtype=object)})
+
+        # Columns may have been renamed, e.g. target columns take the names of the source ones
+        blocks = []
+        for first in range(0, len(positions), SLICE_BLOCK_LINES):
+            block = positions[first:first + SLICE_BLOCK_LINES]
+            blocks.append(pd.DataFrame({column: self.field_values(block, start, width).to_numpy(dtype=object)
+                                        for column, (_, start, width) in zip(self.columns, self.layout)}))
+        if not blocks:
+            return pd.DataFrame({name: pd.Series(dtype=object) for name in self.columns})
+        return pd.concat(blocks, ignore_index=True)
+
+    def to_dataframe(self):
+        """Materialize every line"""
+        return self.take(np.arange(len(self)))
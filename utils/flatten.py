@@ -0,0 +1,39 @@
+'''
+Copyright 2024 Infosys Ltd.
+
+Use of this source code is governed by MIT license that can be found in the LICENSE file or at
+
+https://opensource.org/licenses/MIT.
+'''
+
+
+def child_entries(data, parent_key, sep):
+    """Function to iterate over the items of a dictionary with their flattened keys"""
+    return ((f"{parent_key}{sep}{key}" if parent_key else key, value) for key, value in data.items())
+
+
+def item_entries(items, parent_key):
+    """Function to iterate over the items of a list with their flattened keys"""
+    return ((f"{parent_key}[{idx}]", item) for idx, item in enumerate(items))
+
+
+def flatten_dict(d, parent_key='', sep='.'):
+    """
+    Flatten a nested dictionary, with a stack instead of recursion so deeply nested records are supported.
+    """
+    items = {}
+    stack = [child_entries(d, parent_key, sep)]
+    while stack:
+        entry = next(stack[-1], None)
+        if entry is None:
+            stack.pop()
+            continue
+
+        key, value = entry
+        if isinstance(value, dict):
+            stack.append(child_entries(value, key, sep))
+        elif isinstance(value, list) and all(isinstance(item, dict) for item in value):
+            stack.append(item_entries(value, key))
+        else:
+            items[key] = value
+    return items
@@ -6,18 +6,20 @@ Use of this source code is governed by MIT license that can be found in the LICE
 https://opensource.org/licenses/MIT.
 '''
 
-import fastavro
 import pandas as pd
 import pydrill
 import pymongo
 
 from comparator.db2dbcomparison_module import prepare_datafrmaes_from_tables as prepare_datafrmaes_from_tables_db2db
 from comparator.f2dbcomparison_module import prepare_datafrmaes_from_tables as prepare_datafrmaes_from_tables_f2db
+from configs import config
 from utils.ServerLogs import logger
-from utils.dataframes_utility import get_json_dataframe, get_xml_dataframe, dynamic_query_hbase_convert, \
-    get_parquet_dataframe
+from utils.connection_pool import release_connection
+from utils.dataframes_utility import dynamic_query_hbase_convert
 from utils.db_connect import get_database_type
 from utils.exceptions import DataFrameReadError
+from utils.preview import preview_file, limit_query
+from utils.sql_stream import iter_query_batches
 
 
 def read_file(file_path, extension):
@@ -28,31 +30,14 @@ def read_file(file_path, extension):
         if extension_cal != extension:
             raise Exception('Uploaded File is of a different type than the one mentioned')
 
-        if extension == 'txt' or extension == 'csv':
-            df = pd.read_csv(file_path)
-        elif extension == 'json':
-
-            df = get_json_dataframe(file_path)
-
-        elif extension == 'xml':
-            df = get_xml_dataframe(file_path)
-        elif extension == 'parquet':
-            df = get_parquet_dataframe(file_path)
-
-        elif extension == 'avro':
-            with open(file_path, 'rb') as f:
-                reader = fastavro.reader(f)
-                records = [r for r in reader]
-                df = pd.DataFrame(records)
-        else:
+        # Only the header or schema and the first records are read
+        df = preview_file(file_path, extension)
+        if df is None:
             logger.error('Unsupported file format')
             return None
 
-        if df is None:
-            raise Exception('Unable to read the file, please try a different input')
-
         df = df.astype(str)
-        return df.columns.tolist(), df.head(10)
+        return df.columns.tolist(), df.head(int(config.PREVIEW_ROWS))
 
     except Exception as e:
         logger.error(f"Exception - {e}")
@@ -61,6 +46,7 @@ def read_file(file_path, extension):
 
 def get_columns_from_database_2_database(request_data):
     """Function to get columns from db"""
+    source_connection = target_connection = None
     try:
 
         source_query, source_connection, target_query, target_connection = prepare_datafrmaes_from_tables_db2db(
@@ -71,11 +57,12 @@ def get_columns_from_database_2_database(request_data):
 
         if isinstance(source_connection, pymongo.database.Database):
             logger.info("Trying to utils to Mongoinside db 2 db")
-            cursor = source_connection[request_data.get('sourceTableName')].find()
+            cursor = source_connection[request_data.get('sourceTableName')].find().limit(
+                int(config.COLUMN_SAMPLE_RECORDS))
             df = pd.DataFrame(list(cursor))
 
             df1 = df.drop(columns=['_id'])
-            source_df = df1
+            source_df = df1.head(int(config.PREVIEW_ROWS))
             columns_source = source_df.columns.tolist()
 
 
@@ -86,11 +73,12 @@ def get_columns_from_database_2_database(request_data):
 
         if isinstance(target_connection, pymongo.database.Database):
             logger.info("Trying to utils to Mongoinside db 2 db")
-            cursor = target_connection[request_data.get('targetTableName')].find()
+            cursor = target_connection[request_data.get('targetTableName')].find().limit(
+                int(config.COLUMN_SAMPLE_RECORDS))
             df = pd.DataFrame(list(cursor))
 
             df1 = df.drop(columns=['_id'])
-            target_df = df1
+            target_df = df1.head(int(config.PREVIEW_ROWS))
             columns_target = target_df.columns.tolist()
 
         else:
@@ -108,11 +96,16 @@ def get_columns_from_database_2_database(request_data):
         logger.info("Query execution error is happening here.")
         raise Exception("Query Could Not be executed.")
 
+    finally:
+        release_connection(source_connection)
+        release_connection(target_connection)
+
     return columns_source, columns_target, source_df, target_df
 
 
 def get_columns_from_file_2_database(request_data):
     """Functions to get columns from file and db"""
+    target_connection = None
     try:
         target_query, target_connection = prepare_datafrmaes_from_tables_f2db(
             request_data)
@@ -121,11 +114,12 @@ def get_columns_from_file_2_database(request_data):
 
         if isinstance(target_connection, pymongo.database.Database):
             logger.info("Trying to utils to Mongoinside db 2 db")
-            cursor = target_connection[request_data.get('targetTableName')].find()
+            cursor = target_connection[request_data.get('targetTableName')].find().limit(
+                int(config.COLUMN_SAMPLE_RECORDS))
             df = pd.DataFrame(list(cursor))
 
             df1 = df.drop(columns=['_id'])
-            target_df = df1
+            target_df = df1.head(int(config.PREVIEW_ROWS))
             columns_target = target_df.columns.tolist()
 
         else:
@@ -143,11 +137,31 @@ def get_columns_from_file_2_database(request_data):
         logger.info("Query execution error is happening here.")
         raise Exception("Query Could Not be executed.")
 
+    finally:
+        release_connection(target_connection)
+
     return columns_target, target_df
 
 
+def read_sql_preview(query, connection, type_of_db):
+    """Function to read the first rows of a query, limited in the database when the query can be wrapped"""
+    no_of_rows = int(config.PREVIEW_ROWS)
+    try:
+        return pd.read_sql(limit_query(query, type_of_db, no_of_rows), connection)
+    except Exception as e:
+        # e.g. an ORDER BY which the database does not accept in a subquery
+        logger.info(f"Query could not be limited, reading its first rows - {e}")
+        if hasattr(connection, 'rollback'):
+            connection.rollback()
+        batches = iter_query_batches(query, connection, no_of_rows)
+        try:
+            return next(batches)
+        finally:
+            batches.close()
+
+
 def get_dataframe_from_table(query, connection, type_of_db):
-    """Function to read data from table"""
+    """Function to read the columns and the first rows of a query"""
     if isinstance(connection, pymongo.database.Database):
         logger.info("Trying to utils to Mongo")
 
@@ -156,10 +170,11 @@ def get_dataframe_from_table(query, connection, type_of_db):
             if type_of_db == 'mongo':
                 logger.info("coming in mongo")
                 cursor = connection['docs'].find(
-                    {}, {'_id': 0, "Order Priority": 0, "Order Date": 0, "Ship Date": 0})
+                    {}, {'_id': 0, "Order Priority": 0, "Order Date": 0, "Ship Date": 0}).limit(
+                    int(config.COLUMN_SAMPLE_RECORDS))
                 df = pd.DataFrame(list(cursor))
                 logger.info(df)
-                return df.columns.tolist(), df.head(10)
+                return df.columns.tolist(), df.head(int(config.PREVIEW_ROWS))
             elif isinstance(connection, pydrill.client.PyDrill):
                 if "hbase." in query:
                     query_output = connection.query(query + " limit 1")
@@ -167,18 +182,19 @@ def get_dataframe_from_table(query, connection, type_of_db):
                         query_output, connection, query, query_output.columns)
                     df = hbase_output.to_dataframe()
                 else:
-                    query_output = connection.query(query, timeout=600)
+                    query_output = connection.query(limit_query(query, 'Drill', int(config.PREVIEW_ROWS)),
+                                                    timeout=600)
 
                     df = query_output.to_dataframe()
 
-                return df.columns.tolist(), df.head(10)
+                return df.columns.tolist(), df.head(int(config.PREVIEW_ROWS))
             else:
 
-                df = pd.read_sql(query, connection).fillna('')
-                return df.columns.tolist(), df.head(10)
+                df = read_sql_preview(query, connection, type_of_db).fillna('')
+                return df.columns.tolist(), df
         else:
-            df = pd.read_sql(query, connection).fillna('')
-            return df.columns.tolist(), df.head(10)
+            df = read_sql_preview(query, connection, type_of_db).fillna('')
+            return df.columns.tolist(), df
     except Exception as e:
         logger.error(f"Exception occurred while running SQL query: - {e}")
         raise Exception(f"Exception occurred while running SQL query: - {e}")
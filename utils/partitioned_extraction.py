@@ -0,0 +1,164 @@
+'''
+Copyright 2024 Infosys Ltd.
+
+Use of this source code is governed by MIT license that can be found in the LICENSE file or at
+
+https://opensource.org/licenses/MIT.
+'''
+
+import math
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+import pandas as pd
+
+from configs import config
+from utils.ServerLogs import logger
+from utils.connection_pool import release_connection
+
+# Database types whose queries can be split into range partitions
+PARTITIONED_EXTRACTION_DBS = ['Mysql', 'Postgresql', 'MsSql', 'Oracle', 'Hana']
+
+
+def get_bound(value):
+    """Function to get a partition bound as an int or a Decimal, None when the value is not a number"""
+    if hasattr(value, 'item'):
+        # numpy scalars, as read by pandas
+        value = value.item()
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    try:
+        bound = Decimal(str(value))
+    except ArithmeticError:
+        return None
+    return bound if bound.is_finite() else None
+
+
+def get_partition_bounds(query, connection, partition_column):
+    """Function to get the lowest and highest value of the partition column in the rows of a query"""
+    bounds = pd.read_sql(f'SELECT MIN({partition_column}), MAX({partition_column}) FROM ({query}) partition_bounds',
+                         connection)
+    return bounds.iloc[0, 0], bounds.iloc[0, 1]
+
+
+def split_range(lower, upper, no_of_partitions):
+    """Function to split a range of values into the boundaries of no_of_partitions ranges
+
+    Returns:
+        Boundaries between the ranges, in increasing order, one fewer than the number of ranges
+
+    """
+    if upper <= lower or no_of_partitions <= 1:
+        return []
+
+    lower, upper = Decimal(lower), Decimal(upper)
+    step = (upper - lower) / no_of_partitions
+    boundaries = [lower + step * i for i in range(1, no_of_partitions)]
+    if lower == lower.to_integral_value() and upper == upper.to_integral_value():
+        boundaries = [int(math.ceil(boundary)) for boundary in boundaries]
+    return sorted(set(boundary for boundary in boundaries if lower < boundary <= upper))
+
+
+def get_range_queries(query, partition_column, boundaries):
+    """Function to split a query into one query per range of the partition column
+
+    The first range is open below and also holds the null values, the last range is open above, so every
+    row of the query is in exactly one range whatever bounds were used.
+    """
+    predicates = []
+    lower = None
+    for boundary in boundaries + [None]:
+        conditions = []
+        if lower is not None:
+            conditions.append(f'{partition_column} >= {lower}')
+        if boundary is not None:
+            conditions.append(f'{partition_column} < {boundary}')
+        predicate = ' AND '.join(conditions) or '1 = 1'
+        if lower is None:
+            predicate = f'({predicate} OR {partition_column} IS NULL)'
+        predicates.append(predicate)
+        lower = boundary
+    return [f'SELECT * FROM ({query}) partitioned WHERE {predicate}' for predicate in predicates]
+
+
+def read_range(range_query, connection, connect, read):
+    """Function to read one range of a query, on a connection of its own when connection is None"""
+    checked_out = connection is None
+    if checked_out:
+        connection = connect()
+    try:
+        return read(range_query, connection)
+    finally:
+        if checked_out:
+            release_connection(connection)
+
+
+def get_table_ranges(query, connection, partition_column, bounds=None, no_of_partitions=None):
+    """Function to get the range queries of a query, the query alone when its partition column has no numeric bounds"""
+    no_of_partitions = min(int(no_of_partitions or config.EXTRACTION_PARTITIONS), int(config.DB_POOL_MAX_SIZE))
+    if not bounds:
+        try:
+            bounds = get_partition_bounds(query, connection, partition_column)
+        except Exception as e:
+            logger.info(f"Bounds of partition column {partition_column} could not be read - {e}")
+            bounds = (None, None)
+    lower, upper = get_bound(bounds[0]), get_bound(bounds[1])
+    if lower is None or upper is None:
+        logger.info(f"Partition column {partition_column} has no numeric bounds - {bounds}, the query is read at once")
+        return [query]
+
+    range_queries = get_range_queries(query, partition_column, split_range(lower, upper, no_of_partitions))
+    logger.info(f"Reading {len(range_queries)} ranges of {partition_column} between {lower} and {upper}")
+    return range_queries
+
+
+def read_table_partitions(query, connection, connect, read, partition_column, bounds=None, no_of_partitions=None):
+    """Function to read a query as ranges of a numeric partition column, in parallel over pooled connections
+
+    Args:
+        query: Query of the request
+        connection: Connection checked out for the query, it reads the first range
+        connect: Function which checks out another connection of the same alias and database
+        read: Function which reads a query on a connection as a dataframe, None when it fails
+        partition_column: Numeric column the ranges are taken on, as written in the query
+        bounds: Lowest and highest value of the partition column, read from the query when empty
+        no_of_partitions: Number of ranges, EXTRACTION_PARTITIONS by default, at most DB_POOL_MAX_SIZE
+
+    Returns:
+        Dataframe of every range in the order of the ranges, None when a range could not be read
+
+    """
+    range_queries = get_table_ranges(query, connection, partition_column, bounds, no_of_partitions)
+    if len(range_queries) == 1:
+        frame = read_range(range_queries[0], connection, connect, read)
+        return None if frame is None else [frame]
+
+    with ThreadPoolExecutor(max_workers=len(range_queries), thread_name_prefix='partition') as pool:
+        futures = [pool.submit(read_range, range_query, connection if position == 0 else None, connect, read)
+                   for position, range_query in enumerate(range_queries)]
+        frames = [future.result() for future in futures]
+
+    if any(frame is None for frame in frames):
+        return None
+    return frames
+
+
+def stream_table_partitions(query, connection, stream, partition_column, bounds=None, no_of_partitions=None):
+    """Function to stream a query as ranges of a numeric partition column, for the engines which read in chunks
+
+    Ranges are streamed one after another on the connection of the query, in the order of the ranges, so that
+    only one chunk is held at a time. Rows are not in the order of the query, see get_partitioning.
+
+    Args:
+        query: Query of the request
+        connection: Connection checked out for the query
+        stream: Function which reads a query on a connection as an iterator of dataframes
+        partition_column: Numeric column the ranges are taken on, as written in the query
+        bounds: Lowest and highest value of the partition column, read from the query when empty
+        no_of_partitions: Number of ranges, EXTRACTION_PARTITIONS by default, at most DB_POOL_MAX_SIZE
+
+    """
+    for range_query in get_table_ranges(query, connection, partition_column, bounds, no_of_partitions):
+        yield from stream(range_query, connection)
@@ -0,0 +1,106 @@
+'''
+Copyright 2024 Infosys Ltd.
+
+Use of this source code is governed by MIT license that can be found in the LICENSE file or at
+
+https://opensource.org/licenses/MIT.
+'''
+
+from itertools import islice
+
+import fastavro
+import pandas as pd
+import pyarrow.parquet as pq
+
+from configs import config
+from reports.jsontodf import iter_json_records, columnar_batch
+from utils.delimited_reader import read_header, read_delimited_chunks
+from utils.flatten import flatten_dict
+from utils.xml_reader import iter_xml_records
+
+
+def preview_delimited(file_path):
+    """Function to read the header and the first rows of a delimited file as strings, as the comparisons read it"""
+    chunks = read_delimited_chunks(file_path, chunksize=int(config.PREVIEW_ROWS))
+    try:
+        preview = next(chunks, None)
+    finally:
+        chunks.close()
+
+    if preview is None:
+        return pd.DataFrame(columns=read_header(file_path))
+    return preview
+
+
+def preview_parquet(file_path):
+    """Function to read the schema and the first rows of the first row group of a parquet file"""
+    parquet_file = pq.ParquetFile(file_path)
+    batch = next(parquet_file.iter_batches(batch_size=int(config.PREVIEW_ROWS)), None)
+    if batch is None:
+        return parquet_file.schema_arrow.empty_table().to_pandas()
+    return batch.to_pandas()
+
+
+def preview_avro(file_path):
+    """Function to read the schema and the first records of the first block of an avro file"""
+    with open(file_path, 'rb') as f:
+        reader = fastavro.reader(f)
+        records = list(islice(reader, int(config.PREVIEW_ROWS)))
+        schema = reader.writer_schema
+
+    if schema.get('type') == 'record':
+        return pd.DataFrame(records, columns=[field['name'] for field in schema['fields']])
+    return pd.DataFrame(records)
+
+
+def preview_records(records):
+    """Function to get the columns of the first sampled records and the first rows of a record stream
+
+    Records may miss fields, so the columns are the ones of the first COLUMN_SAMPLE_RECORDS records.
+    """
+    sample = columnar_batch(list(islice(records, int(config.COLUMN_SAMPLE_RECORDS))))
+    return sample.head(int(config.PREVIEW_ROWS))
+
+
+def preview_file(file_path, extension):
+    """Function to read the columns and the first rows of a file without parsing the whole file
+
+    Args:
+        file_path: Path of the file
+        extension: Type of the file
+
+    Returns:
+        Dataframe of the first rows, None for an unsupported type
+
+    """
+    if extension == 'txt' or extension == 'csv':
+        return preview_delimited(file_path)
+    elif extension == 'json':
+        return preview_records(flatten_dict(record) for record in iter_json_records(file_path))
+    elif extension == 'xml':
+        return preview_records(iter_xml_records(file_path))
+    elif extension == 'parquet':
+        return preview_parquet(file_path)
+    elif extension == 'avro':
+        return preview_avro(file_path)
+    return None
+
+
+def limit_query(query, database_type, no_of_rows):
+    """Function to wrap a query so that the database returns only its first rows
+
+    Args:
+        query: Query of the request
+        database_type: Database type of the connection, one of SUPPORTED_DBS
+        no_of_rows: Number of rows
+
+    Returns:
+        Limited query
+
+    """
+    query = query.strip().rstrip(';')
+    if database_type == 'MsSql':
+        return f'SELECT TOP {int(no_of_rows)} * FROM ({query}) AS preview'
+    if database_type == 'Oracle':
+        return f'SELECT * FROM ({query}) preview FETCH FIRST {int(no_of_rows)} ROWS ONLY'
+    return f'SELECT * FROM ({query}) AS preview LIMIT {int(no_of_rows)}'
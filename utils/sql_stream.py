@@ -0,0 +1,89 @@
+'''
+Copyright 2024 Infosys Ltd.
+
+Use of this source code is governed by MIT license that can be found in the LICENSE file or at
+
+https://opensource.org/licenses/MIT.
+'''
+
+import uuid
+
+import pandas as pd
+import pymysql.cursors
+
+from configs import config
+from utils.ServerLogs import logger
+
+
+def postgres_cursor(connection):
+    """Function to open a named psycopg2 cursor, the rows stay on the server until they are fetched"""
+    cursor = connection.cursor(name=f'idvex_{uuid.uuid4().hex}')
+    cursor.itersize = int(config.SQL_FETCH_ARRAY_SIZE)
+    return cursor
+
+
+def mysql_cursor(connection):
+    """Function to open an unbuffered pymysql cursor"""
+    return connection.cursor(pymysql.cursors.SSCursor)
+
+
+def oracle_cursor(connection):
+    """Function to open an oracledb cursor which fetches SQL_FETCH_ARRAY_SIZE rows per round trip"""
+    cursor = connection.cursor()
+    cursor.arraysize = int(config.SQL_FETCH_ARRAY_SIZE)
+    cursor.prefetchrows = int(config.SQL_FETCH_ARRAY_SIZE) + 1
+    return cursor
+
+
+def default_cursor(connection):
+    """Function to open a cursor of a driver which streams rows with fetchmany, e.g. pyodbc"""
+    cursor = connection.cursor()
+    cursor.arraysize = int(config.SQL_FETCH_ARRAY_SIZE)
+    return cursor
+
+
+# Streaming cursors by the package of the connection class
+STREAMING_CURSORS = {'psycopg2': postgres_cursor, 'pymysql': mysql_cursor, 'oracledb': oracle_cursor}
+
+
+def open_streaming_cursor(connection):
+    """Function to open a cursor which keeps the result set on the server and fetches it in batches"""
+    package = type(connection).__module__.split('.')[0]
+    return STREAMING_CURSORS.get(package, default_cursor)(connection)
+
+
+def iter_query_batches(query, connection, batch_rows):
+    """Function to run a query and read its rows as dataframes of at most batch_rows rows
+
+    Rows are fetched with a server side cursor, so only one batch is held by the client at a time.
+    Batches are built as pd.read_sql builds the chunks of a query.
+
+    Args:
+        query: Query to run
+        connection: DB-API connection
+        batch_rows: Number of rows per dataframe
+
+    Returns:
+        Iterator of dataframes, one empty dataframe with the columns of the query when it has no rows
+
+    """
+    cursor = open_streaming_cursor(connection)
+    try:
+        cursor.execute(query)
+        # The description of a named psycopg2 cursor is only known after the first fetch
+        rows = cursor.fetchmany(batch_rows)
+        columns = [column[0] for column in cursor.description]
+        if not rows:
+            yield pd.DataFrame(columns=columns)
+
+        no_of_rows = 0
+        while rows:
+            no_of_rows += len(rows)
+            yield pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+            rows = cursor.fetchmany(batch_rows)
+        logger.info(f"Streamed {no_of_rows} rows of the query")
+    finally:
+        try:
+            cursor.close()
+        except Exception as e:
+            logger.info(f"Streaming cursor could not be closed - {e}")
@@ -0,0 +1,110 @@
+'''
+Copyright 2024 Infosys Ltd.
+
+Use of this source code is governed by MIT license that can be found in the LICENSE file or at
+
+https://opensource.org/licenses/MIT.
+'''
+
+import xml.etree.ElementTree as ET
+
+import pandas as pd
+
+from utils.flatten import flatten_dict
+
+
+def local_name(tag):
+    """Function to get the name of a tag or attribute without its namespace"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def element_to_dict(record):
+    """Function to convert a record element to nested dicts the way xmltodict does, without recursion
+
+    Attributes become '@name' keys, repeated children become lists, an element with only text becomes
+    its text and the text of an element with attributes or children is kept under '#text'.
+
+    Args:
+        record: Record element
+
+    Returns:
+        Dictionary, text or None
+
+    """
+    values = {}
+    stack = [(record, False)]
+    while stack:
+        element, visited = stack.pop()
+        if not visited:
+            stack.append((element, True))
+            stack.extend((child, False) for child in element)
+            continue
+
+        node = {f'@{local_name(key)}': value for key, value in element.attrib.items()}
+        for child in element:
+            tag = local_name(child.tag)
+            value = values.pop(child)
+            if tag not in node:
+                node[tag] = value
+            elif isinstance(node[tag], list):
+                node[tag].append(value)
+            else:
+                node[tag] = [node[tag], value]
+
+        text = ''.join([element.text or ''] + [child.tail or '' for child in element]).strip() or None
+        if node and text:
+            node['#text'] = text
+        values[element] = node or text
+
+    return values[record]
+
+
+def iter_xml_records(file_name, record_tag=None):
+    """Function to stream the flattened records of an xml file
+
+    Records are the elements named record_tag, or the children of the root element when it is not given.
+    Every record is dropped from the tree once it is flattened, so memory does not grow with the file.
+
+    Args:
+        file_name: Path of the xml file
+        record_tag: Tag of the record elements
+
+    Returns:
+        Iterator of dictionaries
+
+    """
+    open_elements = []
+    record_depth = 0
+    for event, element in ET.iterparse(file_name, events=('start', 'end')):
+        is_record = (local_name(element.tag) == record_tag if record_tag
+                     else len(open_elements) - (event == 'end') == 1)
+
+        if event == 'start':
+            open_elements.append(element)
+            record_depth += is_record
+            continue
+
+        open_elements.pop()
+        if not is_record:
+            continue
+
+        record_depth -= 1
+        if record_depth == 0:
+            record = element_to_dict(element)
+            yield flatten_dict(record) if isinstance(record, dict) else {local_name(element.tag): record}
+            if open_elements:
+                open_elements[-1].remove(element)
+            element.clear()
+
+
+def get_xml_dataframe_chunks(file_name, record_tag=None, chunksize=100000):
+    """Function to read the records of an xml file as dataframes of at most chunksize records"""
+    records = []
+    for record in iter_xml_records(file_name, record_tag):
+        records.append(record)
+        if len(records) == chunksize:
+            yield pd.DataFrame(records)
+            records = []
+
+    if records:
+        yield pd.DataFrame(records)